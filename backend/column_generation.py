@@ -0,0 +1,390 @@
+import dataclasses
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from model_builder import build_covering_model
+from problem import ProblemInstance
+from depots import SpatialIndex, assign_cities
+from distance_store import DistanceNetwork
+from sequencing import EARTH_RADIUS_KM, haversine_from
+
+GENERATED_ROUTE_PREFIX = "GEN-"
+
+# Candidate neighbours per city for savings pairs and route extension
+NEIGHBORS = 20
+
+
+@dataclass
+class TruckModel:
+    """Cost of one truck of a type on a generated route: ``fixed_cost + cost_per_km * tour_km``."""
+
+    capacity: int
+    fixed_cost: float
+    cost_per_km: float
+
+    def cost(self, tour_km: float) -> int:
+        return int(round(self.fixed_cost + self.cost_per_km * tour_km))
+
+
+@dataclass
+class RouteGenerationReport:
+    """What ``generate_routes`` added; ``stopped`` says why pricing ended."""
+
+    seed_routes: int = 0
+    iterations: int = 0
+    generated_routes: int = 0
+    generated_options: int = 0
+    lp_objective: Optional[float] = None
+    stopped: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+class _Geometry:
+    """Demand-city coordinates and depots, with point-to-point km in radians math.
+
+    With several warehouses each city belongs to its nearest one
+    (``city_depot``) and ``to_depot`` is the distance to it; generated
+    routes only join cities of one depot. With a stored ``network`` matrix,
+    distances are read from it (e.g. road distances) instead of computed.
+    """
+
+    def __init__(self, problem: ProblemInstance, network: Optional[DistanceNetwork] = None):
+        points = problem.coordinates()[:problem.num_demand_cities]
+        self.points = points
+        self.lat = np.radians(points[:, 0]).tolist()
+        self.lon = np.radians(points[:, 1]).tolist()
+        self.cos_lat = np.cos(np.radians(points[:, 0])).tolist()
+        if problem.warehouses:
+            city_depot, to_depot = assign_cities(problem.warehouses, points[:, 0], points[:, 1])
+            self.city_depot = city_depot.tolist()
+            self.to_depot = to_depot.tolist()
+        else:
+            self.city_depot = [0] * len(points)
+            self.to_depot = haversine_from(depot_location(problem), points).tolist()
+        self.matrix = network.matrix if network is not None else None
+        if self.matrix is not None:
+            self.offset = network.num_depots
+            if network.num_depots and all(network.depot_located):
+                cities = np.arange(len(points))
+                self.to_depot = np.asarray(self.matrix[self.city_depot, cities + self.offset], dtype=float).tolist()
+
+    def km(self, a: int, b: int) -> float:
+        # -1 is the depot
+        if a == b:
+            return 0.0
+        if a < 0:
+            return self.to_depot[b]
+        if b < 0:
+            return self.to_depot[a]
+        if self.matrix is not None:
+            return float(self.matrix[a + self.offset, b + self.offset])
+        h = (math.sin((self.lat[b] - self.lat[a]) / 2) ** 2
+             + self.cos_lat[a] * self.cos_lat[b] * math.sin((self.lon[b] - self.lon[a]) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(h, 0.0), 1.0)))
+
+    def neighbors(self, cities: np.ndarray, k: int = NEIGHBORS) -> Dict[int, List[int]]:
+        """The ``k`` nearest other ``cities`` of each city that share its depot."""
+        index = SpatialIndex(self.points[cities, 0], self.points[cities, 1])
+        _, nearest = index.nearest(self.points[cities, 0], self.points[cities, 1], k=min(k + 1, len(cities)))
+        result = {}
+        for c, row in zip(cities.tolist(), cities[nearest].tolist()):
+            result[c] = [n for n in row if n != c and self.city_depot[n] == self.city_depot[c]][:k]
+        return result
+
+
+def _insertion(tour: List[int], city: int, geo: _Geometry) -> Tuple[float, int]:
+    """Cheapest added km and position for ``city`` in a closed depot tour."""
+    stops = [-1] + tour + [-1]
+    best, position = math.inf, 0
+    for i in range(len(stops) - 1):
+        delta = geo.km(stops[i], city) + geo.km(city, stops[i + 1]) - geo.km(stops[i], stops[i + 1])
+        if delta < best:
+            best, position = delta, i
+    return best, position
+
+
+def tour_km(cities: Sequence[int], geo: _Geometry) -> float:
+    """Length of a closed depot tour over ``cities`` built by cheapest insertion."""
+    tour: List[int] = []
+    length = 0.0
+    for c in cities:
+        delta, position = _insertion(tour, c, geo)
+        tour.insert(position, c)
+        length += delta
+    return length
+
+
+def fit_truck_models(problem: ProblemInstance, geo: _Geometry) -> Dict[int, TruckModel]:
+    """Per truck type, a fixed + per-km cost fitted to the existing options by least squares."""
+    samples: Dict[int, List[Tuple[float, float, float]]] = {}
+    ptr = problem.route_city_ptr.tolist()
+    idx = problem.route_city_idx.tolist()
+    lengths: Dict[int, float] = {}
+    for o, (r, t) in enumerate(zip(problem.option_route.tolist(), problem.option_truck.tolist())):
+        if r not in lengths:
+            stops = [c for c in dict.fromkeys(idx[ptr[r]:ptr[r + 1]]) if c < problem.num_demand_cities]
+            lengths[r] = tour_km(stops, geo)
+        samples.setdefault(t, []).append((lengths[r], float(problem.cost[o]), float(problem.capacity[o])))
+
+    models = {}
+    for t, rows in samples.items():
+        km, cost, capacity = (np.asarray(column) for column in zip(*rows))
+        fixed, per_km = float(np.median(cost)), 0.0
+        if len(rows) > 1 and np.ptp(km) > 0:
+            per_km, fixed = np.linalg.lstsq(np.column_stack([km, np.ones_like(km)]), cost, rcond=None)[0]
+            if per_km < 0:
+                fixed, per_km = float(np.median(cost)), 0.0
+            elif fixed < 0:
+                fixed, per_km = 0.0, float(cost @ km / (km @ km))
+        models[t] = TruckModel(capacity=int(round(np.median(capacity))), fixed_cost=float(fixed), cost_per_km=float(per_km))
+    return models
+
+
+def savings_routes(demand: np.ndarray, geo: _Geometry, capacity: float, max_route_km: float,
+                   neighbors: Dict[int, List[int]]) -> List[List[int]]:
+    """Clarke-Wright savings routes over the cities with demand, merged along neighbour pairs only.
+
+    A merge must keep the load within ``capacity`` and the closed tour
+    within ``max_route_km``; cities whose demand alone exceeds a truck stay
+    on their own route.
+    """
+    cities = [c for c in range(len(demand)) if demand[c] > 0]
+    savings = []
+    for i in cities:
+        for j in neighbors.get(i, []):
+            if i < j:
+                saving = geo.to_depot[i] + geo.to_depot[j] - geo.km(i, j)
+                if saving > 0:
+                    savings.append((saving, i, j))
+    savings.sort(reverse=True)
+
+    route_of = {c: c for c in cities}
+    members = {c: [c] for c in cities}
+    load = {c: float(demand[c]) for c in cities}
+    length = {c: 2 * geo.to_depot[c] for c in cities}
+    for saving, i, j in savings:
+        a, b = route_of[i], route_of[j]
+        if a == b or load[a] + load[b] > capacity or length[a] + length[b] - saving > max_route_km:
+            continue
+        first, second = members[a], members[b]
+        # i and j must be route ends; join them back to back
+        if first[-1] != i:
+            if first[0] != i:
+                continue
+            first.reverse()
+        if second[0] != j:
+            if second[-1] != j:
+                continue
+            second.reverse()
+        first.extend(second)
+        for c in second:
+            route_of[c] = a
+        load[a] += load.pop(b)
+        length[a] += length.pop(b) - saving
+        del members[b]
+    return list(members.values())
+
+
+def _lp_duals(problem: ProblemInstance, city_depot: List[int]) -> Tuple[str, float, np.ndarray]:
+    """Status, objective and per-city duals of the covering LP relaxation.
+
+    A city's dual is that of its demand constraint plus that of its depot's
+    capacity constraint (zero or negative), i.e. the value of delivering one
+    unit there from its depot.
+    """
+    from ortools.linear_solver import pywraplp
+
+    solver = pywraplp.Solver.CreateSolver("GLOP")
+    model = build_covering_model(solver, problem)
+    for x_var in model.x:
+        x_var.SetInteger(False)
+    status = solver.Solve()
+    if status != pywraplp.Solver.OPTIMAL:
+        return "not_optimal", math.nan, np.zeros(problem.num_demand_cities)
+    duals = np.asarray([ct.dual_value() for ct in model.demand_constraints])
+    if model.depot_constraints:
+        depot_duals = np.zeros(len(problem.warehouses))
+        for depot, ct in model.depot_constraints.items():
+            depot_duals[depot] = ct.dual_value()
+        duals = duals + depot_duals[city_depot]
+    return "optimal", solver.Objective().Value(), duals
+
+
+def price_routes(duals: np.ndarray, demand: np.ndarray, geo: _Geometry, trucks: Dict[int, TruckModel],
+                 max_route_km: float, neighbors: Dict[int, List[int]], seen: Set[Tuple[frozenset, int]],
+                 seeds: int, limit: int) -> List[Tuple[List[int], int, float]]:
+    """Routes with negative reduced cost, as ``(cities, truck_type, reduced_cost)``, best first.
+
+    A route is priced as one truck delivering its cities' demand (up to its
+    capacity): ``cost(tour_km) - sum(dual * delivered)``. Starting from the
+    cities with the highest dual value, neighbours of the stops so far are
+    inserted greedily while they add more dual value than per-km cost and
+    fit the truck and the distance bound.
+    """
+    order = np.argsort(-(duals * demand))[:seeds].tolist()
+    found: List[Tuple[List[int], int, float]] = []
+    for t, truck in trucks.items():
+        if truck.capacity <= 0:
+            continue
+        for seed in order:
+            if duals[seed] <= 0 or demand[seed] <= 0:
+                break
+            tour = [seed]
+            load = min(float(demand[seed]), truck.capacity)
+            value = duals[seed] * load
+            length = 2 * geo.to_depot[seed]
+            if length > max_route_km:
+                continue
+            candidates = dict.fromkeys(neighbors.get(seed, []))
+            while True:
+                best = None
+                for c in candidates:
+                    if c in tour or duals[c] <= 0 or demand[c] <= 0 or load + demand[c] > truck.capacity:
+                        continue
+                    delta, position = _insertion(tour, c, geo)
+                    gain = duals[c] * demand[c] - truck.cost_per_km * delta
+                    if length + delta <= max_route_km and gain > 0 and (best is None or gain > best[0]):
+                        best = (gain, c, position, delta)
+                if best is None:
+                    break
+                _, c, position, delta = best
+                tour.insert(position, c)
+                load += float(demand[c])
+                value += duals[c] * demand[c]
+                length += delta
+                candidates.update(dict.fromkeys(neighbors.get(c, [])))
+            reduced_cost = truck.cost(length) - value
+            key = (frozenset(tour), t)
+            if reduced_cost < -1e-6 and key not in seen:
+                seen.add(key)
+                found.append((tour, t, reduced_cost))
+    found.sort(key=lambda column: column[2])
+    return found[:limit]
+
+
+def add_routes(problem: ProblemInstance, columns: List[Tuple[List[int], List[int]]], geo: _Geometry,
+               trucks: Dict[int, TruckModel], first_number: int) -> ProblemInstance:
+    """``problem`` plus a generated route per ``(cities, truck_types)`` column, one option per truck type."""
+    names = set(problem.route_names)
+    route_names = list(problem.route_names)
+    idx = [problem.route_city_idx]
+    ptr = problem.route_city_ptr.tolist()
+    option_route, option_truck, capacity, cost, route_depot = [], [], [], [], []
+    number = first_number
+    for cities, truck_types in columns:
+        name = f"{GENERATED_ROUTE_PREFIX}{number}"
+        while name in names:
+            number += 1
+            name = f"{GENERATED_ROUTE_PREFIX}{number}"
+        number += 1
+        names.add(name)
+        route_names.append(name)
+        idx.append(np.asarray(cities, dtype=problem.route_city_idx.dtype))
+        ptr.append(ptr[-1] + len(cities))
+        route_depot.append(geo.city_depot[cities[0]])
+        length = tour_km(cities, geo)
+        for t in truck_types:
+            option_route.append(len(route_names) - 1)
+            option_truck.append(t)
+            capacity.append(trucks[t].capacity)
+            cost.append(trucks[t].cost(length))
+    return dataclasses.replace(
+        problem,
+        route_names=route_names,
+        route_city_ptr=np.asarray(ptr, dtype=np.int64),
+        route_city_idx=np.concatenate(idx),
+        option_route=np.concatenate([problem.option_route, np.asarray(option_route, dtype=problem.option_route.dtype)]),
+        option_truck=np.concatenate([problem.option_truck, np.asarray(option_truck, dtype=problem.option_truck.dtype)]),
+        capacity=np.concatenate([problem.capacity, np.asarray(capacity, dtype=problem.capacity.dtype)]),
+        cost=np.concatenate([problem.cost, np.asarray(cost, dtype=problem.cost.dtype)]),
+        route_depot=(np.concatenate([problem.route_depot, np.asarray(route_depot, dtype=problem.route_depot.dtype)])
+                     if problem.route_depot is not None else None),
+    )
+
+
+def depot_location(problem: ProblemInstance) -> Tuple[float, float]:
+    """The warehouse, or the centroid of the demand cities without one."""
+    warehouse = problem.warehouse
+    if warehouse and warehouse.get("lat") is not None and warehouse.get("long") is not None:
+        return float(warehouse["lat"]), float(warehouse["long"])
+    points = problem.coordinates()[:problem.num_demand_cities]
+    return float(points[:, 0].mean()), float(points[:, 1].mean())
+
+
+def generate_routes(problem: ProblemInstance, max_route_km: Optional[float] = None, max_iterations: int = 20,
+                    columns_per_iteration: int = 200, time_budget: float = 60.0,
+                    network: Optional[DistanceNetwork] = None) -> Tuple[ProblemInstance, RouteGenerationReport]:
+    """Add generated routes to ``problem`` by column generation.
+
+    Seeds with Clarke-Wright savings routes from the depot (for every truck
+    type), then alternates solving the LP relaxation of the covering model
+    with pricing new routes against its demand duals, until no route prices
+    out, ``max_iterations`` or ``time_budget`` seconds. The given routes stay
+    candidates; the integer solve is left to the caller. Generated routes are
+    costed with ``fit_truck_models``, so the problem needs coordinates for
+    its demand cities and at least one existing option per truck type used.
+    Tour lengths come from ``network`` when given (``DistanceNetwork.for_problem``).
+    """
+    started = time.monotonic()
+    report = RouteGenerationReport()
+    demand = problem.demand.astype(float)
+    lat = problem.lat[:problem.num_demand_cities]
+    long = problem.long[:problem.num_demand_cities]
+    missing = [problem.city_names[c] for c in np.flatnonzero((demand > 0) & (np.isnan(lat) | np.isnan(long)))]
+    if missing:
+        raise ValueError(f"Route generation needs coordinates for every city with demand; missing: "
+                         f"{', '.join(map(str, missing[:10]))}")
+    if problem.num_options == 0:
+        raise ValueError("Route generation needs at least one route/truck option to cost new routes from")
+
+    max_route_km = max_route_km if max_route_km is not None else math.inf
+    geo = _Geometry(problem, network)
+    trucks = fit_truck_models(problem, geo)
+    cities = np.flatnonzero(demand > 0)
+    neighbors = geo.neighbors(cities)
+
+    seen: Set[Tuple[frozenset, int]] = set()
+    ptr = problem.route_city_ptr.tolist()
+    idx = problem.route_city_idx.tolist()
+    for r, t in zip(problem.option_route.tolist(), problem.option_truck.tolist()):
+        seen.add((frozenset(idx[ptr[r]:ptr[r + 1]]), t))
+
+    largest = max(truck.capacity for truck in trucks.values())
+    seed_columns = []
+    for route in savings_routes(demand, geo, largest, max_route_km, neighbors):
+        types = [t for t in trucks if (frozenset(route), t) not in seen]
+        seen.update((frozenset(route), t) for t in types)
+        if types:
+            seed_columns.append((route, types))
+    report.seed_routes = len(seed_columns)
+    original_routes = len(problem.route_names)
+    problem = add_routes(problem, seed_columns, geo, trucks, 1)
+
+    report.stopped = "iteration_limit"
+    for _ in range(max_iterations):
+        if time.monotonic() - started > time_budget:
+            report.stopped = "time_limit"
+            break
+        status, objective, duals = _lp_duals(problem, geo.city_depot)
+        report.iterations += 1
+        if status != "optimal":
+            report.stopped = "lp_not_optimal"
+            break
+        report.lp_objective = round(objective, 2)
+        columns = price_routes(duals, demand, geo, trucks, max_route_km, neighbors, seen,
+                               seeds=max(columns_per_iteration, 50), limit=columns_per_iteration)
+        if not columns:
+            report.stopped = "no_improving_route"
+            break
+        problem = add_routes(problem, [(cities_on_route, [t]) for cities_on_route, t, _ in columns], geo, trucks,
+                             len(problem.route_names) - original_routes + 1)
+
+    report.generated_routes = len(problem.route_names) - original_routes
+    report.generated_options = int(np.count_nonzero(problem.option_route >= original_routes))
+    return problem, report
@@ -0,0 +1,143 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from model_builder import CoveringSolution, Hint, SolverOptions, SolverStats, depot_options, solve_covering
+from problem import ProblemInstance
+
+# Worst status wins when merging component solutions
+_STATUS_ORDER = ("optimal", "feasible", "not_solved", "unbounded", "infeasible")
+
+
+def connected_components(problem: ProblemInstance) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """``(city_ids, option_ids)`` of each independent block of the covering model.
+
+    Cities are linked when a route with at least one truck option serves
+    both of them, or when routes serving them share a capacity-limited
+    warehouse; options follow their route. Demand cities no option can
+    reach form their own option-less block (infeasible unless demand is 0).
+    """
+    parent = list(range(len(problem.city_names)))
+
+    def find(c: int) -> int:
+        while parent[c] != c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    option_route = problem.option_route.tolist()
+    for r in dict.fromkeys(option_route):
+        cities = problem.route_city_ids(r).tolist()
+        if cities:
+            root = find(cities[0])
+            for c in cities[1:]:
+                other = find(c)
+                if other != root:
+                    parent[other] = root
+    for options in depot_options(problem).values():
+        # One stop per route is enough: each route's stops are already linked
+        firsts = [int(cities[0]) for cities in (problem.route_city_ids(option_route[o]) for o in options) if len(cities)]
+        for c in firsts[1:]:
+            root, other = find(firsts[0]), find(c)
+            if other != root:
+                parent[other] = root
+
+    blocks = {}
+    for o, r in enumerate(option_route):
+        cities = problem.route_city_ids(r)
+        key = ("city", find(int(cities[0]))) if len(cities) else ("route", r)
+        blocks.setdefault(key, ([], []))[1].append(o)
+    for r in dict.fromkeys(option_route):
+        for c in problem.route_city_ids(r).tolist():
+            blocks[("city", find(c))][0].append(c)
+    for c in range(problem.num_demand_cities):
+        if ("city", find(c)) not in blocks and problem.demand[c] > 0:
+            blocks[("city", c)] = ([c], [])
+
+    return [
+        (np.unique(np.asarray(cities, dtype=np.int64)), np.asarray(options, dtype=np.int64))
+        for cities, options in blocks.values()
+    ]
+
+
+def merge_solutions(problem: ProblemInstance, option_maps: List[np.ndarray], city_maps: List[np.ndarray],
+                    solutions: List[CoveringSolution]) -> CoveringSolution:
+    """Scatter component solutions back to the full problem's ids.
+
+    ``option_maps[i]`` and ``city_maps[i]`` give the full-problem id of each
+    local option and city id of component ``i``.
+    """
+    status = max((solution.status for solution in solutions), key=_STATUS_ORDER.index, default="optimal")
+    stats = SolverStats.combined([solution.stats for solution in solutions])
+    y_cities: List[List[int]] = [[] for _ in range(problem.num_options)]
+    if status not in ("optimal", "feasible"):
+        return CoveringSolution(status, None, None, [], [], y_cities, stats)
+
+    x_values = [0.0] * problem.num_options
+    y_values: List[List[float]] = [[] for _ in range(problem.num_options)]
+    for option_map, city_map, solution in zip(option_maps, city_maps, solutions):
+        for local, o in enumerate(option_map.tolist()):
+            x_values[o] = solution.x_values[local]
+            y_cities[o] = city_map[solution.y_cities[local]].tolist()
+            y_values[o] = solution.y_values[local]
+    objective = sum(solution.objective for solution in solutions)
+    bound = sum(solution.bound for solution in solutions)
+    return CoveringSolution(status, objective, bound, x_values, y_values, y_cities, stats)
+
+
+def _solve_batch(subproblems: List[ProblemInstance], options: SolverOptions,
+                 hint: Optional[Hint]) -> List[CoveringSolution]:
+    # Components of one worker share its time limit, in proportion to their count
+    deadline = time.monotonic() + options.time_limit if options.time_limit is not None else None
+    solutions = []
+    for i, subproblem in enumerate(subproblems):
+        component_options = options
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.01)
+            component_options = replace(options, time_limit=remaining / (len(subproblems) - i))
+        solutions.append(solve_covering(subproblem, component_options, hint))
+    return solutions
+
+
+def solve_decomposed(problem: ProblemInstance, options: Optional[SolverOptions] = None,
+                     hint: Optional[Hint] = None, max_workers: int = 1) -> Tuple[CoveringSolution, int]:
+    """Solve each independent block separately and merge the results.
+
+    Blocks are spread over up to ``max_workers`` processes, largest first,
+    each worker solving its share in sequence. With a single block or a
+    single worker the whole model is solved in place, since SCIP's own
+    component presolve beats solving the blocks one after another.
+    Returns the merged solution and the number of blocks.
+    """
+    options = options or SolverOptions()
+    components = connected_components(problem)
+    if len(components) <= 1 or max_workers <= 1:
+        return solve_covering(problem, options, hint), len(components)
+
+    subproblems = [problem.subproblem(option_ids, city_ids) for city_ids, option_ids in components]
+    city_maps = [np.concatenate([city_ids[city_ids < problem.num_demand_cities],
+                                 city_ids[city_ids >= problem.num_demand_cities]])
+                 for city_ids, _ in components]
+
+    workers = min(max_workers, len(components))
+    bins: List[List[int]] = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for i in sorted(range(len(components)), key=lambda i: -subproblems[i].num_options):
+        target = loads.index(min(loads))
+        bins[target].append(i)
+        loads[target] += subproblems[i].num_options + 1
+
+    solutions: List[Optional[CoveringSolution]] = [None] * len(components)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context()) as executor:
+        futures = [executor.submit(_solve_batch, [subproblems[i] for i in members], options, hint)
+                   for members in bins]
+        for members, future in zip(bins, futures):
+            for i, solution in zip(members, future.result()):
+                solutions[i] = solution
+
+    option_maps = [option_ids for _, option_ids in components]
+    return merge_solutions(problem, option_maps, city_maps, solutions), len(components)
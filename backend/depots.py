@@ -0,0 +1,154 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sequencing import EARTH_RADIUS_KM
+
+# Query rows per block in the brute-force fallback, bounding its memory
+_BLOCK = 4096
+
+
+def unit_vectors(lat: np.ndarray, long: np.ndarray) -> np.ndarray:
+    """(n, 3) points on the unit sphere; chord length between them grows with great-circle distance."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    long = np.radians(np.asarray(long, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(long), cos_lat * np.sin(long), np.sin(lat)])
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2, 0.0, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * float(np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2))
+
+
+class SpatialIndex:
+    """Nearest-neighbour and radius queries over lat/long points.
+
+    Points are indexed as 3D unit vectors, so queries are exact great-circle
+    ones with no special cases at the antimeridian or the poles. Uses
+    scipy's ``cKDTree`` when scipy is installed and a blocked numpy scan
+    otherwise, which is as fast for the handful of points a warehouse list
+    has. Points with unknown (NaN) coordinates are never returned.
+    """
+
+    def __init__(self, lat: Sequence[float], long: Sequence[float]):
+        vectors = unit_vectors(lat, long)
+        self.ids = np.flatnonzero(np.isfinite(vectors).all(axis=1))
+        self.vectors = vectors[self.ids]
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            self._tree = None
+        else:
+            self._tree = cKDTree(self.vectors) if len(self.ids) else None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nearest(self, lat: Sequence[float], long: Sequence[float], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """``(km, ids)`` of the ``k`` nearest indexed points to each query point, nearest first.
+
+        Both arrays are (n, k); rows of queries without coordinates, and
+        columns beyond the number of indexed points, hold ``inf`` and -1.
+        """
+        queries = unit_vectors(lat, long)
+        km = np.full((len(queries), k), np.inf)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        valid = np.flatnonzero(np.isfinite(queries).all(axis=1))
+        found = min(k, len(self.ids))
+        if found == 0 or len(valid) == 0:
+            return km, ids
+
+        if self._tree is not None:
+            chord, local = self._tree.query(queries[valid], k=found)
+            chord, local = chord.reshape(len(valid), found), local.reshape(len(valid), found)
+        else:
+            chord = np.empty((len(valid), found))
+            local = np.empty((len(valid), found), dtype=np.int64)
+            for start in range(0, len(valid), _BLOCK):
+                block = queries[valid[start:start + _BLOCK]]
+                # |a - b|^2 = 2 - 2 a.b on the unit sphere
+                squared = np.maximum(2.0 - 2.0 * (block @ self.vectors.T), 0.0)
+                if found < len(self.ids):
+                    part = np.argpartition(squared, found - 1, axis=1)[:, :found]
+                else:
+                    part = np.broadcast_to(np.arange(found), (len(block), found))
+                rows = np.take_along_axis(squared, part, axis=1)
+                order = rows.argsort(axis=1, kind="stable")
+                local[start:start + len(block)] = np.take_along_axis(part, order, axis=1)
+                chord[start:start + len(block)] = np.sqrt(np.take_along_axis(rows, order, axis=1))
+        km[valid, :found] = chord_to_km(chord)
+        ids[valid, :found] = self.ids[local]
+        return km, ids
+
+    def within(self, lat: float, long: float, radius_km: float) -> np.ndarray:
+        """Ids of the indexed points within ``radius_km`` of one point, nearest first."""
+        query = unit_vectors([lat], [long])[0]
+        if not np.isfinite(query).all() or len(self.ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        radius = km_to_chord(radius_km)
+        if self._tree is not None:
+            local = np.asarray(self._tree.query_ball_point(query, radius + 1e-12), dtype=np.int64)
+        else:
+            local = np.flatnonzero(np.linalg.norm(self.vectors - query, axis=1) <= radius + 1e-12)
+        distance = np.linalg.norm(self.vectors[local] - query, axis=1)
+        return self.ids[local[np.argsort(distance, kind="stable")]]
+
+
+def read_warehouses(warehouse_df: Any) -> List[Dict[str, Any]]:
+    """Rows of a Warehouse table as ``{"name", "lat", "long", "capacity"}`` dicts.
+
+    ``capacity`` (optional column) caps the total quantity delivered from a
+    warehouse; it is None when the column or the cell is empty.
+    """
+    import pandas as pd
+
+    rows = warehouse_df.dropna(subset=["warehouse"])
+    capacity = (pd.to_numeric(rows["capacity"], errors="coerce") if "capacity" in rows.columns
+                else pd.Series(np.nan, index=rows.index))
+    return [
+        {"name": name, "lat": float(lat), "long": float(long), "capacity": None if pd.isna(cap) else float(cap)}
+        for name, lat, long, cap in zip(rows["warehouse"].tolist(), rows["lat"].tolist(), rows["long"].tolist(),
+                                        capacity.tolist())
+    ]
+
+
+def warehouse_index(warehouses: List[Dict[str, Any]]) -> SpatialIndex:
+    return SpatialIndex([w.get("lat", np.nan) for w in warehouses], [w.get("long", np.nan) for w in warehouses])
+
+
+def assign_cities(warehouses: List[Dict[str, Any]], lat: np.ndarray, long: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest warehouse id and distance (km) of each city; -1 and inf without coordinates."""
+    km, ids = warehouse_index(warehouses).nearest(lat, long)
+    return ids[:, 0], km[:, 0]
+
+
+def assign_routes(warehouses: List[Dict[str, Any]], lat: np.ndarray, long: np.ndarray,
+                  route_city_ptr: np.ndarray, route_city_idx: np.ndarray) -> np.ndarray:
+    """Warehouse id of each route: the one nearest to most of its stops.
+
+    Ties go to the lower warehouse id; routes without any located stop get
+    warehouse 0.
+    """
+    n_routes = len(route_city_ptr) - 1
+    city_depot, _ = assign_cities(warehouses, lat, long)
+    stop_route = np.repeat(np.arange(n_routes), np.diff(route_city_ptr))
+    stop_depot = city_depot[route_city_idx]
+    located = stop_depot >= 0
+    keys, counts = np.unique(stop_route[located] * len(warehouses) + stop_depot[located], return_counts=True)
+    routes, depots = keys // len(warehouses), keys % len(warehouses)
+    # Per route, most stops first, then lowest warehouse id (np.unique sorted keys by it)
+    order = np.lexsort((-counts, routes))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = routes[order][1:] != routes[order][:-1]
+    route_depot = np.zeros(n_routes, dtype=np.int32)
+    route_depot[routes[order][first]] = depots[order][first]
+    return route_depot
+
+
+def depot_capacities(warehouses: Optional[List[Dict[str, Any]]]) -> List[Optional[float]]:
+    """Capacity of each warehouse, None where unlimited."""
+    return [w.get("capacity") for w in warehouses or []]
@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from problem import ProblemInstance
+from sequencing import haversine_between
+
+MATRIX_SUFFIX = ".f32"
+# Rows computed at a time when filling a stored matrix, bounding peak memory
+_ROW_BLOCK = 256
+
+
+class HaversineProvider:
+    """Great-circle kilometres between coordinates; the default provider.
+
+    A provider has a ``key`` naming its distances and ``rows(labels, points,
+    rows)``, the distances from ``points[rows]`` to every point.
+    """
+
+    key = "haversine"
+
+    def rows(self, labels: Sequence[Hashable], points: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return haversine_between(points[rows], points)
+
+
+class MatrixFileProvider:
+    """Precomputed (e.g. road) distances between named locations, loaded from a file.
+
+    ``.npz`` files hold a ``labels`` array and a square ``matrix``; ``.csv``
+    files are a square table with the labels as header row and first
+    column. Pairs involving a label the file does not list fall back to
+    great-circle distance. The file is read on first use, and its content
+    hash is part of the store key, so replacing the file invalidates
+    matrices built from the old one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.key = f"file:{hashlib.sha256(f.read()).hexdigest()[:32]}"
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, int]] = None
+        self._matrix: Optional[np.ndarray] = None
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._matrix is not None:
+                return
+            if self.path.endswith(".npz"):
+                with np.load(self.path, allow_pickle=False) as data:
+                    labels, matrix = data["labels"].tolist(), np.asarray(data["matrix"], dtype=np.float32)
+            else:
+                import pandas as pd
+
+                frame = pd.read_csv(self.path, index_col=0)
+                frame = frame.loc[:, [str(label) for label in frame.index]]
+                labels, matrix = frame.index.tolist(), frame.to_numpy(dtype=np.float32)
+            if matrix.shape != (len(labels), len(labels)):
+                raise ValueError(f"Distance matrix in {self.path} is {matrix.shape}, expected a square one per label")
+            self._index = {str(label): i for i, label in enumerate(labels)}
+            self._matrix = matrix
+
+    def rows(self, labels: Sequence[Hashable], points: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        self._load()
+        ids = np.asarray([self._index.get(str(label), -1) for label in labels], dtype=np.int64)
+        known = ids >= 0
+        if known.all():
+            return self._matrix[np.ix_(ids[rows], ids)]
+        if rows[0] == 0:
+            logging.warning(f"{np.count_nonzero(~known)} locations are missing from {self.path}; "
+                            f"using great-circle distances for them")
+        result = haversine_between(points[rows], points).astype(np.float32)
+        row_known = known[rows]
+        result[np.ix_(row_known, known)] = self._matrix[np.ix_(ids[rows][row_known], ids[known])]
+        return result
+
+
+def provider_matrix(provider, labels: Sequence[Hashable], points: np.ndarray) -> np.ndarray:
+    """The whole (n, n) matrix of ``provider`` over ``points``."""
+    return np.asarray(provider.rows(labels, points, np.arange(len(points))), dtype=np.float32)
+
+
+class DistanceStore:
+    """Distance matrices persisted as float32 memory-mapped files, shared across processes.
+
+    A matrix is keyed by the provider and the ordered labels and coordinates
+    it covers, written once (atomically) under ``directory`` and opened
+    read-only with ``np.memmap`` afterwards, so solver workers reading the
+    same network share the page cache instead of copies. Files are evicted
+    least recently used first once they total more than ``max_bytes``;
+    a matrix larger than that on its own is computed without being stored.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, provider=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.provider = provider or HaversineProvider()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, labels: Sequence[Hashable], points: np.ndarray) -> str:
+        digest = hashlib.sha256(self.provider.key.encode("utf-8"))
+        digest.update("\x1f".join(str(label) for label in labels).encode("utf-8"))
+        digest.update(np.ascontiguousarray(points, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def matrix(self, labels: Sequence[Hashable], points: np.ndarray) -> np.ndarray:
+        """(n, n) float32 distances between ``points`` (lat/long rows named by ``labels``)."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = len(points)
+        if n == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        if n * n * 4 > self.max_bytes:
+            return provider_matrix(self.provider, labels, points)
+
+        path = self.directory / f"{self.key(labels, points)}{MATRIX_SUFFIX}"
+        try:
+            stored = np.memmap(path, dtype=np.float32, mode="r", shape=(n, n))
+        except (FileNotFoundError, ValueError):
+            stored = None
+        if stored is not None:
+            self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return stored
+
+        self.misses += 1
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Filled in row blocks and renamed into place, so readers never see a partial matrix
+            matrix = np.memmap(partial, dtype=np.float32, mode="w+", shape=(n, n))
+            for start in range(0, n, _ROW_BLOCK):
+                rows = np.arange(start, min(start + _ROW_BLOCK, n))
+                matrix[rows] = self.provider.rows(labels, points, rows)
+            matrix.flush()
+            del matrix
+            os.replace(partial, path)
+        except OSError as e:
+            logging.warning(f"Could not store distance matrix {path.name}: {e}")
+            partial.unlink(missing_ok=True)
+            return provider_matrix(self.provider, labels, points)
+        self.evict(keep=path)
+        return np.memmap(path, dtype=np.float32, mode="r", shape=(n, n))
+
+    def evict(self, keep: Optional[Path] = None) -> List[str]:
+        """Delete least recently used matrices until the rest fit in ``max_bytes``."""
+        entries = []
+        for path in self.directory.glob(f"*{MATRIX_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        # Open memmaps of a deleted file stay valid until they are closed
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.append(path.name)
+        return removed
+
+
+class DistanceNetwork:
+    """Distances among a problem's warehouses and cities, read through a ``DistanceStore``.
+
+    Row ``i`` of the network is warehouse ``i`` for ``i < num_depots`` and
+    city ``i - num_depots`` after that. The whole matrix is only built (and
+    stored) when ``matrix`` is first read, e.g. by route generation;
+    until then ``submatrix`` computes just the rows asked for from the
+    provider.
+    """
+
+    def __init__(self, store: DistanceStore, labels: Sequence[Hashable], points: np.ndarray, num_depots: int):
+        self.store = store
+        self.labels = list(labels)
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.num_depots = num_depots
+        # Depots placed at 0, 0 for lack of coordinates are not located
+        self.depot_located = [True] * num_depots
+        self._matrix: Optional[np.ndarray] = None
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        """The whole stored matrix, or None when it is too large to keep."""
+        n = len(self.points)
+        if self._matrix is None and n * n * 4 <= self.store.max_bytes:
+            self._matrix = self.store.matrix(self.labels, self.points)
+        return self._matrix
+
+    @classmethod
+    def for_problem(cls, store: DistanceStore, problem: ProblemInstance,
+                    warehouses: Optional[List[Dict[str, Any]]] = None) -> "DistanceNetwork":
+        """The network of ``problem``'s cities and ``warehouses`` (default: its own).
+
+        Locations without coordinates sit at 0, 0, as in ``coordinates()``.
+        """
+        if warehouses is None:
+            warehouses = problem.warehouses or ([problem.warehouse] if problem.warehouse else [])
+        depot_points = np.asarray([[w.get("lat"), w.get("long")] for w in warehouses], dtype=float).reshape(-1, 2)
+        located = np.isfinite(depot_points).all(axis=1).tolist()
+        depot_points = np.nan_to_num(depot_points, nan=0.0, posinf=0.0, neginf=0.0)
+        labels = [w.get("name") for w in warehouses] + list(problem.city_names)
+        network = cls(store, labels, np.vstack([depot_points, problem.coordinates()]), len(warehouses))
+        network.depot_located = located
+        return network
+
+    def submatrix(self, rows: Sequence[int]) -> np.ndarray:
+        """Float64 distances among network ``rows``, in that order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self._matrix is not None:
+            return np.asarray(self._matrix[np.ix_(rows, rows)], dtype=float)
+        return provider_matrix(self.store.provider, [self.labels[i] for i in rows.tolist()],
+                               self.points[rows]).astype(float)
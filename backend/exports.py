@@ -0,0 +1,105 @@
+import csv
+import io
+import numbers
+from typing import Any, Dict, Iterable, Iterator, List
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+ROUTE_COLUMNS = ["Route ID", "Truck Type", "Trucks Used", "Capacity", "Cost per Truck", "Total Cost",
+                 "Total Delivered", "Capacity Utilization %"]
+DELIVERY_COLUMNS = ["Route ID", "Truck Type", "City", "Quantity Delivered", "City Demand"]
+
+# Tabular sheets that can also be exported on their own as CSV/Parquet
+TABLES = {
+    "routes": ROUTE_COLUMNS,
+    "deliveries": DELIVERY_COLUMNS,
+}
+
+
+def summary_rows(result: Dict[str, Any]) -> Iterator[List[Any]]:
+    for key, value in result.get("summary_metrics", {}).items():
+        # Nested values (e.g. reports) do not fit a single cell
+        if value is None or isinstance(value, (str, bool, numbers.Number)):
+            yield [key.replace("_", " ").title(), value]
+
+
+def route_rows(result: Dict[str, Any]) -> Iterator[List[Any]]:
+    for route in result.get("routes_selected", []):
+        yield [route["route_id"], route["truck_type"], route["trucks_used"], route["capacity"],
+               route["cost_per_truck"], route["total_cost"], route["total_delivered"], route["capacity_utilization"]]
+
+
+def delivery_rows(result: Dict[str, Any]) -> Iterator[List[Any]]:
+    for route in result.get("routes_selected", []):
+        for city_data in route["cities_delivered"]:
+            yield [route["route_id"], route["truck_type"], city_data["city"], city_data["quantity"], city_data["demand"]]
+
+
+def table_rows(result: Dict[str, Any], table: str) -> Iterator[List[Any]]:
+    return route_rows(result) if table == "routes" else delivery_rows(result)
+
+
+def write_workbook(result: Dict[str, Any]) -> io.BytesIO:
+    """Summary / Routes / City Deliveries workbook in an in-memory buffer.
+
+    Uses xlsxwriter's ``constant_memory`` mode: each row is flushed as it is
+    written, so worksheet memory stays flat however many rows there are.
+    """
+    import xlsxwriter
+
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True})
+    for name, header, rows in (
+        ("Summary", ["Metric", "Value"], summary_rows(result)),
+        ("Routes", ROUTE_COLUMNS, route_rows(result)),
+        ("City Deliveries", DELIVERY_COLUMNS, delivery_rows(result)),
+    ):
+        sheet = workbook.add_worksheet(name)
+        sheet.write_row(0, 0, header)
+        for row, values in enumerate(rows, start=1):
+            sheet.write_row(row, 0, values)
+    workbook.close()
+    buffer.seek(0)
+    return buffer
+
+
+def iter_buffer(buffer: io.BytesIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    while True:
+        chunk = buffer.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def iter_csv(header: List[str], rows: Iterable[List[Any]], batch_rows: int = 1000) -> Iterator[str]:
+    """CSV text in batches of rows, so large tables stream without being built whole."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % batch_rows == 0:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue()
+
+
+def write_parquet(header: List[str], rows: Iterable[List[Any]]) -> io.BytesIO:
+    # Imported on first export; ImportError tells the caller Parquet is unavailable on a slim install
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def column(values):
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed id types (e.g. numeric and text route ids) are stored as text
+            return pa.array([None if v is None else str(v) for v in values])
+
+    columns = list(zip(*rows)) or [()] * len(header)
+    table = pa.table({name: column(list(values)) for name, values in zip(header, columns)})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    buffer.seek(0)
+    return buffer
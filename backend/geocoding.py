@@ -0,0 +1,232 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+Coords = Tuple[float, float]
+
+_MISSING = object()
+
+
+def normalize_city_name(city_name: str) -> str:
+    return " ".join(str(city_name).split()).casefold()
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """``RateLimiter`` whose next free slot lives in a SQLite file.
+
+    Every process opening the same ``path`` draws from one budget, so batch
+    parses geocoding in separate solver worker processes still stay under
+    the provider's limit. Slots are wall-clock times, which all processes
+    on the host share.
+    """
+
+    def __init__(self, path: str, rate: float, name: str = "provider"):
+        super().__init__(rate)
+        self.path = path
+        self.name = name
+        self._pid = None
+        self._conn = None
+        with self._lock:
+            conn = self._connection()
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, next_slot REAL NOT NULL)")
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Autocommit, so wait() controls the transaction itself
+            self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False, isolation_level=None)
+            self._pid = os.getpid()
+        return self._conn
+
+    def wait(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front, so no other process can
+            # read the same slot between our read and write
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT next_slot FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+                now = time.time()
+                slot = max(now, row[0] if row else 0.0)
+                conn.execute("INSERT OR REPLACE INTO rate_limits (name, next_slot) VALUES (?, ?)",
+                             (self.name, slot + self.interval))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SQLiteGeocodeStore:
+    """Persistent city -> coordinates cache; ``None`` records a known miss.
+
+    The connection is reopened after a fork, so parsing inside solver worker
+    processes never shares a SQLite handle with the parent.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn = None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "city TEXT PRIMARY KEY, lat REAL, long REAL, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[Coords]]:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT city, lat, long FROM geocodes WHERE city IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for city, lat, long in rows:
+                    found[city] = (lat, long) if lat is not None else None
+        return found
+
+    def put(self, key: str, coords: Optional[Coords]) -> None:
+        lat, long = coords if coords else (None, None)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO geocodes (city, lat, long, updated_at) VALUES (?, ?, ?, ?)",
+                (key, lat, long, time.time())
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+
+class CachedGeocoder:
+    """Geocoding layer: in-process LRU -> persistent store -> provider.
+
+    ``provider`` is any geopy-style object with ``geocode(query)`` returning
+    something with ``latitude``/``longitude`` (or ``None``), so tests can
+    pass a local stub. Cache misses are looked up concurrently on up to
+    ``max_workers`` threads, throttled to ``rate_limit`` requests per second.
+    With a ``store`` the limit is kept in the store's file and shared by every
+    process using it; without one it only holds within this process.
+    """
+
+    def __init__(self, provider, store: Optional[SQLiteGeocodeStore] = None, query_format: str = "{}",
+                 lru_size: int = 4096, max_workers: int = 4, rate_limit: float = 1.0):
+        self.provider = provider
+        self.store = store
+        self.query_format = query_format
+        self.lru_size = lru_size
+        self.max_workers = max(1, max_workers)
+        self._lru: "OrderedDict[str, Optional[Coords]]" = OrderedDict()
+        self._lru_lock = threading.Lock()
+        if store is not None and rate_limit > 0:
+            self._rate_limiter = SQLiteRateLimiter(store.path, rate_limit)
+        else:
+            self._rate_limiter = RateLimiter(rate_limit)
+
+    def set_provider(self, provider) -> None:
+        self.provider = provider
+
+    def geocode(self, city_name: str) -> Optional[Coords]:
+        return self.geocode_many([city_name]).get(city_name)
+
+    def geocode_many(self, city_names: Iterable[str]) -> Dict[str, Coords]:
+        """Return coordinates for every city that could be resolved."""
+        keys = {city: normalize_city_name(city) for city in city_names}
+        resolved: Dict[str, Optional[Coords]] = {}
+
+        pending = []
+        for key in dict.fromkeys(keys.values()):
+            cached = self._lru_get(key)
+            if cached is _MISSING:
+                pending.append(key)
+            else:
+                resolved[key] = cached
+
+        if pending and self.store is not None:
+            for key, coords in self.store.get_many(pending).items():
+                resolved[key] = coords
+                self._lru_put(key, coords)
+            pending = [key for key in pending if key not in resolved]
+
+        if pending:
+            originals = {}
+            for city, key in keys.items():
+                originals.setdefault(key, city)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                looked_up = executor.map(lambda key: self._lookup(originals[key]), pending)
+                for key, (ok, coords) in zip(pending, looked_up):
+                    resolved[key] = coords
+                    if ok:
+                        self._lru_put(key, coords)
+                        if self.store is not None:
+                            self.store.put(key, coords)
+
+        return {city: resolved[key] for city, key in keys.items() if resolved.get(key)}
+
+    def _lookup(self, city_name: str) -> Tuple[bool, Optional[Coords]]:
+        self._rate_limiter.wait()
+        try:
+            location = self.provider.geocode(self.query_format.format(city_name))
+        except Exception as e:
+            # Provider errors are not cached so the city is retried next time
+            logging.warning(f"Geocoding failed for {city_name}: {e}")
+            return False, None
+        if location:
+            return True, (location.latitude, location.longitude)
+        return True, None
+
+    def _lru_get(self, key: str):
+        with self._lru_lock:
+            if key not in self._lru:
+                return _MISSING
+            self._lru.move_to_end(key)
+            return self._lru[key]
+
+    def _lru_put(self, key: str, coords: Optional[Coords]) -> None:
+        with self._lru_lock:
+            self._lru[key] = coords
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
@@ -0,0 +1,239 @@
+import io
+import logging
+import zipfile
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from depots import read_warehouses
+from problem import ProblemInstance
+
+# openpyxl, pandas and pyarrow are imported on first parse, not on server start
+if TYPE_CHECKING:
+    import openpyxl
+    import pandas as pd
+
+ExcelSource = Union[str, bytes, BinaryIO]
+
+# Uploads holding one CSV or Parquet file per table instead of a workbook
+TABLE_ARCHIVE_SUFFIXES = (".zip",)
+UPLOAD_SUFFIXES = (".xlsx", ".xls") + TABLE_ARCHIVE_SUFFIXES
+TABLE_FILE_SUFFIXES = (".csv", ".parquet")
+TABLE_NAMES = ("Warehouse", "Cities", "Route_Cities", "Route_TruckTypes")
+REQUIRED_TABLES = ("Cities", "Route_Cities", "Route_TruckTypes")
+REQUIRED_COLUMNS = {
+    "Warehouse": ("warehouse", "lat", "long"),
+    "Cities": ("city", "demand"),
+    "Route_Cities": ("route", "city"),
+    "Route_TruckTypes": ("route", "truck_type", "capacity", "cost"),
+}
+# Columns that must hold numbers where they are present, and those that must be filled in
+NUMERIC_COLUMNS = {
+    "Warehouse": ("lat", "long", "capacity"),
+    "Cities": ("demand", "lat", "long"),
+    "Route_TruckTypes": ("capacity", "cost"),
+}
+FILLED_COLUMNS = {
+    "Cities": ("city", "demand"),
+    "Route_Cities": ("route", "city"),
+    "Route_TruckTypes": ("route", "truck_type", "capacity", "cost"),
+}
+# Offending values quoted per validation error
+_EXAMPLES = 3
+
+
+def _open_workbook(source: ExcelSource) -> "openpyxl.Workbook":
+    import openpyxl
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    return openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+
+
+def _normalize_cell(value: Any) -> Any:
+    # Same coercion pandas' openpyxl reader applies: integral floats become ints
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _sheet_to_frame(worksheet) -> "pd.DataFrame":
+    import pandas as pd
+
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+    width = len(columns)
+    body = [row for row in rows if any(v is not None for v in row)]
+    if not body:
+        return pd.DataFrame(columns=columns)
+    # Build column-wise so pandas infers one dtype per column
+    values = zip(*(row[:width] + (None,) * (width - len(row)) for row in body))
+    return pd.DataFrame({
+        name: [_normalize_cell(v) for v in col] for name, col in zip(columns, values)
+    })
+
+
+def read_excel_sheets(source: ExcelSource, sheet_names: Optional[List[str]] = None) -> Dict[str, "pd.DataFrame"]:
+    """Stream sheets from a path, raw bytes or file object into DataFrames.
+
+    The workbook is opened in openpyxl read-only mode, so rows are decoded
+    lazily instead of materializing the whole workbook; no temp file is needed.
+    """
+    workbook = _open_workbook(source)
+    try:
+        names = workbook.sheetnames if sheet_names is None else [n for n in sheet_names if n in workbook.sheetnames]
+        return {name: _sheet_to_frame(workbook[name]) for name in names}
+    finally:
+        workbook.close()
+
+
+def list_sheet_names(source: ExcelSource) -> List[str]:
+    workbook = _open_workbook(source)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def is_table_archive(filename: Optional[str]) -> bool:
+    return bool(filename) and filename.lower().endswith(TABLE_ARCHIVE_SUFFIXES)
+
+
+def _read_table_file(member: BinaryIO, suffix: str) -> "pd.DataFrame":
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(io.BytesIO(member.read())).to_pandas()
+    try:
+        from pyarrow import csv
+    except ImportError:
+        import pandas as pd
+
+        return pd.read_csv(member)
+    # Empty cells are missing values, as in pandas' reader
+    return csv.read_csv(member, convert_options=csv.ConvertOptions(strings_can_be_null=True)).to_pandas()
+
+
+def read_table_archive(source: ExcelSource) -> Dict[str, "pd.DataFrame"]:
+    """Read the tables of a zip holding one ``<Table>.csv`` or ``<Table>.parquet`` file each.
+
+    Tables are matched by file name (any folder, any case) against
+    ``TABLE_NAMES``; other files are ignored. Files are read column-wise
+    with pyarrow (CSV falls back to pandas' C reader without it) and
+    checked with ``validate_tables``. Raises ValueError on a bad archive
+    or invalid tables.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    names = {name.lower(): name for name in TABLE_NAMES}
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a zip archive: {e}")
+    tables: Dict[str, "pd.DataFrame"] = {}
+    with archive:
+        for info in archive.infolist():
+            path = PurePosixPath(info.filename)
+            if info.is_dir() or path.name.startswith(".") or "__MACOSX" in path.parts:
+                continue
+            table = names.get(path.stem.lower())
+            if table is None or path.suffix.lower() not in TABLE_FILE_SUFFIXES:
+                continue
+            if table in tables:
+                raise ValueError(f"More than one file holds the {table} table")
+            with archive.open(info) as member:
+                tables[table] = _read_table_file(member, path.suffix.lower())
+    validate_tables(tables)
+    return tables
+
+
+def _examples(values: "pd.Series") -> str:
+    return ", ".join(repr(v) for v in values.drop_duplicates().head(_EXAMPLES).tolist())
+
+
+def validate_tables(tables: Dict[str, "pd.DataFrame"]) -> None:
+    """Check the schema and cross-references of input tables; raises ValueError listing every problem.
+
+    Beyond required tables and columns: key and value cells are filled in,
+    numeric columns hold numbers, city names are unique, every route stop
+    is a city of the Cities table (so it has a demand), and every route
+    offered a truck type has stops.
+    """
+    import pandas as pd
+
+    missing = [name for name in REQUIRED_TABLES if name not in tables]
+    if missing:
+        raise ValueError(f"Missing tables: {', '.join(missing)}. Expected Warehouse (optional), "
+                         f"Cities, Route_Cities, Route_TruckTypes")
+    errors = []
+    for name, frame in tables.items():
+        columns = [c for c in REQUIRED_COLUMNS[name] if c not in frame.columns]
+        if columns:
+            errors.append(f"{name} is missing columns: {', '.join(columns)}")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    for name, frame in tables.items():
+        for column in FILLED_COLUMNS.get(name, ()):
+            count = int(frame[column].isna().sum())
+            if count:
+                errors.append(f"{name}: {count} rows without a {column}")
+        for column in NUMERIC_COLUMNS.get(name, ()):
+            if column in frame.columns and not pd.api.types.is_numeric_dtype(frame[column]):
+                values = frame[column]
+                bad = values[pd.to_numeric(values, errors="coerce").isna() & values.notna()]
+                if len(bad):
+                    errors.append(f"{name}: {len(bad)} non-numeric {column} values, e.g. {_examples(bad)}")
+
+    cities = tables["Cities"]["city"]
+    duplicated = cities[cities.duplicated() & cities.notna()]
+    if len(duplicated):
+        errors.append(f"Cities: {len(duplicated)} repeated cities, e.g. {_examples(duplicated)}")
+    stops = tables["Route_Cities"]
+    unknown = stops["city"][~stops["city"].isin(cities) & stops["city"].notna()]
+    if len(unknown):
+        errors.append(f"Route_Cities: {len(unknown)} stops at cities not in Cities, e.g. {_examples(unknown)}")
+    routes = tables["Route_TruckTypes"]["route"]
+    empty = routes[~routes.isin(stops["route"]) & routes.notna()]
+    if len(empty):
+        errors.append(f"Route_TruckTypes: {len(empty)} rows for routes without cities, e.g. {_examples(empty)}")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+
+def problem_from_tables(tables: Dict[str, "pd.DataFrame"],
+                        geocode_many: Callable[[List[Any]], Dict[Any, Tuple[float, float]]]) -> ProblemInstance:
+    """Build a ProblemInstance from the Warehouse (optional), Cities, Route_Cities and Route_TruckTypes tables.
+
+    Shared by workbook and table-archive uploads. Without lat/long columns
+    in Cities, cities are located with ``geocode_many``.
+    """
+    # The first warehouse is the default depot
+    warehouses = read_warehouses(tables["Warehouse"]) if "Warehouse" in tables else []
+    for depot in warehouses:
+        logging.info(f"Warehouse found: {depot['name']} at ({depot['lat']}, {depot['long']})")
+
+    cities_df = tables["Cities"]
+    cities = cities_df["city"].tolist()
+    logging.info(f"Parsed {len(cities)} cities")
+
+    if "lat" in cities_df.columns and "long" in cities_df.columns:
+        lat_dict = dict(zip(cities_df["city"], cities_df["lat"]))
+        long_dict = dict(zip(cities_df["city"], cities_df["long"]))
+    else:
+        coords = geocode_many(cities)
+        lat_dict = {city: coords[city][0] for city in cities if city in coords}
+        long_dict = {city: coords[city][1] for city in cities if city in coords}
+
+    warehouse = {
+        "name": warehouses[0]["name"],
+        "lat": warehouses[0]["lat"],
+        "long": warehouses[0]["long"]
+    } if warehouses else None
+
+    problem = ProblemInstance.from_tables(cities_df, tables["Route_Cities"], tables["Route_TruckTypes"],
+                                          lat_dict, long_dict, warehouse, warehouses)
+    logging.info(f"Parsed {len(problem.route_names)} routes and {len(problem.truck_type_names)} truck types")
+    return problem
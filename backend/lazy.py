@@ -0,0 +1,46 @@
+import threading
+from typing import Any, Callable
+
+
+class LazyObject:
+    """Stands in for the object ``factory()`` returns, building it on first attribute access.
+
+    Lets module-level clients (Mongo, geocoder) be declared at import time
+    without paying for their imports or connections until a request needs
+    them. ``resolve(obj)`` returns the real object, for APIs that type-check
+    their arguments.
+    """
+
+    __slots__ = ("_factory", "_value", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _resolve(self) -> Any:
+        if self._factory is not None:
+            with self._lock:
+                if self._factory is not None:
+                    object.__setattr__(self, "_value", self._factory())
+                    object.__setattr__(self, "_factory", None)
+        return self._value
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._resolve()[key]
+
+
+def resolve(obj: Any) -> Any:
+    """The object behind ``obj`` if it is a ``LazyObject``, else ``obj`` itself."""
+    return obj._resolve() if isinstance(obj, LazyObject) else obj
+
+
+def is_resolved(obj: Any) -> bool:
+    """False only for a ``LazyObject`` whose factory has not run yet."""
+    return not isinstance(obj, LazyObject) or obj._factory is None
@@ -0,0 +1,453 @@
+import math
+import time
+from dataclasses import asdict, astuple, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from problem import ProblemInstance
+
+# OR-Tools is imported by the solve paths, so importing the options and
+# solution types does not load the solvers
+if TYPE_CHECKING:
+    from ortools.linear_solver import pywraplp
+
+SCIP = "scip"
+CP_SAT = "cp-sat"
+BACKENDS = (SCIP, CP_SAT)
+
+# Allocations are integral in CP-SAT; fractional demand or capacity is solved in 1/100 units
+FRACTIONAL_ALLOCATION_SCALE = 100
+
+Hint = Dict[Tuple[Hashable, Hashable], Tuple[float, Dict[Hashable, float]]]
+
+
+class CoveringModel:
+    """Route/truck covering MIP built directly on a pywraplp solver.
+
+    ``x[o]`` is the truck count of option ``o`` of the problem; ``y[o]`` holds
+    the allocation variables of that option, one per distinct city id of its
+    route, in ``y_cities[o]`` order. Variables of one option are created
+    contiguously starting at solver index ``offsets[o]`` (x first, then y).
+    ``depot_constraints`` maps each capacity-limited warehouse id to the
+    constraint capping what its routes deliver.
+    """
+
+    def __init__(self, solver: "pywraplp.Solver", x: List["pywraplp.Variable"], y: List[List["pywraplp.Variable"]],
+                 y_cities: List[List[int]], demand_constraints: List["pywraplp.Constraint"],
+                 capacity_constraints: List["pywraplp.Constraint"], offsets: List[int],
+                 depot_constraints: Optional[Dict[int, "pywraplp.Constraint"]] = None):
+        self.solver = solver
+        self.x = x
+        self.y = y
+        self.y_cities = y_cities
+        self.demand_constraints = demand_constraints
+        self.capacity_constraints = capacity_constraints
+        self.offsets = offsets
+        self.depot_constraints = depot_constraints or {}
+
+
+@dataclass
+class SolverOptions:
+    """Backend and stopping criteria for a covering solve.
+
+    ``time_limit`` is in seconds and ``mip_gap`` is a relative gap; either
+    may stop the search with the best solution found so far. ``threads`` is
+    passed to the backend (CP-SAT uses all cores when unset). ``presolve``
+    enables the dominance reductions of ``presolve.presolve``.
+    ``generate_routes`` adds routes by ``column_generation.generate_routes``
+    before solving, each closed depot tour at most ``max_route_km`` long.
+    """
+
+    backend: str = SCIP
+    time_limit: Optional[float] = None
+    mip_gap: Optional[float] = None
+    threads: Optional[int] = None
+    presolve: bool = True
+    generate_routes: bool = False
+    max_route_km: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SolverStats:
+    """Size of the model and effort spent on it; summed over blocks when decomposed.
+
+    ``nodes`` is SCIP's branch-and-bound node count, or CP-SAT's branch count.
+    """
+
+    variables: int = 0
+    constraints: int = 0
+    nodes: int = 0
+    build_seconds: float = 0.0
+    solve_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def combined(cls, stats: List["SolverStats"]) -> "SolverStats":
+        return cls(*(sum(values) for values in zip(*(astuple(s) for s in stats)))) if stats else cls()
+
+
+@dataclass
+class CoveringSolution:
+    """Backend-independent solve outcome, aligned with ``option_cities``.
+
+    ``status`` is ``optimal`` or ``feasible`` when values are available,
+    otherwise ``infeasible``, ``unbounded`` or ``not_solved``.
+    """
+
+    status: str
+    objective: Optional[float]
+    bound: Optional[float]
+    x_values: List[float]
+    y_values: List[List[float]]
+    y_cities: List[List[int]]
+    stats: SolverStats = field(default_factory=SolverStats)
+
+    @property
+    def has_solution(self) -> bool:
+        return self.status in ("optimal", "feasible")
+
+    @property
+    def gap(self) -> Optional[float]:
+        if self.objective is None or self.bound is None or not math.isfinite(self.bound):
+            return None
+        if abs(self.objective - self.bound) < 1e-9:
+            return 0.0
+        return abs(self.objective - self.bound) / max(abs(self.objective), 1e-9)
+
+
+def depot_options(problem: ProblemInstance) -> Dict[int, List[int]]:
+    """Option ids by warehouse id, for the warehouses with a capacity limit."""
+    if problem.route_depot is None:
+        return {}
+    limited = [i for i, w in enumerate(problem.warehouses) if w.get("capacity") is not None]
+    option_depot = problem.route_depot[problem.option_route].tolist()
+    return {depot: [o for o, d in enumerate(option_depot) if d == depot] for depot in limited}
+
+
+def option_cities(problem: ProblemInstance) -> List[List[int]]:
+    """Distinct city ids of each option's route, in route order."""
+    ptr = problem.route_city_ptr.tolist()
+    route_city_idx = problem.route_city_idx.tolist()
+    return [
+        list(dict.fromkeys(route_city_idx[ptr[r]:ptr[r + 1]]))
+        for r in problem.option_route.tolist()
+    ]
+
+
+def build_covering_model(solver: "pywraplp.Solver", problem: ProblemInstance) -> CoveringModel:
+    infinity = solver.infinity()
+    capacity = problem.capacity.tolist()
+    cost = problem.cost.tolist()
+
+    objective = solver.Objective()
+    x = []
+    y = []
+    y_cities = []
+    capacity_constraints = []
+    offsets = []
+    next_index = solver.NumVariables()
+    # Inverted index: per city id, (option, position in that option's y list)
+    city_columns: List[List[Tuple[int, int]]] = [[] for _ in problem.city_names]
+
+    for o, cities_on_route in enumerate(option_cities(problem)):
+        x_var = solver.IntVar(0, infinity, f'x_{o}')
+        objective.SetCoefficient(x_var, cost[o])
+
+        # sum(y[o, c]) - capacity * x[o] <= 0
+        cap_ct = solver.Constraint(-infinity, 0)
+        cap_ct.SetCoefficient(x_var, -capacity[o])
+
+        y_vars = []
+        for j, c in enumerate(cities_on_route):
+            y_var = solver.NumVar(0, infinity, f'y_{o}_{c}')
+            cap_ct.SetCoefficient(y_var, 1)
+            y_vars.append(y_var)
+            city_columns[c].append((o, j))
+
+        offsets.append(next_index)
+        next_index += 1 + len(y_vars)
+        x.append(x_var)
+        y.append(y_vars)
+        y_cities.append(cities_on_route)
+        capacity_constraints.append(cap_ct)
+
+    demand_constraints = []
+    for c, d in enumerate(problem.demand.tolist()):
+        ct = solver.Constraint(d, infinity)
+        for o, j in city_columns[c]:
+            ct.SetCoefficient(y[o][j], 1)
+        demand_constraints.append(ct)
+
+    # sum of y over the options of a warehouse's routes <= its capacity
+    depot_constraints = {}
+    for depot, depot_option_ids in depot_options(problem).items():
+        ct = solver.Constraint(-infinity, problem.warehouses[depot]["capacity"])
+        for o in depot_option_ids:
+            for y_var in y[o]:
+                ct.SetCoefficient(y_var, 1)
+        depot_constraints[depot] = ct
+
+    objective.SetMinimization()
+    return CoveringModel(solver, x, y, y_cities, demand_constraints, capacity_constraints, offsets, depot_constraints)
+
+
+def read_solution(model: CoveringModel) -> Tuple[List[float], List[List[float]]]:
+    """Fetch all variable values in one call instead of one per variable."""
+    from ortools.linear_solver import linear_solver_pb2
+
+    response = linear_solver_pb2.MPSolutionResponse()
+    model.solver.FillSolutionResponseProto(response)
+    values = list(response.variable_value)
+    x_values = [values[offset] for offset in model.offsets]
+    y_values = [values[offset + 1:offset + 1 + len(y_vars)] for offset, y_vars in zip(model.offsets, model.y)]
+    return x_values, y_values
+
+
+def set_solution_hint(model: CoveringModel, problem: ProblemInstance, hint: Hint) -> None:
+    """Give the solver a MIP start from a previous solution.
+
+    ``hint`` maps ``(route, truck_type)`` to ``(trucks_used, {city: quantity})``;
+    options and cities missing from it are hinted at zero.
+    """
+    variables = []
+    values = []
+    for o in range(problem.num_options):
+        trucks, quantities = hint.get(problem.option_key(o), (0, {}))
+        variables.append(model.x[o])
+        values.append(float(trucks))
+        for c, y_var in zip(model.y_cities[o], model.y[o]):
+            variables.append(y_var)
+            values.append(float(quantities.get(problem.city_names[c], 0.0)))
+    model.solver.SetHint(variables, values)
+
+
+def _mip_status(code: int) -> str:
+    from ortools.linear_solver import pywraplp
+
+    return {
+        pywraplp.Solver.OPTIMAL: "optimal",
+        pywraplp.Solver.FEASIBLE: "feasible",
+        pywraplp.Solver.INFEASIBLE: "infeasible",
+        pywraplp.Solver.UNBOUNDED: "unbounded",
+    }.get(code, "not_solved")
+
+
+def _cp_sat_status(code: int) -> str:
+    from ortools.sat.python import cp_model
+
+    return {
+        cp_model.OPTIMAL: "optimal",
+        cp_model.FEASIBLE: "feasible",
+        cp_model.INFEASIBLE: "infeasible",
+    }.get(code, "not_solved")
+
+
+def solve_covering(problem: ProblemInstance, options: Optional[SolverOptions] = None,
+                   hint: Optional[Hint] = None) -> CoveringSolution:
+    """Solve the covering problem with the backend named in ``options``."""
+    options = options or SolverOptions()
+    if options.backend == SCIP:
+        return _solve_scip(problem, options, hint)
+    if options.backend == CP_SAT:
+        return _solve_cp_sat(problem, options, hint)
+    raise ValueError(f"Unknown solver backend: {options.backend}")
+
+
+def _solve_scip(problem: ProblemInstance, options: SolverOptions, hint: Optional[Hint]) -> CoveringSolution:
+    from ortools.linear_solver import pywraplp
+
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    if not solver:
+        raise RuntimeError("SCIP solver not available")
+
+    started = time.perf_counter()
+    model = build_covering_model(solver, problem)
+    if hint:
+        set_solution_hint(model, problem, hint)
+    stats = SolverStats(variables=solver.NumVariables(), constraints=solver.NumConstraints(),
+                        build_seconds=time.perf_counter() - started)
+    return _run_scip(model, _scip_parameters(solver, options), stats)
+
+
+def _scip_parameters(solver: "pywraplp.Solver", options: SolverOptions) -> "pywraplp.MPSolverParameters":
+    from ortools.linear_solver import pywraplp
+
+    if options.time_limit is not None:
+        solver.SetTimeLimit(int(options.time_limit * 1000))
+    if options.threads is not None:
+        solver.SetNumThreads(options.threads)
+    params = pywraplp.MPSolverParameters()
+    if options.mip_gap is not None:
+        params.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, options.mip_gap)
+    return params
+
+
+def _run_scip(model: CoveringModel, params: "pywraplp.MPSolverParameters", stats: SolverStats) -> CoveringSolution:
+    solver = model.solver
+    started = time.perf_counter()
+    status = _mip_status(solver.Solve(params))
+    stats.solve_seconds = time.perf_counter() - started
+    stats.nodes = solver.nodes()
+    if status not in ("optimal", "feasible"):
+        return CoveringSolution(status, None, None, [], [], model.y_cities, stats)
+
+    x_values, y_values = read_solution(model)
+    return CoveringSolution(status, solver.Objective().Value(), solver.Objective().BestBound(),
+                            x_values, y_values, model.y_cities, stats)
+
+
+class CoveringSweep:
+    """One SCIP covering model re-solved for changed demand, cost and capacity.
+
+    The model is built once; ``solve`` only moves demand right-hand sides,
+    objective coefficients and capacity coefficients, and hints the previous
+    solution so consecutive, similar solves start from a good incumbent.
+    The option/route structure of ``problem`` is fixed.
+    """
+
+    def __init__(self, problem: ProblemInstance, options: Optional[SolverOptions] = None):
+        from ortools.linear_solver import pywraplp
+
+        self.solver = pywraplp.Solver.CreateSolver('SCIP')
+        if not self.solver:
+            raise RuntimeError("SCIP solver not available")
+        started = time.perf_counter()
+        self.model = build_covering_model(self.solver, problem)
+        self.build_seconds = time.perf_counter() - started
+        self.params = _scip_parameters(self.solver, options or SolverOptions())
+        self.demand = problem.demand.astype(float).tolist()
+        self.cost = problem.cost.astype(float).tolist()
+        self.capacity = problem.capacity.astype(float).tolist()
+        # Solver variable order is x, then y, per option (see CoveringModel)
+        self._variables = [v for x_var, y_vars in zip(self.model.x, self.model.y) for v in (x_var, *y_vars)]
+        self._hint: Optional[List[float]] = None
+
+    def solve(self, demand: np.ndarray, cost: np.ndarray, capacity: np.ndarray) -> CoveringSolution:
+        """Solve with new per-city ``demand`` and per-option ``cost`` and ``capacity``."""
+        model = self.model
+        objective = self.solver.Objective()
+        for c, value in enumerate(np.asarray(demand, dtype=float).tolist()):
+            if value != self.demand[c]:
+                model.demand_constraints[c].SetLb(value)
+                self.demand[c] = value
+        for o, (value, cap) in enumerate(zip(np.asarray(cost, dtype=float).tolist(),
+                                             np.asarray(capacity, dtype=float).tolist())):
+            if value != self.cost[o]:
+                objective.SetCoefficient(model.x[o], value)
+                self.cost[o] = value
+            if cap != self.capacity[o]:
+                model.capacity_constraints[o].SetCoefficient(model.x[o], -cap)
+                self.capacity[o] = cap
+        if self._hint is not None:
+            self.solver.SetHint(self._variables, self._hint)
+
+        stats = SolverStats(variables=self.solver.NumVariables(), constraints=self.solver.NumConstraints())
+        solution = _run_scip(model, self.params, stats)
+        if solution.has_solution:
+            self._hint = [v for x, ys in zip(solution.x_values, solution.y_values) for v in (x, *ys)]
+        return solution
+
+
+def _allocation_scale(problem: ProblemInstance) -> int:
+    limits = [capacity for capacity in (w.get("capacity") for w in problem.warehouses or []) if capacity is not None]
+    quantities = np.concatenate([problem.demand.astype(float), problem.capacity.astype(float), np.asarray(limits, dtype=float)])
+    return 1 if np.all(quantities == np.floor(quantities)) else FRACTIONAL_ALLOCATION_SCALE
+
+
+def _solve_cp_sat(problem: ProblemInstance, options: SolverOptions, hint: Optional[Hint]) -> CoveringSolution:
+    """CP-SAT formulation with allocations as scaled integers.
+
+    Each allocation is bounded by its city's (scaled) demand and each truck
+    count by the trucks needed to carry the whole route, which keeps every
+    domain finite without cutting off an optimal solution.
+    """
+    from ortools.sat.python import cp_model
+
+    started = time.perf_counter()
+    scale = _allocation_scale(problem)
+    demand = np.maximum(np.ceil(problem.demand.astype(float) * scale - 1e-9), 0).astype(np.int64).tolist()
+    num_demand_cities = len(demand)
+    # Exact for capacities with up to two decimals; finer ones round down, never overstating a truck
+    capacity = np.floor(problem.capacity.astype(float) * scale + 1e-9).astype(np.int64).tolist()
+    cost = problem.cost.tolist()
+    y_cities = option_cities(problem)
+
+    model = cp_model.CpModel()
+    x = []
+    x_ub = []
+    y = []
+    city_columns: List[List[Tuple[int, int]]] = [[] for _ in range(num_demand_cities)]
+    for o, cities_on_route in enumerate(y_cities):
+        route_demand = sum(demand[c] for c in cities_on_route if c < num_demand_cities)
+        trucks_ub = math.ceil(route_demand / capacity[o]) if capacity[o] > 0 else 0
+        x_var = model.NewIntVar(0, trucks_ub, f'x_{o}')
+        y_vars = []
+        for j, c in enumerate(cities_on_route):
+            y_var = model.NewIntVar(0, demand[c] if c < num_demand_cities else 0, f'y_{o}_{c}')
+            y_vars.append(y_var)
+            if c < num_demand_cities:
+                city_columns[c].append((o, j))
+        if y_vars:
+            model.Add(cp_model.LinearExpr.Sum(y_vars) <= capacity[o] * x_var)
+        x.append(x_var)
+        x_ub.append(trucks_ub)
+        y.append(y_vars)
+
+    for c, columns in enumerate(city_columns):
+        model.Add(cp_model.LinearExpr.Sum([y[o][j] for o, j in columns]) >= demand[c])
+    for depot, depot_option_ids in depot_options(problem).items():
+        limit = math.floor(problem.warehouses[depot]["capacity"] * scale + 1e-9)
+        model.Add(cp_model.LinearExpr.Sum([v for o in depot_option_ids for v in y[o]]) <= limit)
+    model.Minimize(cp_model.LinearExpr.WeightedSum(x, cost))
+
+    if hint:
+        for o in range(problem.num_options):
+            trucks, quantities = hint.get(problem.option_key(o), (0, {}))
+            model.AddHint(x[o], min(max(int(round(trucks)), 0), x_ub[o]))
+            for c, y_var in zip(y_cities[o], y[o]):
+                quantity = int(round(float(quantities.get(problem.city_names[c], 0.0)) * scale))
+                upper = demand[c] if c < num_demand_cities else 0
+                model.AddHint(y_var, min(max(quantity, 0), upper))
+
+    proto = model.Proto()
+    stats = SolverStats(variables=len(proto.variables), constraints=len(proto.constraints),
+                        build_seconds=time.perf_counter() - started)
+
+    solver = cp_model.CpSolver()
+    if options.time_limit is not None:
+        solver.parameters.max_time_in_seconds = options.time_limit
+    if options.mip_gap is not None:
+        solver.parameters.relative_gap_limit = options.mip_gap
+    if options.threads is not None:
+        solver.parameters.num_workers = options.threads
+
+    started = time.perf_counter()
+    status = _cp_sat_status(solver.Solve(model))
+    stats.solve_seconds = time.perf_counter() - started
+    stats.nodes = solver.NumBranches()
+    if status not in ("optimal", "feasible"):
+        return CoveringSolution(status, None, None, [], [], y_cities, stats)
+
+    # Read the whole assignment once, as read_solution does for SCIP
+    values = solver.ResponseProto().solution
+    x_values = [float(values[var.Index()]) for var in x]
+    allocations = [[values[var.Index()] for var in y_vars] for y_vars in y]
+    # Truck cost is the only objective, so CP-SAT may over-deliver; hand back
+    # the surplus (capacity constraints only get looser)
+    for c, columns in enumerate(city_columns):
+        surplus = sum(allocations[o][j] for o, j in columns) - demand[c]
+        for o, j in reversed(columns):
+            if surplus <= 0:
+                break
+            taken = min(surplus, allocations[o][j])
+            allocations[o][j] -= taken
+            surplus -= taken
+    y_values = [[value / scale for value in row] for row in allocations]
+    return CoveringSolution(status, solver.ObjectiveValue(), solver.BestObjectiveBound(),
+                            x_values, y_values, y_cities, stats)
@@ -0,0 +1,141 @@
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+import numpy as np
+
+from model_builder import depot_options
+from problem import ProblemInstance
+
+
+@dataclass
+class PresolveReport:
+    """What ``presolve`` removed, by reason; options as ``"route|truck"`` keys."""
+
+    options_before: int = 0
+    options_after: int = 0
+    zero_demand_cities: int = 0
+    route_stops_dropped: int = 0
+    duplicate_options: List[str] = field(default_factory=list)
+    dominated_options: List[str] = field(default_factory=list)
+    empty_options: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+def presolve(problem: ProblemInstance) -> Tuple[ProblemInstance, PresolveReport]:
+    """Shrink the covering model without changing its optimal cost.
+
+    * Stops at cities without demand (zero-demand or Route_Cities-only
+      cities) are dropped from routes; they never need an allocation.
+    * Options whose route is then empty, or whose capacity is not positive,
+      are dropped (unless they have negative cost).
+    * Option ``o`` is dominated by ``p`` when ``p``'s route serves every
+      city of ``o``'s route at no more cost per truck and no less capacity;
+      any truck of ``o`` can be swapped for one of ``p``. Exact duplicates
+      and identical columns are the tie case; the first one is kept.
+      When warehouses have capacity limits, ``p``'s route must start from
+      the same warehouse, since the swap moves deliveries between depots.
+
+    City ids are unchanged, so solutions of the reduced problem read the
+    same as solutions of the original one.
+    """
+    report = PresolveReport(options_before=problem.num_options)
+    route_city_ptr, route_city_idx, keep = _reduce(problem, report)
+    report.options_after = len(keep)
+    return restrict_options(problem, route_city_ptr, route_city_idx, keep), report
+
+
+def surviving_options(problem: ProblemInstance) -> np.ndarray:
+    """Ids of the options ``presolve`` keeps, in order."""
+    return _reduce(problem, PresolveReport(options_before=problem.num_options))[2]
+
+
+def restrict_options(problem: ProblemInstance, route_city_ptr: np.ndarray, route_city_idx: np.ndarray,
+                     keep: np.ndarray) -> ProblemInstance:
+    """``problem`` with presolved routes and only the options in ``keep``."""
+    return dataclasses.replace(
+        problem,
+        route_city_ptr=route_city_ptr.astype(np.int64),
+        route_city_idx=route_city_idx,
+        option_route=problem.option_route[keep],
+        option_truck=problem.option_truck[keep],
+        capacity=problem.capacity[keep],
+        cost=problem.cost[keep]
+    )
+
+
+def _reduce(problem: ProblemInstance, report: PresolveReport) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Presolved route layout and surviving option ids; removals are logged on ``report``
+    n_cities = len(problem.city_names)
+    has_demand = np.zeros(n_cities, dtype=bool)
+    has_demand[:problem.num_demand_cities] = problem.demand > 0
+    report.zero_demand_cities = int(problem.num_demand_cities - np.count_nonzero(has_demand))
+
+    entry_route = np.repeat(np.arange(len(problem.route_names)), np.diff(problem.route_city_ptr))
+    kept = has_demand[problem.route_city_idx]
+    report.route_stops_dropped = int(len(kept) - np.count_nonzero(kept))
+    route_city_idx = problem.route_city_idx[kept]
+    route_city_ptr = np.concatenate([[0], np.cumsum(np.bincount(entry_route[kept], minlength=len(problem.route_names)))])
+
+    capacity = problem.capacity.tolist()
+    cost = problem.cost.tolist()
+    option_route = problem.option_route.tolist()
+    # Routes of one depot when depots have capacity limits, else all in one group
+    route_group = (problem.route_depot.tolist() if depot_options(problem)
+                   else [0] * len(problem.route_names))
+    ptr = route_city_ptr.tolist()
+    idx = route_city_idx.tolist()
+    route_sets: Dict[int, FrozenSet[int]] = {r: frozenset(idx[ptr[r]:ptr[r + 1]]) for r in dict.fromkeys(option_route)}
+
+    def key(o: int) -> str:
+        route, truck = problem.option_key(o)
+        return f"{route}|{truck}"
+
+    candidates = []
+    for o in range(problem.num_options):
+        if (not route_sets[option_route[o]] or capacity[o] <= 0) and cost[o] >= 0:
+            report.empty_options.append(key(o))
+        else:
+            candidates.append(o)
+
+    # Inverted index: routes (with live options) serving each city
+    routes_at: Dict[int, List[int]] = {}
+    options_on: Dict[int, List[int]] = {}
+    for o in candidates:
+        options_on.setdefault(option_route[o], []).append(o)
+    for r in options_on:
+        for c in route_sets[r]:
+            routes_at.setdefault(c, []).append(r)
+
+    supersets: Dict[FrozenSet[int], List[int]] = {}
+    survivors = []
+    for o in candidates:
+        cities = route_sets[option_route[o]]
+        if cities not in supersets:
+            ordered = sorted(cities, key=lambda c: len(routes_at[c]))
+            common = set(routes_at[ordered[0]])
+            for c in ordered[1:]:
+                common.intersection_update(routes_at[c])
+            supersets[cities] = sorted(common)
+        dominator = None
+        for r in supersets[cities]:
+            if route_group[r] != route_group[option_route[o]]:
+                continue
+            for p in options_on[r]:
+                if p == o or cost[p] > cost[o] or capacity[p] < capacity[o]:
+                    continue
+                if cost[p] < cost[o] or capacity[p] > capacity[o] or len(route_sets[r]) > len(cities) or p < o:
+                    dominator = p
+                    break
+            if dominator is not None:
+                break
+        if dominator is None:
+            survivors.append(o)
+        elif problem.option_key(dominator) == problem.option_key(o):
+            report.duplicate_options.append(key(o))
+        else:
+            report.dominated_options.append(key(o))
+
+    return route_city_ptr, route_city_idx, np.asarray(survivors, dtype=np.int64)
@@ -0,0 +1,344 @@
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from depots import assign_routes
+
+# pandas is only needed to build instances from tables or payloads
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _split_key(key: Any) -> Tuple[Hashable, Hashable]:
+    # JSON payloads carry "route|truck" string keys, parsed data carries tuples
+    if isinstance(key, str):
+        route, truck = key.split("|", 1)
+        return route, truck
+    return key[0], key[1]
+
+
+def _scalar(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+@dataclass
+class ProblemInstance:
+    """Integer-indexed route optimization problem.
+
+    Cities, routes and truck types are interned to ids (positions in the
+    ``*_names`` lists). The first ``len(demand)`` cities are the Cities sheet;
+    any extra ones only appear in Route_Cities. The cities of route ``r`` are
+    ``route_city_idx[route_city_ptr[r]:route_city_ptr[r + 1]]`` (CSR layout),
+    and each route/truck option ``o`` is ``(option_route[o], option_truck[o])``
+    with its own ``capacity[o]`` and ``cost[o]``. Unknown coordinates are NaN.
+
+    ``warehouse`` is the (first) depot. With several depots, or a capacity
+    limit on one, ``warehouses`` lists them all and ``route_depot[r]`` is the
+    warehouse id route ``r`` starts from; otherwise both are None.
+    """
+
+    city_names: List[Hashable]
+    route_names: List[Hashable]
+    truck_type_names: List[Hashable]
+    demand: np.ndarray
+    lat: np.ndarray
+    long: np.ndarray
+    route_city_ptr: np.ndarray
+    route_city_idx: np.ndarray
+    option_route: np.ndarray
+    option_truck: np.ndarray
+    capacity: np.ndarray
+    cost: np.ndarray
+    warehouse: Optional[Dict[str, Any]] = None
+    warehouses: Optional[List[Dict[str, Any]]] = None
+    route_depot: Optional[np.ndarray] = None
+
+    @property
+    def num_demand_cities(self) -> int:
+        return len(self.demand)
+
+    @property
+    def num_options(self) -> int:
+        return len(self.option_route)
+
+    def route_city_ids(self, route_id: int) -> np.ndarray:
+        return self.route_city_idx[self.route_city_ptr[route_id]:self.route_city_ptr[route_id + 1]]
+
+    def option_key(self, option_id: int) -> Tuple[Hashable, Hashable]:
+        return self.route_names[self.option_route[option_id]], self.truck_type_names[self.option_truck[option_id]]
+
+    def city_demand(self, city_id: int) -> Any:
+        return _scalar(self.demand[city_id]) if city_id < self.num_demand_cities else 0
+
+    def total_demand(self) -> Any:
+        return _scalar(self.demand.sum())
+
+    def route_warehouse(self, route_id: int) -> Optional[Dict[str, Any]]:
+        """The depot route ``route_id`` starts and ends at."""
+        if self.route_depot is not None:
+            return self.warehouses[self.route_depot[route_id]]
+        return self.warehouse
+
+    def coordinates(self) -> np.ndarray:
+        """(num_cities, 2) lat/long array with unknown coordinates as 0."""
+        return np.nan_to_num(np.column_stack([self.lat, self.long]), nan=0.0, posinf=0.0, neginf=0.0)
+
+    @classmethod
+    def from_tables(cls, cities_df: "pd.DataFrame", route_cities_df: "pd.DataFrame", route_trucktypes_df: "pd.DataFrame",
+                    lat_dict: Dict[Hashable, float], long_dict: Dict[Hashable, float],
+                    warehouse: Optional[Dict[str, Any]] = None,
+                    warehouses: Optional[List[Dict[str, Any]]] = None) -> "ProblemInstance":
+        """Build from the Cities / Route_Cities / Route_TruckTypes tables.
+
+        ``warehouses`` are the Warehouse rows (``depots.read_warehouses``);
+        routes are tied to the warehouse nearest to most of their stops.
+        """
+        import pandas as pd
+
+        demand = dict(zip(cities_df["city"], cities_df["demand"]))
+        city_index = pd.Index(pd.unique(pd.concat([pd.Series(list(demand), dtype=object),
+                                                   route_cities_df["city"].astype(object)], ignore_index=True)))
+        route_index = pd.Index(pd.unique(pd.concat([route_cities_df["route"].astype(object),
+                                                    route_trucktypes_df["route"].astype(object)], ignore_index=True)))
+        truck_index = pd.Index(pd.unique(route_trucktypes_df["truck_type"].astype(object)))
+
+        route_codes = route_index.get_indexer(route_cities_df["route"])
+        order = np.argsort(route_codes, kind="stable")
+        route_city_idx = city_index.get_indexer(route_cities_df["city"])[order].astype(np.int32)
+        route_city_ptr = np.concatenate([[0], np.cumsum(np.bincount(route_codes, minlength=len(route_index)))])
+
+        # Repeated (route, truck) rows share the values of the last one, as the dicts used to
+        keys = route_trucktypes_df.groupby(["route", "truck_type"], sort=False, dropna=False)
+        capacity = keys["capacity"].transform("last").astype(int).to_numpy()
+        cost = keys["cost"].transform("last").astype(int).to_numpy()
+
+        lat = cls._coordinate_array(city_index, lat_dict)
+        long = cls._coordinate_array(city_index, long_dict)
+        warehouse, warehouses = cls._depots(warehouse, warehouses)
+        return cls(
+            city_names=city_index.tolist(),
+            route_names=route_index.tolist(),
+            truck_type_names=truck_index.tolist(),
+            demand=np.asarray(list(demand.values())),
+            lat=lat,
+            long=long,
+            route_city_ptr=route_city_ptr.astype(np.int64),
+            route_city_idx=route_city_idx,
+            option_route=route_index.get_indexer(route_trucktypes_df["route"]).astype(np.int32),
+            option_truck=truck_index.get_indexer(route_trucktypes_df["truck_type"]).astype(np.int32),
+            capacity=capacity,
+            cost=cost,
+            warehouse=warehouse,
+            warehouses=warehouses,
+            route_depot=assign_routes(warehouses, lat, long, route_city_ptr, route_city_idx) if warehouses else None
+        )
+
+    @classmethod
+    def from_file_data(cls, data: Dict[str, Any]) -> "ProblemInstance":
+        """Build from a ``file_data`` dict (JSON form or tuple-keyed form)."""
+        import pandas as pd
+
+        demand = {city: data["demand"][city] for city in data["cities"]}
+        route_cities = data["route_cities"]
+        route_trucktypes = [(rt[0], rt[1]) for rt in data["route_trucktypes"]]
+        capacity = {_split_key(k): v for k, v in data["capacity"].items()}
+        cost = {_split_key(k): v for k, v in data["cost"].items()}
+
+        city_ids: Dict[Hashable, int] = {city: i for i, city in enumerate(demand)}
+        route_ids: Dict[Hashable, int] = {}
+        ptr = [0]
+        idx = []
+        for route, cities in route_cities.items():
+            route_ids[route] = len(route_ids)
+            for city in cities:
+                idx.append(city_ids.setdefault(city, len(city_ids)))
+            ptr.append(len(idx))
+        truck_ids: Dict[Hashable, int] = {}
+        option_route = []
+        option_truck = []
+        for route, truck in route_trucktypes:
+            if route not in route_ids:
+                route_ids[route] = len(route_ids)
+                ptr.append(ptr[-1])
+            option_route.append(route_ids[route])
+            option_truck.append(truck_ids.setdefault(truck, len(truck_ids)))
+
+        city_index = pd.Index(list(city_ids), dtype=object)
+        lat = cls._coordinate_array(city_index, data.get("lat_dict", {}))
+        long = cls._coordinate_array(city_index, data.get("long_dict", {}))
+        route_city_ptr = np.asarray(ptr, dtype=np.int64)
+        route_city_idx = np.asarray(idx, dtype=np.int32)
+        warehouse, warehouses = cls._depots(data.get("warehouse"), data.get("warehouses"))
+        route_depot = None
+        if warehouses:
+            route_depot = assign_routes(warehouses, lat, long, route_city_ptr, route_city_idx)
+            # Keep the depots a payload was saved with; new routes fall back to the nearest one
+            depot_ids = {w["name"]: i for i, w in enumerate(warehouses)}
+            for route, name in (data.get("route_warehouse") or {}).items():
+                if route in route_ids and name in depot_ids:
+                    route_depot[route_ids[route]] = depot_ids[name]
+        return cls(
+            city_names=list(city_ids),
+            route_names=list(route_ids),
+            truck_type_names=list(truck_ids),
+            demand=np.asarray(list(demand.values())),
+            lat=lat,
+            long=long,
+            route_city_ptr=route_city_ptr,
+            route_city_idx=route_city_idx,
+            option_route=np.asarray(option_route, dtype=np.int32),
+            option_truck=np.asarray(option_truck, dtype=np.int32),
+            capacity=np.asarray([int(capacity[rt]) for rt in route_trucktypes], dtype=np.int64),
+            cost=np.asarray([int(cost[rt]) for rt in route_trucktypes], dtype=np.int64),
+            warehouse=warehouse,
+            warehouses=warehouses,
+            route_depot=route_depot
+        )
+
+    def to_file_data(self) -> Dict[str, Any]:
+        """JSON-serializable ``file_data`` dict, as returned by ``/api/upload-excel``."""
+        cities = self.city_names[:self.num_demand_cities]
+        route_trucktypes = [self.option_key(o) for o in range(self.num_options)]
+        lat_dict = {}
+        long_dict = {}
+        for city, lat, long in zip(cities, self.lat.tolist(), self.long.tolist()):
+            if not (math.isnan(lat) or math.isnan(long)):
+                lat_dict[city] = lat if math.isfinite(lat) else 0
+                long_dict[city] = long if math.isfinite(long) else 0
+        data = {
+            "cities": cities,
+            "demand": dict(zip(cities, self.demand.tolist())),
+            "lat_dict": lat_dict,
+            "long_dict": long_dict,
+            "routes": [r for i, r in enumerate(self.route_names) if self.route_city_ptr[i + 1] > self.route_city_ptr[i]],
+            "truck_types": list(self.truck_type_names),
+            "route_cities": {
+                route: [self.city_names[c] for c in self.route_city_ids(i).tolist()]
+                for i, route in enumerate(self.route_names)
+                if self.route_city_ptr[i + 1] > self.route_city_ptr[i]
+            },
+            "route_trucktypes": [[r, t] for r, t in route_trucktypes],
+            "capacity": {f"{r}|{t}": c for (r, t), c in zip(route_trucktypes, self.capacity.tolist())},
+            "cost": {f"{r}|{t}": c for (r, t), c in zip(route_trucktypes, self.cost.tolist())},
+            "warehouse": self.warehouse
+        }
+        if self.warehouses:
+            data["warehouses"] = self.warehouses
+            data["route_warehouse"] = {
+                route: self.warehouses[depot]["name"]
+                for route, depot in zip(self.route_names, self.route_depot.tolist())
+            }
+        return data
+
+    def fingerprint(self) -> str:
+        """Content hash of the problem, independent of input ordering.
+
+        Cities, routes and options are sorted by name, so the hash does not
+        depend on how the payload was parsed or round-tripped through JSON.
+        Each route's stop list keeps its own order, which sequencing uses.
+        """
+        def number(value):
+            value = float(value)
+            return None if math.isnan(value) else value
+
+        cities = sorted(
+            ([name, number(self.demand[i]), number(self.lat[i]), number(self.long[i])]
+             for i, name in enumerate(self.city_names[:self.num_demand_cities])),
+            key=lambda row: str(row[0])
+        )
+        routes = sorted(
+            ([route, [self.city_names[c] for c in self.route_city_ids(i).tolist()]]
+             for i, route in enumerate(self.route_names)),
+            key=lambda row: str(row[0])
+        )
+        options = sorted(
+            [str(r), str(t), c, k] for (r, t), c, k in zip(
+                (self.option_key(o) for o in range(self.num_options)), self.capacity.tolist(), self.cost.tolist())
+        )
+        warehouse = self.warehouse or {}
+        canonical = {
+            "cities": cities,
+            "routes": routes,
+            "options": options,
+            "warehouse": [warehouse.get("name"), warehouse.get("lat"), warehouse.get("long")] if warehouse else None,
+        }
+        if self.warehouses:
+            canonical["warehouses"] = [[w.get("name"), w.get("lat"), w.get("long"), w.get("capacity")]
+                                       for w in self.warehouses]
+            canonical["route_warehouse"] = sorted(
+                [str(route), str(self.warehouses[depot].get("name"))]
+                for route, depot in zip(self.route_names, self.route_depot.tolist())
+            )
+        payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def subproblem(self, option_ids: np.ndarray, city_ids: np.ndarray) -> "ProblemInstance":
+        """Instance restricted to some options and cities, with ids renumbered.
+
+        ``city_ids`` must include every city on the options' routes. Demand
+        cities keep coming first and every list keeps its original order.
+        """
+        option_ids = np.asarray(option_ids, dtype=np.int64)
+        city_ids = np.unique(np.asarray(city_ids, dtype=np.int64))
+        demand_ids = city_ids[city_ids < self.num_demand_cities]
+        new_cities = np.concatenate([demand_ids, city_ids[city_ids >= self.num_demand_cities]])
+        city_map = np.full(len(self.city_names), -1, dtype=np.int64)
+        city_map[new_cities] = np.arange(len(new_cities))
+
+        routes = np.unique(self.option_route[option_ids])
+        route_map = np.full(len(self.route_names), -1, dtype=np.int64)
+        route_map[routes] = np.arange(len(routes))
+        trucks = np.unique(self.option_truck[option_ids])
+        truck_map = np.full(len(self.truck_type_names), -1, dtype=np.int64)
+        truck_map[trucks] = np.arange(len(trucks))
+
+        lengths = np.diff(self.route_city_ptr)[routes]
+        members = [self.route_city_ids(r) for r in routes.tolist()]
+        route_city_idx = city_map[np.concatenate(members)] if members else np.empty(0, dtype=np.int64)
+        if np.any(route_city_idx < 0):
+            raise ValueError("city_ids must cover every city on the selected routes")
+
+        return type(self)(
+            city_names=[self.city_names[c] for c in new_cities.tolist()],
+            route_names=[self.route_names[r] for r in routes.tolist()],
+            truck_type_names=[self.truck_type_names[t] for t in trucks.tolist()],
+            demand=self.demand[demand_ids],
+            lat=self.lat[new_cities],
+            long=self.long[new_cities],
+            route_city_ptr=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            route_city_idx=route_city_idx.astype(np.int32),
+            option_route=route_map[self.option_route[option_ids]].astype(np.int32),
+            option_truck=truck_map[self.option_truck[option_ids]].astype(np.int32),
+            capacity=self.capacity[option_ids],
+            cost=self.cost[option_ids],
+            warehouse=self.warehouse,
+            warehouses=self.warehouses,
+            route_depot=self.route_depot[routes] if self.route_depot is not None else None
+        )
+
+    @staticmethod
+    def _depots(warehouse: Optional[Dict[str, Any]], warehouses: Optional[List[Dict[str, Any]]]
+                ) -> Tuple[Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        # A single depot without a capacity limit is fully described by ``warehouse``
+        if not warehouses:
+            return warehouse, None
+        first = {key: warehouses[0].get(key) for key in ("name", "lat", "long")}
+        if len(warehouses) == 1 and warehouses[0].get("capacity") is None:
+            return warehouse or first, None
+        return warehouse or first, [dict(w) for w in warehouses]
+
+    @staticmethod
+    def _coordinate_array(city_index: "pd.Index", values: Dict[Hashable, Any]) -> np.ndarray:
+        import pandas as pd
+
+        coords = np.full(len(city_index), np.nan)
+        if values:
+            positions = city_index.get_indexer(list(values))
+            found = positions >= 0
+            raw = pd.to_numeric(pd.Series(list(values.values()), dtype=object), errors="coerce").to_numpy(dtype=float)
+            coords[positions[found]] = raw[found]
+        return coords
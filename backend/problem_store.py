@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from bson import Binary
+from pymongo.errors import DuplicateKeyError
+
+ENCODING = "json+zlib"
+
+# Mongo caps documents at 16 MB; larger payloads go to GridFS when available
+INLINE_LIMIT_BYTES = 15 * 1024 * 1024
+
+
+def encode_payload(data: Dict[str, Any]) -> bytes:
+    """Canonical JSON (sorted keys, compact) so equal payloads hash equally."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def payload_key(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ProblemStore:
+    """Content-addressed, compressed storage for scenario ``input_data``.
+
+    Each distinct payload is stored once in ``collection`` under the
+    SHA-256 of its canonical JSON, zlib-compressed; scenarios keep only the
+    key. With a GridFS ``bucket``, payloads too large for a document are
+    stored there instead. Unreferenced payloads can be released; ones
+    written within ``grace_seconds`` are only set to expire at the end of
+    that period, since a scenario pointing at them may be about to be
+    inserted.
+
+    Payloads put with a ``ttl_seconds`` (uploaded problem handles) carry an
+    ``expires_at`` that a TTL index acts on, until a put without a TTL or
+    ``pin`` makes them permanent.
+    """
+
+    def __init__(self, collection, bucket=None, grace_seconds: int = 3600, compression_level: int = 6):
+        self.collection = collection
+        self.bucket = bucket
+        self.grace_seconds = grace_seconds
+        self.compression_level = compression_level
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("key", unique=True)
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def put(self, data: Dict[str, Any], ttl_seconds: Optional[int] = None) -> str:
+        raw = await asyncio.to_thread(encode_payload, data)
+        key = payload_key(raw)
+        now = datetime.now(timezone.utc)
+
+        if await self._refresh(key, now, ttl_seconds):
+            return key
+
+        compressed = await asyncio.to_thread(zlib.compress, raw, self.compression_level)
+        doc = {"key": key, "encoding": ENCODING, "size": len(raw), "stored_size": len(compressed)}
+        if len(compressed) > INLINE_LIMIT_BYTES:
+            if self.bucket is None:
+                raise ValueError(f"Problem payload of {len(compressed)} compressed bytes is too large to store")
+            doc["gridfs_id"] = await self.bucket.upload_from_stream(key, compressed)
+        else:
+            doc["data"] = Binary(compressed)
+
+        changes = {"$setOnInsert": {**doc, "created_at": now}, "$set": {"touched_at": now}}
+        if ttl_seconds is None:
+            changes["$unset"] = {"expires_at": ""}
+        else:
+            changes["$setOnInsert"]["expires_at"] = now + timedelta(seconds=ttl_seconds)
+        try:
+            await self.collection.update_one({"key": key}, changes, upsert=True)
+        except DuplicateKeyError:
+            # A concurrent put stored the same payload first
+            await self._refresh(key, now, ttl_seconds)
+        return key
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({"key": key}, {"_id": 0})
+        return await self._inflate(doc) if doc else None
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        docs = await self.collection.find({"key": {"$in": keys}}, {"_id": 0}).to_list(len(keys))
+        return {doc["key"]: await self._inflate(doc) for doc in docs}
+
+    async def touch(self, key: str) -> bool:
+        """Mark a payload as referenced again, cancelling any expiry ``release`` scheduled."""
+        touched = await self.collection.update_one(
+            {"key": key}, {"$set": {"touched_at": datetime.now(timezone.utc)}, "$unset": {"expires_at": ""}}
+        )
+        return bool(touched.matched_count)
+
+    async def pin(self, key: str) -> bool:
+        """Keep an expiring payload for good; False if it is gone."""
+        return await self._refresh(key, datetime.now(timezone.utc), None)
+
+    async def _refresh(self, key: str, now: datetime, ttl_seconds: Optional[int]) -> bool:
+        if ttl_seconds is None:
+            refreshed = await self.collection.update_one(
+                {"key": key}, {"$set": {"touched_at": now}, "$unset": {"expires_at": ""}}
+            )
+            return bool(refreshed.matched_count)
+        # Extend an expiring payload, but never put an expiry on a permanent one
+        extended = await self.collection.update_one(
+            {"key": key, "expires_at": {"$exists": True}},
+            {"$set": {"touched_at": now}, "$max": {"expires_at": now + timedelta(seconds=ttl_seconds)}}
+        )
+        return bool(extended.matched_count) or await self.touch(key)
+
+    async def release(self, key: str) -> bool:
+        """Delete a payload the caller knows is no longer referenced; True if it was deleted now.
+
+        A payload touched within the grace period is instead set to expire
+        when the period ends, unless it is touched, pinned or put again
+        before then.
+        """
+        grace = timedelta(seconds=self.grace_seconds)
+        doc = await self.collection.find_one_and_delete(
+            {"key": key, "touched_at": {"$lt": datetime.now(timezone.utc) - grace}})
+        if doc is None:
+            current = await self.collection.find_one({"key": key}, {"_id": 0, "touched_at": 1})
+            if current is not None:
+                # Only if nothing touched it since; the TTL index then removes it
+                await self.collection.update_one({"key": key, "touched_at": current["touched_at"]},
+                                                 {"$set": {"expires_at": current["touched_at"] + grace}})
+            return False
+        if doc.get("gridfs_id") is not None and self.bucket is not None:
+            await self.bucket.delete(doc["gridfs_id"])
+        return True
+
+    async def drop_orphaned_files(self) -> int:
+        """Delete GridFS files whose payload document is gone (e.g. expired by TTL)."""
+        if self.bucket is None:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+        dropped = 0
+        async for grid_file in self.bucket.find({"uploadDate": {"$lt": cutoff}}):
+            if not await self.collection.find_one({"key": grid_file.filename, "gridfs_id": grid_file._id}, {"_id": 1}):
+                await self.bucket.delete(grid_file._id)
+                dropped += 1
+        return dropped
+
+    async def _inflate(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        if doc.get("gridfs_id") is not None:
+            stream = await self.bucket.open_download_stream(doc["gridfs_id"])
+            compressed = await stream.read()
+        else:
+            compressed = bytes(doc["data"])
+        raw = await asyncio.to_thread(zlib.decompress, compressed)
+        return json.loads(raw)
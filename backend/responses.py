@@ -0,0 +1,160 @@
+import asyncio
+import gzip
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; responses fall back to gzip
+    brotli = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-encoded JSON; numpy values, non-string keys and datetimes are handled natively.
+
+    Returned directly from an endpoint it also skips FastAPI's
+    ``jsonable_encoder``/``response_model`` pass over the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=ORJSON_OPTIONS)
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    accepted = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Brotli (when installed) or gzip for complete responses of at least ``minimum_size`` bytes.
+
+    Streamed responses (NDJSON progress, file exports) are passed through:
+    compressing them would hold each chunk back until the stream ends.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted_encodings(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if message.get("more_body", False) or "content-encoding" in headers or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = await asyncio.to_thread(self._compress, body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+# Per-route fields that hold lists; everything else on a route is a scalar column
+_ROUTE_LIST_FIELDS = ("cities_delivered", "sorted_cities")
+
+
+def columnar_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact layout of an optimization result: parallel arrays instead of repeated dicts.
+
+    ``cities`` holds names and coordinates; ``routes`` one entry per
+    selected route, with each route's visiting order as city indexes in
+    ``stops[stop_ptr[i]:stop_ptr[i + 1]]``; ``deliveries`` one entry per
+    delivery, pointing at its route and city by index. Other keys are kept
+    as they are.
+    """
+    routes = result.get("routes_selected", [])
+    coordinates = result.get("city_coordinates", {})
+
+    city_index: Dict[str, int] = {}
+    names: List[str] = []
+    lat: List[Optional[float]] = []
+    long: List[Optional[float]] = []
+
+    def city_id(name: str) -> int:
+        if name not in city_index:
+            city_index[name] = len(names)
+            names.append(name)
+            coords = coordinates.get(name)
+            lat.append(coords[0] if coords else None)
+            long.append(coords[1] if coords else None)
+        return city_index[name]
+
+    for name in coordinates:
+        city_id(name)
+
+    route_columns: Dict[str, List[Any]] = {}
+    for route in routes:
+        for field in route:
+            if field not in _ROUTE_LIST_FIELDS:
+                route_columns.setdefault(field, [])
+    for field, column in route_columns.items():
+        column.extend(route.get(field) for route in routes)
+
+    stop_ptr = [0]
+    stops: List[int] = []
+    deliveries: Dict[str, List[Any]] = {"route": [], "city": [], "quantity": [], "demand": []}
+    for i, route in enumerate(routes):
+        stops.extend(city_id(name) for name in route.get("sorted_cities", []))
+        stop_ptr.append(len(stops))
+        for delivery in route.get("cities_delivered", []):
+            deliveries["route"].append(i)
+            deliveries["city"].append(city_id(delivery["city"]))
+            deliveries["quantity"].append(delivery["quantity"])
+            deliveries["demand"].append(delivery["demand"])
+
+    compact = {key: value for key, value in result.items() if key not in ("routes_selected", "city_coordinates")}
+    compact["layout"] = "columnar"
+    compact["cities"] = {"name": names, "lat": lat, "long": long}
+    compact["routes"] = {**route_columns, "stop_ptr": stop_ptr, "stops": stops}
+    compact["deliveries"] = deliveries
+    return compact
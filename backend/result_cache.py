@@ -0,0 +1,63 @@
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from problem import ProblemInstance
+
+# Bump when optimize_routes output changes so stale entries stop matching
+RESULT_CACHE_VERSION = 6
+
+
+def result_cache_key(problem: ProblemInstance, options: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps(
+        {"version": RESULT_CACHE_VERSION, "problem": problem.fingerprint(), "options": options or {}},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Optimization results keyed by problem hash.
+
+    An in-process LRU sits in front of the ``optimization_results``
+    collection. Persisted results carry ``problem_hash`` and ``expires_at``;
+    a TTL index on ``expires_at`` lets Mongo evict them.
+    """
+
+    def __init__(self, collection, max_entries: int = 128, ttl_seconds: int = 7 * 24 * 3600):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("problem_hash")
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def expires_at(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            return copy.deepcopy(self._lru[key])
+
+        doc = await self.collection.find_one(
+            {"problem_hash": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"_id": 0, "timestamp": 0, "problem_hash": 0, "expires_at": 0},
+            sort=[("expires_at", -1)]
+        )
+        if doc is None:
+            return None
+        doc["result_id"] = doc.pop("id", None)
+        self.put(key, doc)
+        return doc
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        self._lru[key] = copy.deepcopy(result)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
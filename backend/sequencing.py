@@ -0,0 +1,170 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(points: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances (km) for an (n, 2) array of lat/long degrees."""
+    rad = np.radians(np.asarray(points, dtype=float))
+    lat = rad[:, 0][:, None]
+    lon = rad[:, 1][:, None]
+    dlat = lat.T - lat
+    dlon = lon.T - lon
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_between(origins: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """(len(origins), len(points)) great-circle distances (km) between two lat/long arrays."""
+    a_rad = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    b_rad = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lat_a, lat_b = a_rad[:, 0][:, None], b_rad[:, 0][None, :]
+    h = (np.sin((lat_b - lat_a) / 2) ** 2
+         + np.cos(lat_a) * np.cos(lat_b) * np.sin((b_rad[:, 1][None, :] - a_rad[:, 1][:, None]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def haversine_from(origin: Sequence[float], points: np.ndarray) -> np.ndarray:
+    """Great-circle distances (km) from one lat/long point to each row of an (n, 2) array."""
+    rad = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lat0, lon0 = np.radians(np.asarray(origin, dtype=float))
+    a = (np.sin((rad[:, 0] - lat0) / 2) ** 2
+         + np.cos(lat0) * np.cos(rad[:, 0]) * np.sin((rad[:, 1] - lon0) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def tour_length(tour: Sequence[int], dist: np.ndarray, closed: bool) -> float:
+    tour = np.asarray(tour)
+    length = dist[tour[:-1], tour[1:]].sum()
+    if closed and len(tour) > 1:
+        length += dist[tour[-1], tour[0]]
+    return float(length)
+
+
+def nearest_neighbor_tour(dist: np.ndarray, start: int = 0) -> List[int]:
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    tour = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(row))
+        visited[current] = True
+        tour.append(current)
+    return tour
+
+
+def two_opt(tour: List[int], dist: np.ndarray, closed: bool, deadline: float) -> List[int]:
+    """Segment reversals until no improving move is left; tour[0] stays fixed."""
+    tour = np.asarray(tour)
+    n = len(tour)
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for i in range(1, n - 1):
+            # Evaluate reversing tour[i..j] for every j > i at once
+            a, b = tour[i - 1], tour[i]
+            c = tour[i + 1:]
+            e = np.append(tour[i + 2:], tour[0] if closed else -1)
+            delta = dist[a, c] - dist[a, b] + np.where(e >= 0, dist[b, e] - dist[c, e], 0.0)
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                tour[i:i + j + 2] = tour[i:i + j + 2][::-1].copy()
+                improved = True
+        if time.monotonic() >= deadline:
+            break
+    return tour.tolist()
+
+
+def or_opt(tour: List[int], dist: np.ndarray, closed: bool, deadline: float) -> List[int]:
+    """Relocate chains of 1-3 consecutive stops to their best position."""
+    tour = list(tour)
+    n = len(tour)
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for seg_len in (1, 2, 3):
+            for i in range(1, n - seg_len + 1):
+                if time.monotonic() >= deadline:
+                    return tour
+                segment = tour[i:i + seg_len]
+                prev = tour[i - 1]
+                nxt = tour[i + seg_len] if i + seg_len < n else (tour[0] if closed else None)
+                rest = tour[:i] + tour[i + seg_len:]
+                gain = dist[prev, segment[0]]
+                if nxt is not None:
+                    gain += dist[segment[-1], nxt] - dist[prev, nxt]
+
+                rest_arr = np.asarray(rest)
+                after = np.append(rest_arr[1:], rest_arr[0] if closed else -1)
+                first, last = segment[0], segment[-1]
+                # Insert between rest[k] and rest[k + 1], in either orientation
+                cost_fwd = dist[rest_arr, first]
+                cost_rev = dist[rest_arr, last]
+                has_next = after >= 0
+                cost_fwd = cost_fwd + np.where(has_next, dist[last, after] - dist[rest_arr, after], 0.0)
+                cost_rev = cost_rev + np.where(has_next, dist[first, after] - dist[rest_arr, after], 0.0)
+                cost_fwd[i - 1] = cost_rev[i - 1] = np.inf
+                k_fwd, k_rev = int(np.argmin(cost_fwd)), int(np.argmin(cost_rev))
+                if cost_fwd[k_fwd] <= cost_rev[k_rev]:
+                    k, best, chain = k_fwd, cost_fwd[k_fwd], segment
+                else:
+                    k, best, chain = k_rev, cost_rev[k_rev], segment[::-1]
+                if best < gain - 1e-9:
+                    tour = rest[:k + 1] + chain + rest[k + 1:]
+                    improved = True
+    return tour
+
+
+def sequence_points(points: np.ndarray, depot: Optional[Tuple[float, float]] = None, origin: int = 0,
+                    time_budget: float = 0.2) -> Tuple[List[int], float]:
+    """Order an (n, 2) array of stops and return ``(stop_indexes, distance_km)``.
+
+    With a depot the tour is a closed loop from and back to it; otherwise it
+    is an open path from stop ``origin``. A nearest-neighbour tour is improved
+    with 2-opt and Or-opt until ``time_budget`` seconds pass.
+    """
+    if len(points) == 0:
+        return [], 0.0
+
+    points = np.asarray(points, dtype=float)
+    closed = depot is not None
+    if closed:
+        points = np.vstack([np.asarray(depot, dtype=float), points])
+    return sequence_matrix(haversine_matrix(points), closed, origin, time_budget)
+
+
+def sequence_matrix(dist: np.ndarray, closed: bool, origin: int = 0,
+                    time_budget: float = 0.2) -> Tuple[List[int], float]:
+    """:func:`sequence_points` over a precomputed distance matrix.
+
+    When ``closed``, row 0 is the depot and the returned indexes are of the
+    stops after it (``i - 1``); otherwise they are rows of ``dist``.
+    """
+    if closed:
+        origin = 0
+    deadline = time.monotonic() + time_budget
+    tour = nearest_neighbor_tour(dist, origin)
+    if len(tour) > 3:
+        tour = two_opt(tour, dist, closed, deadline)
+        tour = or_opt(tour, dist, closed, deadline)
+    distance = tour_length(tour, dist, closed)
+
+    if closed:
+        return [i - 1 for i in tour[1:]], distance
+    return tour, distance
+
+
+def sequence_stops(cities: List[str], coords: Dict[str, Tuple[float, float]],
+                   depot: Optional[Tuple[float, float]] = None, start: Optional[str] = None,
+                   time_budget: float = 0.2) -> Tuple[List[str], float]:
+    """Name-based wrapper around :func:`sequence_points`."""
+    if not cities:
+        return [], 0.0
+    origin = cities.index(start) if start and start in cities else 0
+    order, distance = sequence_points(np.array([coords[c] for c in cities], dtype=float), depot, origin, time_budget)
+    return [cities[i] for i in order], distance
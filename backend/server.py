@@ -1,35 +1,149 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, Body, Depends, UploadFile, File, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import base64
+import io
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional, Tuple
 import uuid
 from datetime import datetime, timezone
-import pandas as pd
-import openpyxl
-from ortools.linear_solver import pywraplp
+import numpy as np
 import json
 import math
-from geopy.geocoders import Nominatim
+import time
+from collections import OrderedDict
 import tempfile
-import xlsxwriter
+from geocoding import CachedGeocoder, SQLiteGeocodeStore
+from ingestion import (ExcelSource, UPLOAD_SUFFIXES, is_table_archive, list_sheet_names, problem_from_tables,
+                       read_excel_sheets, read_table_archive)
+from lazy import LazyObject, is_resolved, resolve
+from column_generation import GENERATED_ROUTE_PREFIX, generate_routes
+from decomposition import solve_decomposed
+from distance_store import DistanceNetwork, DistanceStore, MatrixFileProvider
+from exports import TABLES, XLSX_MEDIA_TYPE, iter_buffer, iter_csv, table_rows, write_parquet, write_workbook
+from metrics import SIZE_BUCKETS, MetricsRegistry, StageTimer, timed_iter
+from model_builder import SCIP, SolverOptions
+from presolve import presolve
+from problem import ProblemInstance
+from problem_store import ProblemStore
+from responses import CompressionMiddleware, FastJSONResponse, columnar_result
+from result_cache import ResultCache, result_cache_key
+from sequencing import nearest_neighbor_tour, sequence_matrix
+from solver_pool import SolverPool, SolverJob, SolverJobError, COMPLETED, worker_budget
+from sweep import run_sweep, sweep_axes, validate_sweep
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# The Mongo client, GridFS bucket and geocoder are built on first use, and the
+# heavy libraries (Motor, pandas/openpyxl, OR-Tools, xlsxwriter, geopy) are
+# imported by the code paths that need them, so a cold start serving
+# scenario CRUD never loads the solver or spreadsheet stack.
 
-app = FastAPI()
+def connect_mongo():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    # tz_aware so stored datetimes come back as UTC-aware and serialize with an offset
+    return AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+
+def problem_payload_bucket():
+    from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+    return AsyncIOMotorGridFSBucket(resolve(db), bucket_name="problem_payloads")
+
+def build_geocoder() -> CachedGeocoder:
+    from geopy.geocoders import Nominatim
+    return CachedGeocoder(
+        Nominatim(user_agent="route_optimizer_app"),
+        store=SQLiteGeocodeStore(os.environ.get('GEOCODE_CACHE_PATH', str(Path(tempfile.gettempdir()) / 'geocode_cache.sqlite3'))),
+        query_format="{}, India",
+        max_workers=int(os.environ.get('GEOCODE_WORKERS', 4)),
+        rate_limit=float(os.environ.get('GEOCODE_RATE_LIMIT', 1.0))
+    )
+
+def build_distance_store() -> DistanceStore:
+    path = os.environ.get('DISTANCE_MATRIX_PATH')
+    return DistanceStore(
+        os.environ.get('DISTANCE_STORE_DIR', str(Path(tempfile.gettempdir()) / 'route_distances')),
+        max_bytes=int(os.environ.get('DISTANCE_STORE_MAX_BYTES', 1 << 30)),
+        provider=MatrixFileProvider(path) if path else None
+    )
+
+client = LazyObject(connect_mongo)
+db = LazyObject(lambda: client[os.environ['DB_NAME']])
+
+app = FastAPI(default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
-geolocator = Nominatim(user_agent="route_optimizer_app")
+geolocator = LazyObject(build_geocoder)
+
+# Distance matrices shared by requests and solver workers on the same city network
+distance_store = LazyObject(build_distance_store)
+
+result_cache = ResultCache(
+    LazyObject(lambda: db.optimization_results),
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 128)),
+    ttl_seconds=int(os.environ.get('RESULT_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+)
+
+# Scenario input_data lives here once per distinct payload; scenarios store its key
+problem_store = ProblemStore(
+    LazyObject(lambda: db.problem_payloads),
+    bucket=LazyObject(problem_payload_bucket)
+)
+
+UPLOAD_TYPE_ERROR = "Only Excel files (.xlsx, .xls) or a .zip of CSV/Parquet tables are allowed"
+
+# Uploaded problems are kept this long (seconds) unless a scenario pins them
+PROBLEM_HANDLE_TTL_SECONDS = int(os.environ.get('PROBLEM_HANDLE_TTL_SECONDS', 24 * 3600))
+
+# Parsed problems by problem_id, so optimizing an upload skips inflating and parsing it
+PARSED_PROBLEM_CACHE_SIZE = int(os.environ.get('PARSED_PROBLEM_CACHE_SIZE', 16))
+parsed_problems: "OrderedDict[str, ProblemInstance]" = OrderedDict()
+
+# Seconds of 2-opt/Or-opt improvement per selected route
+SEQUENCING_TIME_BUDGET = float(os.environ.get('SEQUENCING_TIME_BUDGET', 0.2))
+
+# Default solve time limit in seconds when a request sets none (unset: no limit)
+SOLVER_TIME_LIMIT = float(os.environ['SOLVER_TIME_LIMIT']) if os.environ.get('SOLVER_TIME_LIMIT') else None
+
+# Processes used to solve independent sub-networks of one problem in parallel,
+# capped in a pool child by the CPUs other running solves are not holding
+SOLVER_COMPONENT_WORKERS = int(os.environ.get('SOLVER_COMPONENT_WORKERS', os.cpu_count() or 1))
+
+# Seconds of LP pricing when a request asks for generated routes
+ROUTE_GENERATION_TIME_BUDGET = float(os.environ.get('ROUTE_GENERATION_TIME_BUDGET', 30))
+
+# Most grid points one sensitivity sweep may solve
+SWEEP_MAX_POINTS = int(os.environ.get('SWEEP_MAX_POINTS', 256))
+
+solver_pool = SolverPool(
+    max_workers=int(os.environ.get('SOLVER_WORKERS', os.cpu_count() or 2)),
+    max_finished_jobs=int(os.environ.get('SOLVER_JOB_RETENTION', 100))
+)
+
+# Served at /api/metrics in the Prometheus text format
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    "route_optimizer_stage_seconds", "Wall time of each request stage", ["stage"])
+SOLVER_SECONDS = metrics.histogram(
+    "route_optimizer_solver_seconds", "Solver wall time per optimization (summed over sub-networks)", ["backend"])
+SOLVER_NODES = metrics.histogram(
+    "route_optimizer_solver_nodes", "Branch-and-bound nodes (CP-SAT: branches) per optimization", ["backend"],
+    buckets=SIZE_BUCKETS)
+MODEL_VARIABLES = metrics.histogram(
+    "route_optimizer_model_variables", "Variables of the covering model", ["backend"], buckets=SIZE_BUCKETS)
+MODEL_CONSTRAINTS = metrics.histogram(
+    "route_optimizer_model_constraints", "Constraints of the covering model", ["backend"], buckets=SIZE_BUCKETS)
+SOLVES = metrics.counter(
+    "route_optimizer_solves_total", "Optimizations solved, by solver status", ["backend", "status"])
+LAST_OBJECTIVE = metrics.gauge(
+    "route_optimizer_last_objective", "Objective value of the latest optimization", ["backend"])
+LAST_BOUND = metrics.gauge(
+    "route_optimizer_last_bound", "Best bound of the latest optimization", ["backend"])
 
 class OptimizationResult(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -38,6 +152,12 @@ class OptimizationResult(BaseModel):
     routes_selected: List[Dict[str, Any]]
     summary_metrics: Dict[str, Any]
     city_coordinates: Dict[str, List[float]]
+    warehouse: Optional[Dict[str, Any]] = None
+    warehouses: Optional[List[Dict[str, Any]]] = None
+    presolve: Optional[Dict[str, Any]] = None
+    route_generation: Optional[Dict[str, Any]] = None
+    problem_hash: Optional[str] = None
+    expires_at: Optional[datetime] = None
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class Scenario(BaseModel):
@@ -45,109 +165,89 @@ class Scenario(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     description: Optional[str] = ""
-    input_data: Dict[str, Any]
+    input_data: Optional[Dict[str, Any]] = None
+    problem_id: Optional[str] = None
     optimization_results: Optional[Dict[str, Any]] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class ScenarioSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: str
+    description: Optional[str] = ""
+    summary_metrics: Optional[Dict[str, Any]] = None
+    has_results: bool = False
+    created_at: datetime
+    updated_at: datetime
+
+class ScenarioPage(BaseModel):
+    scenarios: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
 class ScenarioCreate(BaseModel):
     name: str
     description: Optional[str] = ""
-    input_data: Dict[str, Any]
+    input_data: Optional[Dict[str, Any]] = None
+    problem_id: Optional[str] = None
     optimization_results: Optional[Dict[str, Any]] = None
 
+class SweepRequest(BaseModel):
+    # Demand factors per city group ("all" scales every city), cost/capacity multipliers per truck type
+    city_groups: Dict[str, List[str]] = Field(default_factory=dict)
+    demand: Dict[str, List[float]] = Field(default_factory=dict)
+    cost: Dict[str, List[float]] = Field(default_factory=dict)
+    capacity: Dict[str, List[float]] = Field(default_factory=dict)
+
+class ScenarioDelta(BaseModel):
+    demand: Dict[str, float] = Field(default_factory=dict)
+    cost: Dict[str, float] = Field(default_factory=dict)
+    capacity: Dict[str, float] = Field(default_factory=dict)
+
 class ScenarioUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     input_data: Optional[Dict[str, Any]] = None
+    problem_id: Optional[str] = None
     optimization_results: Optional[Dict[str, Any]] = None
 
 def geocode_city(city_name: str) -> Optional[tuple]:
-    try:
-        location = geolocator.geocode(f"{city_name}, India")
-        if location:
-            return (location.latitude, location.longitude)
-    except Exception as e:
-        logging.warning(f"Geocoding failed for {city_name}: {e}")
-    return None
+    return geolocator.geocode(city_name)
 
-def parse_excel_file(file_path: str) -> Dict[str, Any]:
-    xl = pd.ExcelFile(file_path)
-    sheet_names = xl.sheet_names
+def parse_excel_file(source: ExcelSource, timer: Optional[StageTimer] = None) -> ProblemInstance:
+    timer = timer or StageTimer()
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    sheet_names = list_sheet_names(source)
     logging.info(f"Sheet names found: {sheet_names}")
     
     # Try to detect format
     if "Cities" in sheet_names and "Route_Cities" in sheet_names:
-        # Read warehouse if exists
-        warehouse_name = None
-        warehouse_lat = None
-        warehouse_long = None
-        
-        if "Warehouse" in sheet_names:
-            warehouse_df = pd.read_excel(xl, "Warehouse")
-            if len(warehouse_df) > 0:
-                warehouse_name = warehouse_df["warehouse"].iloc[0]
-                warehouse_lat = float(warehouse_df["lat"].iloc[0])
-                warehouse_long = float(warehouse_df["long"].iloc[0])
-                logging.info(f"Warehouse found: {warehouse_name} at ({warehouse_lat}, {warehouse_long})")
-        
-        cities_df = pd.read_excel(xl, "Cities")
-        route_cities_df = pd.read_excel(xl, "Route_Cities")
-        route_trucktypes_df = pd.read_excel(xl, "Route_TruckTypes")
-        
-        cities = cities_df["city"].tolist()
-        demand = dict(zip(cities_df["city"], cities_df["demand"]))
-        logging.info(f"Parsed {len(cities)} cities")
-        
-        if "lat" in cities_df.columns and "long" in cities_df.columns:
-            lat_dict = dict(zip(cities_df["city"], cities_df["lat"]))
-            long_dict = dict(zip(cities_df["city"], cities_df["long"]))
-        else:
-            lat_dict = {}
-            long_dict = {}
-            for city in cities:
-                coords = geocode_city(city)
-                if coords:
-                    lat_dict[city] = coords[0]
-                    long_dict[city] = coords[1]
-        
-        routes = list(set(route_cities_df["route"]))
-        truck_types = list(set(route_trucktypes_df["truck_type"]))
-        logging.info(f"Parsed {len(routes)} routes and {len(truck_types)} truck types")
-        
-        route_cities = {}
-        for _, row in route_cities_df.iterrows():
-            route_cities.setdefault(row["route"], []).append(row["city"])
-        
-        route_trucktypes = [(i[0], i[1]) for i in list(route_trucktypes_df[["route", "truck_type"]].itertuples(index=False, name=None))]
-        
-        capacity = {}
-        cost = {}
-        for _, row in route_trucktypes_df.iterrows():
-            key = (row["route"], row["truck_type"])
-            capacity[key] = int(row["capacity"])
-            cost[key] = int(row["cost"])
-            
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported Excel format. Expected sheets: Warehouse (optional), Cities, Route_Cities, Route_TruckTypes")
-    
-    return {
-        "cities": cities,
-        "demand": demand,
-        "lat_dict": lat_dict,
-        "long_dict": long_dict,
-        "routes": routes,
-        "truck_types": truck_types,
-        "route_cities": route_cities,
-        "route_trucktypes": route_trucktypes,
-        "capacity": capacity,
-        "cost": cost,
-        "warehouse": {
-            "name": warehouse_name,
-            "lat": warehouse_lat,
-            "long": warehouse_long
-        } if warehouse_name else None
-    }
+        sheets = read_excel_sheets(source, ["Warehouse", "Cities", "Route_Cities", "Route_TruckTypes"])
+        return problem_from_tables(sheets, lambda cities: geocode_cities(cities, timer))
+    raise HTTPException(status_code=400, detail="Unsupported Excel format. Expected sheets: Warehouse (optional), Cities, Route_Cities, Route_TruckTypes")
+
+def parse_table_archive(source: ExcelSource, timer: Optional[StageTimer] = None) -> ProblemInstance:
+    """Like ``parse_excel_file``, for a zip of one CSV or Parquet file per table."""
+    timer = timer or StageTimer()
+    try:
+        tables = read_table_archive(source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logging.info(f"Tables found: {list(tables)}")
+    return problem_from_tables(tables, lambda cities: geocode_cities(cities, timer))
+
+def geocode_cities(cities: List[str], timer: StageTimer) -> Dict[str, tuple]:
+    with timer.stage("geocode"):
+        return geolocator.geocode_many(cities)
+
+def parse_workbook(source: ExcelSource, filename: Optional[str] = None) -> Tuple[ProblemInstance, Dict[str, float]]:
+    """``parse_excel_file`` (or ``parse_table_archive`` for a ``.zip`` ``filename``) and its stage seconds (``parse``, ``geocode``)."""
+    timer = StageTimer()
+    parse = parse_table_archive if is_table_archive(filename) else parse_excel_file
+    with timer.stage("parse"):
+        problem = parse(source, timer)
+    return problem, timer.seconds
 
 def haversine(coord1: tuple, coord2: tuple) -> float:
     R = 6371
@@ -163,123 +263,161 @@ def sort_cities_nearest_neighbor(cities: List[str], coords: Dict[str, tuple], st
     if not cities:
         return []
     
-    unvisited = set(cities)
-    current = start if start and start in cities else cities[0]
-    route = [current]
-    unvisited.remove(current)
-    
-    while unvisited:
-        next_city = min(
-            unvisited,
-            key=lambda city: haversine(coords[current], coords[city])
-        )
-        route.append(next_city)
-        unvisited.remove(next_city)
-        current = next_city
-    
-    return route
-
-def optimize_routes(data: Dict[str, Any]) -> Dict[str, Any]:
-    cities = data["cities"]
-    demand = data["demand"]
-    routes = data["routes"]
-    route_cities = data["route_cities"]
-    route_trucktypes = data["route_trucktypes"]
-    capacity = data["capacity"]
-    cost = data["cost"]
-    lat_dict = data["lat_dict"]
-    long_dict = data["long_dict"]
-    
-    solver = pywraplp.Solver.CreateSolver('SCIP')
-    if not solver:
-        raise HTTPException(status_code=500, detail="SCIP solver not available")
-    
-    x = {}
-    y = {}
-    
-    for rt in route_trucktypes:
-        x[rt] = solver.IntVar(0, solver.infinity(), f'x_{rt}')
-        for c in route_cities[rt[0]]:
-            y[rt, c] = solver.NumVar(0, solver.infinity(), f'y_{rt}_{c}')
-    
-    for c in cities:
-        solver.Add(
-            sum(y[rt, c] for rt in route_trucktypes if c in route_cities[rt[0]]) >= demand[c]
-        )
-    
-    for rt in route_trucktypes:
-        r = rt[0]
-        solver.Add(
-            sum(y[rt, c] for c in route_cities[r]) <= x[rt] * capacity[rt]
-        )
-    
-    solver.Minimize(
-        sum(cost[rt] * x[rt] for rt in route_trucktypes)
+    dist = distance_store.matrix(cities, np.array([coords[c] for c in cities], dtype=float))
+    origin = cities.index(start) if start and start in cities else 0
+    return [cities[i] for i in nearest_neighbor_tour(dist, origin)]
+
+def solution_hint(results: Dict[str, Any]) -> Dict[tuple, tuple]:
+    """MIP start for ``set_solution_hint`` from a stored optimization result."""
+    hint = {}
+    for route in results.get("routes_selected", []):
+        quantities = {cd["city"]: cd["quantity"] for cd in route.get("cities_delivered", [])}
+        hint[(route["route_id"], route["truck_type"])] = (route["trucks_used"], quantities)
+    return hint
+
+def result_layout(layout: Literal["records", "columnar"] = "records"):
+    """``columnar`` returns results as parallel arrays (see ``columnar_result``)."""
+    return columnar_result if layout == "columnar" else None
+
+def result_response(result: Dict[str, Any], layout=None) -> FastJSONResponse:
+    return FastJSONResponse(layout(result) if layout else result)
+
+def solver_options(
+    backend: Literal["scip", "cp-sat"] = SCIP,
+    time_limit: Optional[float] = Query(None, gt=0, description="Seconds before returning the best solution found"),
+    mip_gap: Optional[float] = Query(None, ge=0, description="Relative optimality gap to stop at"),
+    threads: Optional[int] = Query(None, ge=1),
+    presolve: bool = True,
+    generate_routes: bool = Query(False, description="Add routes generated from city coordinates to the listed ones"),
+    max_route_km: Optional[float] = Query(None, gt=0, description="Longest depot tour a generated route may have")
+) -> SolverOptions:
+    return SolverOptions(
+        backend=backend,
+        time_limit=time_limit if time_limit is not None else SOLVER_TIME_LIMIT,
+        mip_gap=mip_gap,
+        threads=threads,
+        presolve=presolve,
+        generate_routes=generate_routes,
+        max_route_km=max_route_km
     )
+
+def optimize_routes(problem: ProblemInstance, hint: Optional[Dict[tuple, tuple]] = None,
+                    options: Optional[SolverOptions] = None) -> Dict[str, Any]:
+    options = options or SolverOptions()
+    timer = StageTimer()
+    generation_report = None
+    # Cities are the same before and after route generation, so one network serves both;
+    # only route generation reads (and stores) its whole matrix, sequencing takes per-route submatrices
+    network = DistanceNetwork.for_problem(distance_store, problem)
+    if options.generate_routes:
+        with timer.stage("distances"):
+            network.matrix  # built (or read from the store) here, so it is timed on its own
+        with timer.stage("route_generation"):
+            try:
+                problem, generation_report = generate_routes(problem, options.max_route_km,
+                                                             time_budget=ROUTE_GENERATION_TIME_BUDGET,
+                                                             network=network)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        logging.info(f"Route generation added {generation_report.generated_routes} routes "
+                     f"in {generation_report.iterations} pricing rounds ({generation_report.stopped})")
+    # Presolve keeps city ids, so only the option arrays below come from the reduced problem
+    with timer.stage("presolve"):
+        reduced, presolve_report = presolve(problem) if options.presolve else (problem, None)
+    if presolve_report:
+        logging.info(f"Presolve kept {presolve_report.options_after} of {presolve_report.options_before} route/truck options")
+    capacity = reduced.capacity.tolist()
+    cost = reduced.cost.tolist()
+    warehouse = problem.warehouse
+    warehouse_loads = {w["name"]: 0.0 for w in problem.warehouses} if problem.warehouses else None
     
-    status = solver.Solve()
+    solution, components = solve_decomposed(reduced, options, hint,
+                                           max_workers=worker_budget(SOLVER_COMPONENT_WORKERS))
+    timer.add("model_build", solution.stats.build_seconds)
+    timer.add("solve", solution.stats.solve_seconds)
     
-    if status != pywraplp.Solver.OPTIMAL:
-        raise HTTPException(status_code=500, detail="No optimal solution found")
+    if not solution.has_solution:
+        raise HTTPException(status_code=500, detail=f"No feasible solution found (solver status: {solution.status})")
     
-    routes_selected = []
-    total_trucks = 0
-    total_capacity_used = 0
-    total_demand = sum(demand.values())
+    with timer.stage("extract"):
+        x_values, y_values = solution.x_values, solution.y_values
     
-    for rt in route_trucktypes:
-        trucks_used = x[rt].solution_value()
-        if trucks_used > 0:
-            route_id = rt[0]
-            truck_type = rt[1]
-            
-            cities_delivered = []
-            total_delivered = 0
+        routes_selected = []
+        total_trucks = 0
+        total_capacity_used = 0
+        total_demand = problem.total_demand()
+    
+        for o in range(reduced.num_options):
+            trucks_used = x_values[o]
+            if trucks_used > 0:
+                route_id, truck_type = reduced.option_key(o)
+                route_depot = reduced.route_warehouse(reduced.option_route[o])
+                # Network row of the route's warehouse, when it has coordinates to start from
+                depot_row = int(reduced.route_depot[reduced.option_route[o]]) if reduced.route_depot is not None else 0
+                closed = route_depot is not None and network.num_depots > 0 and network.depot_located[depot_row]
             
-            coords = {c: (lat_dict.get(c, 0), long_dict.get(c, 0)) for c in route_cities[route_id]}
+                cities_delivered = []
+                delivered_ids = []
+                total_delivered = 0
             
-            for c in route_cities[route_id]:
-                qty = y[rt, c].solution_value()
-                if qty > 0:
-                    cities_delivered.append({
-                        "city": c,
-                        "quantity": round(qty, 2),
-                        "demand": demand.get(c, 0)
-                    })
-                    total_delivered += qty
+                for c, qty in zip(solution.y_cities[o], y_values[o]):
+                    if qty > 0:
+                        cities_delivered.append({
+                            "city": problem.city_names[c],
+                            "quantity": round(qty, 2),
+                            "demand": problem.city_demand(c)
+                        })
+                        delivered_ids.append(c)
+                        total_delivered += qty
             
-            if cities_delivered:
-                city_names = [cd["city"] for cd in cities_delivered]
-                sorted_cities = sort_cities_nearest_neighbor(city_names, coords)
+                if cities_delivered:
+                    with timer.stage("sequencing"):
+                        rows = [network.num_depots + c for c in delivered_ids]
+                        order, tour_distance = sequence_matrix(network.submatrix([depot_row] + rows if closed else rows),
+                                                               closed, time_budget=SEQUENCING_TIME_BUDGET)
+                    sorted_cities = [problem.city_names[delivered_ids[i]] for i in order]
                 
-                routes_selected.append({
-                    "route_id": route_id,
-                    "truck_type": truck_type,
-                    "trucks_used": round(trucks_used, 2),
-                    "capacity": capacity[rt],
-                    "cost_per_truck": cost[rt],
-                    "total_cost": round(cost[rt] * trucks_used, 2),
-                    "cities_delivered": cities_delivered,
-                    "sorted_cities": sorted_cities,
-                    "total_delivered": round(total_delivered, 2),
-                    "capacity_utilization": round((total_delivered / (trucks_used * capacity[rt])) * 100, 2)
-                })
+                    routes_selected.append({
+                        "route_id": route_id,
+                        "truck_type": truck_type,
+                        "warehouse": route_depot.get("name") if route_depot else None,
+                        "trucks_used": round(trucks_used, 2),
+                        "capacity": capacity[o],
+                        "cost_per_truck": cost[o],
+                        "total_cost": round(cost[o] * trucks_used, 2),
+                        "cities_delivered": cities_delivered,
+                        "sorted_cities": sorted_cities,
+                        "tour_distance_km": round(tour_distance, 2),
+                        "total_delivered": round(total_delivered, 2),
+                        "capacity_utilization": round((total_delivered / (trucks_used * capacity[o])) * 100, 2)
+                    })
                 
-                total_trucks += trucks_used
-                total_capacity_used += total_delivered
+                    total_trucks += trucks_used
+                    total_capacity_used += total_delivered
+                    if warehouse_loads is not None:
+                        warehouse_loads[route_depot["name"]] += total_delivered
     
-    city_coordinates = {}
-    for city in cities:
-        if city in lat_dict and city in long_dict:
-            city_coordinates[city] = [lat_dict[city], long_dict[city]]
+        city_coordinates = {}
+        for city, lat, long in zip(problem.city_names, problem.lat.tolist(), problem.long.tolist()):
+            if not (math.isnan(lat) or math.isnan(long)):
+                city_coordinates[city] = [lat, long]
     
     summary_metrics = {
-        "total_cost": round(solver.Objective().Value(), 2),
+        "total_cost": round(solution.objective, 2),
         "total_trucks": round(total_trucks, 2),
         "total_demand": total_demand,
         "total_capacity_used": round(total_capacity_used, 2),
         "routes_optimized": len(routes_selected),
-        "cities_served": len([c for r in routes_selected for c in r["cities_delivered"]])
+        "cities_served": len([c for r in routes_selected for c in r["cities_delivered"]]),
+        "solver_backend": options.backend,
+        "independent_components": components,
+        "options_presolved_away": presolve_report.options_before - presolve_report.options_after if presolve_report else 0,
+        "solver_status": solution.status,
+        "objective_bound": round(solution.bound, 2) if solution.bound is not None and math.isfinite(solution.bound) else None,
+        "mip_gap": round(solution.gap, 6) if solution.gap is not None else None,
+        "warehouse_loads": {name: round(load, 2) for name, load in warehouse_loads.items()} if warehouse_loads else None,
+        "generated_routes_used": sum(1 for r in routes_selected if str(r["route_id"]).startswith(GENERATED_ROUTE_PREFIX))
+        if generation_report else 0
     }
     
     return {
@@ -287,227 +425,544 @@ def optimize_routes(data: Dict[str, Any]) -> Dict[str, Any]:
         "routes_selected": routes_selected,
         "summary_metrics": summary_metrics,
         "city_coordinates": city_coordinates,
+        "presolve": presolve_report.to_dict() if presolve_report else None,
+        "route_generation": generation_report.to_dict() if generation_report else None,
         "warehouse": {
-            "name": data.get("warehouse", {}).get("name") if data.get("warehouse") else None,
-            "lat": data.get("warehouse", {}).get("lat") if data.get("warehouse") else None,
-            "long": data.get("warehouse", {}).get("long") if data.get("warehouse") else None
-        } if data.get("warehouse") else None
+            "name": warehouse.get("name"),
+            "lat": warehouse.get("lat"),
+            "long": warehouse.get("long")
+        } if warehouse else None,
+        "warehouses": problem.warehouses,
+        # Taken off by take_solve_timings before the result is cached or returned
+        "timings": {"stages": timer.to_dict(), "solver": solution.stats.to_dict()}
     }
 
+def remember_problem(problem_id: str, problem: ProblemInstance) -> None:
+    parsed_problems[problem_id] = problem
+    parsed_problems.move_to_end(problem_id)
+    while len(parsed_problems) > PARSED_PROBLEM_CACHE_SIZE:
+        parsed_problems.popitem(last=False)
+
+async def load_problem(problem_id: str) -> ProblemInstance:
+    problem = parsed_problems.get(problem_id)
+    if problem is None:
+        data = await problem_store.get(problem_id)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Problem not found or expired; upload the file again")
+        try:
+            problem = await asyncio.to_thread(ProblemInstance.from_file_data, data)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid problem data: {str(e)}")
+    remember_problem(problem_id, problem)
+    return problem
+
+async def problem_input(file_data: Optional[Dict[str, Any]] = Body(None),
+                        problem_id: Optional[str] = None) -> ProblemInstance:
+    """The problem to optimize: an uploaded ``problem_id``, or ``file_data`` in the body."""
+    if problem_id:
+        return await load_problem(problem_id)
+    if file_data is None:
+        raise HTTPException(status_code=422, detail="Either problem_id or file_data is required")
+    try:
+        return await asyncio.to_thread(ProblemInstance.from_file_data, file_data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid problem data: {str(e)}")
+
 @api_router.post("/upload-excel")
 async def upload_excel(file: UploadFile = File(...)):
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Only Excel files are allowed")
+    """Parse and store a workbook, or a zip of CSV/Parquet tables; optimize or save it later by the returned ``problem_id``."""
+    if not file.filename.lower().endswith(UPLOAD_SUFFIXES):
+        raise HTTPException(status_code=400, detail=UPLOAD_TYPE_ERROR)
     
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
+    content = await file.read()
     
     try:
-        data = parse_excel_file(tmp_path)
-        
-        serializable_data = data.copy()
-        serializable_data["route_trucktypes"] = [[rt[0], rt[1]] for rt in data["route_trucktypes"]]
-        
-        serializable_data["capacity"] = {f"{k[0]}|{k[1]}": v for k, v in data["capacity"].items()}
-        serializable_data["cost"] = {f"{k[0]}|{k[1]}": v for k, v in data["cost"].items()}
-        
-        import math
-        for key in ['lat_dict', 'long_dict']:
-            serializable_data[key] = {
-                k: (v if isinstance(v, (int, float)) and math.isfinite(v) else 0)
-                for k, v in serializable_data[key].items()
-            }
-        
-        return {
-            "success": True,
-            "message": "File uploaded and validated successfully",
-            "data": {
-                "cities_count": len(data["cities"]),
-                "routes_count": len(data["routes"]),
-                "truck_types": data["truck_types"],
-                "warehouse": data.get("warehouse")
-            },
-            "file_data": serializable_data
-        }
+        problem, stages = await asyncio.to_thread(parse_workbook, content, file.filename)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error parsing Excel: {str(e)}")
-    finally:
-        os.unlink(tmp_path)
+    record_stages(stages)
+    
+    file_data = problem.to_file_data()
+    started = time.perf_counter()
+    problem_id = await problem_store.put(file_data, ttl_seconds=PROBLEM_HANDLE_TTL_SECONDS)
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage="persist")
+    remember_problem(problem_id, problem)
+    return {
+        "success": True,
+        "message": "File uploaded and validated successfully",
+        "problem_id": problem_id,
+        "data": {
+            "cities_count": problem.num_demand_cities,
+            "routes_count": len(file_data["routes"]),
+            "truck_types": file_data["truck_types"],
+            "warehouse": problem.warehouse,
+            "warehouses": problem.warehouses
+        }
+    }
+
+def record_stages(stages: Dict[str, float]) -> None:
+    for stage, seconds in stages.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+def take_solve_timings(result: Dict[str, Any], options: SolverOptions) -> Dict[str, Any]:
+    """Remove the ``timings`` block ``optimize_routes`` attaches and record it in the metrics."""
+    timings = result.pop("timings")
+    record_stages(timings["stages"])
+    stats = timings["solver"]
+    summary = result["summary_metrics"]
+    SOLVER_SECONDS.observe(stats["solve_seconds"], backend=options.backend)
+    SOLVER_NODES.observe(stats["nodes"], backend=options.backend)
+    MODEL_VARIABLES.observe(stats["variables"], backend=options.backend)
+    MODEL_CONSTRAINTS.observe(stats["constraints"], backend=options.backend)
+    SOLVES.inc(backend=options.backend, status=summary["solver_status"])
+    LAST_OBJECTIVE.set(summary["total_cost"], backend=options.backend)
+    if summary["objective_bound"] is not None:
+        LAST_BOUND.set(summary["objective_bound"], backend=options.backend)
+    return timings
+
+async def save_optimization_result(result: Dict[str, Any], problem_hash: Optional[str] = None,
+                                   timer: Optional[StageTimer] = None) -> None:
+    """Persist ``result`` and record its id as ``result["result_id"]`` (used for exports)."""
+    timer = timer or StageTimer()
+    with timer.stage("persist"):
+        result_obj = OptimizationResult(**result, problem_hash=problem_hash,
+                                        expires_at=result_cache.expires_at() if problem_hash else None)
+        result["result_id"] = result_obj.id
+        doc = result_obj.model_dump()
+        doc['timestamp'] = doc['timestamp'].isoformat()
+        await db.optimization_results.insert_one(doc)
+        if problem_hash:
+            result_cache.put(problem_hash, result)
+    STAGE_SECONDS.observe(timer.seconds["persist"], stage="persist")
 
 @api_router.post("/optimize")
-async def run_optimization(file_data: Dict[str, Any]):
+async def run_optimization(problem: ProblemInstance = Depends(problem_input), use_cache: bool = True,
+                           options: SolverOptions = Depends(solver_options), layout=Depends(result_layout),
+                           timings: bool = Query(False, description="Include per-stage seconds and solver statistics")):
     try:
-        processed_data = file_data.copy()
-        
-        if processed_data.get("route_trucktypes") and isinstance(processed_data["route_trucktypes"][0], list):
-            processed_data["route_trucktypes"] = [(rt[0], rt[1]) for rt in processed_data["route_trucktypes"]]
+        timer = StageTimer()
+        with timer.stage("cache_lookup"):
+            problem_hash = await asyncio.to_thread(result_cache_key, problem, options.to_dict())
+            cached = await result_cache.get(problem_hash) if use_cache else None
+        STAGE_SECONDS.observe(timer.seconds["cache_lookup"], stage="cache_lookup")
         
-        if isinstance(list(processed_data.get("capacity", {}).keys())[0], str):
-            processed_data["capacity"] = {tuple(k.split("|")): v for k, v in processed_data["capacity"].items()}
-            processed_data["cost"] = {tuple(k.split("|")): v for k, v in processed_data["cost"].items()}
+        if cached is not None:
+            response = {**cached, "cache_hit": True}
+            if timings:
+                response["timings"] = {"stages": timer.to_dict()}
+            return result_response(response, layout)
         
-        result = optimize_routes(processed_data)
+        result = await solver_pool.run(optimize_routes, problem, None, options)
+        solve_timings = take_solve_timings(result, options)
         
-        result_obj = OptimizationResult(**result)
-        doc = result_obj.model_dump()
-        doc['timestamp'] = doc['timestamp'].isoformat()
-        await db.optimization_results.insert_one(doc)
+        await save_optimization_result(result, problem_hash, timer)
         
-        return result
+        response = {**result, "cache_hit": False}
+        if timings:
+            solve_timings["stages"].update(timer.to_dict())
+            response["timings"] = solve_timings
+        return result_response(response, layout)
+    except SolverJobError as e:
+        logging.error(f"Optimization error: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=f"Optimization failed: {e.detail}")
     except Exception as e:
         logging.error(f"Optimization error: {e}")
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
 
-@api_router.post("/export-results")
-async def export_results(results_data: Dict[str, Any]):
+async def _persist_job_result(job: SolverJob, problem_hash: str, options: SolverOptions) -> None:
+    if job.status == COMPLETED:
+        take_solve_timings(job.result, options)
+        await save_optimization_result(job.result, problem_hash)
+        job.result["cache_hit"] = False
+
+@api_router.post("/optimize/jobs", status_code=202)
+async def submit_optimization_job(problem: ProblemInstance = Depends(problem_input), use_cache: bool = True,
+                                  options: SolverOptions = Depends(solver_options)):
+    problem_hash = await asyncio.to_thread(result_cache_key, problem, options.to_dict())
+    
+    if use_cache:
+        cached = await result_cache.get(problem_hash)
+        if cached is not None:
+            return solver_pool.add_completed({**cached, "cache_hit": True}).to_dict()
+    
+    job = solver_pool.submit(optimize_routes, problem, None, options,
+                             on_complete=lambda job: _persist_job_result(job, problem_hash, options))
+    return job.to_dict()
+
+async def _optimize_workbook(filename: str, content: bytes, use_cache: bool,
+                             options: SolverOptions) -> Dict[str, Any]:
     try:
-        output_path = f"/tmp/optimization_results_{uuid.uuid4()}.xlsx"
-        workbook = xlsxwriter.Workbook(output_path)
-        
-        summary_sheet = workbook.add_worksheet("Summary")
-        summary_sheet.write(0, 0, "Metric")
-        summary_sheet.write(0, 1, "Value")
-        
-        metrics = results_data.get("summary_metrics", {})
-        row = 1
-        for key, value in metrics.items():
-            summary_sheet.write(row, 0, key.replace("_", " ").title())
-            summary_sheet.write(row, 1, value)
-            row += 1
-        
-        routes_sheet = workbook.add_worksheet("Routes")
-        headers = ["Route ID", "Truck Type", "Trucks Used", "Capacity", "Cost per Truck", "Total Cost", "Total Delivered", "Capacity Utilization %"]
-        for col, header in enumerate(headers):
-            routes_sheet.write(0, col, header)
+        if not filename.lower().endswith(UPLOAD_SUFFIXES):
+            raise HTTPException(status_code=400, detail=UPLOAD_TYPE_ERROR)
         
-        row = 1
-        for route in results_data.get("routes_selected", []):
-            routes_sheet.write(row, 0, route["route_id"])
-            routes_sheet.write(row, 1, route["truck_type"])
-            routes_sheet.write(row, 2, route["trucks_used"])
-            routes_sheet.write(row, 3, route["capacity"])
-            routes_sheet.write(row, 4, route["cost_per_truck"])
-            routes_sheet.write(row, 5, route["total_cost"])
-            routes_sheet.write(row, 6, route["total_delivered"])
-            routes_sheet.write(row, 7, route["capacity_utilization"])
-            row += 1
+        problem, stages = await solver_pool.run(parse_workbook, content, filename)
+        record_stages(stages)
+        problem_hash = await asyncio.to_thread(result_cache_key, problem, options.to_dict())
         
-        deliveries_sheet = workbook.add_worksheet("City Deliveries")
-        deliveries_sheet.write(0, 0, "Route ID")
-        deliveries_sheet.write(0, 1, "Truck Type")
-        deliveries_sheet.write(0, 2, "City")
-        deliveries_sheet.write(0, 3, "Quantity Delivered")
-        deliveries_sheet.write(0, 4, "City Demand")
+        result = await result_cache.get(problem_hash) if use_cache else None
+        cache_hit = result is not None
+        if not cache_hit:
+            result = await solver_pool.run(optimize_routes, problem, None, options)
+            take_solve_timings(result, options)
+            await save_optimization_result(result, problem_hash)
         
-        row = 1
-        for route in results_data.get("routes_selected", []):
-            for city_data in route["cities_delivered"]:
-                deliveries_sheet.write(row, 0, route["route_id"])
-                deliveries_sheet.write(row, 1, route["truck_type"])
-                deliveries_sheet.write(row, 2, city_data["city"])
-                deliveries_sheet.write(row, 3, city_data["quantity"])
-                deliveries_sheet.write(row, 4, city_data["demand"])
-                row += 1
-        
-        workbook.close()
-        
-        return FileResponse(
-            output_path,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            filename="optimization_results.xlsx"
+        scenario = await store_scenario(ScenarioCreate(
+            name=Path(filename).stem,
+            description=f"Auto-created from {filename}",
+            input_data=problem.to_file_data(),
+            optimization_results=result
+        ))
+        return {
+            "filename": filename,
+            "success": True,
+            "scenario_id": scenario.id,
+            "scenario_name": scenario.name,
+            "cache_hit": cache_hit,
+            "summary_metrics": result["summary_metrics"]
+        }
+    except (HTTPException, SolverJobError) as e:
+        return {"filename": filename, "success": False, "error": e.detail}
+    except Exception as e:
+        logging.error(f"Batch optimization failed for {filename}: {e}")
+        return {"filename": filename, "success": False, "error": str(e)}
+
+@api_router.post("/optimize/batch")
+async def run_batch_optimization(files: List[UploadFile] = File(...), use_cache: bool = True,
+                                 options: SolverOptions = Depends(solver_options)):
+    # Read everything up front: the uploads are closed once the response starts streaming
+    uploads = [(file.filename, await file.read()) for file in files]
+    
+    async def stream_results():
+        tasks = [
+            asyncio.create_task(_optimize_workbook(filename, content, use_cache, options))
+            for filename, content in uploads
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@api_router.post("/optimize/sweep")
+async def run_sensitivity_sweep(sweep: SweepRequest, problem: ProblemInstance = Depends(problem_input),
+                                options: SolverOptions = Depends(solver_options)):
+    """Solve every combination of the given demand/cost/capacity factors on one reusable model."""
+    axes = sweep_axes(sweep.demand, sweep.cost, sweep.capacity)
+    try:
+        validate_sweep(problem, axes, sweep.city_groups, SWEEP_MAX_POINTS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        result = await solver_pool.run(run_sweep, problem, axes, sweep.city_groups, options, SOLVER_COMPONENT_WORKERS)
+    except SolverJobError as e:
+        logging.error(f"Sweep error: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=f"Sweep failed: {e.detail}")
+    except Exception as e:
+        logging.error(f"Sweep error: {e}")
+        raise HTTPException(status_code=500, detail=f"Sweep failed: {str(e)}")
+    STAGE_SECONDS.observe(result["summary"]["wall_seconds"], stage="sweep")
+    return FastJSONResponse(result)
+
+@api_router.get("/optimize/jobs/{job_id}")
+async def get_optimization_job(job_id: str, layout=Depends(result_layout)):
+    job = solver_pool.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    doc = job.to_dict()
+    if layout and "result" in doc:
+        doc["result"] = layout(doc["result"])
+    return FastJSONResponse(doc)
+
+@api_router.delete("/optimize/jobs/{job_id}")
+async def cancel_optimization_job(job_id: str):
+    job = solver_pool.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not solver_pool.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job.to_dict()
+
+async def find_result(result_id: str) -> Optional[Dict[str, Any]]:
+    """Stored optimization result by result id, or the latest result of a scenario id."""
+    projection = {"_id": 0, "routes_selected": 1, "summary_metrics": 1}
+    result = await db.optimization_results.find_one({"id": result_id}, projection)
+    if result is None:
+        scenario = await db.scenarios.find_one(
+            {"id": result_id},
+            {"_id": 0, "optimization_results.routes_selected": 1, "optimization_results.summary_metrics": 1}
         )
+        result = (scenario or {}).get("optimization_results")
+    return result
+
+def observe_export(seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage="export")
+
+def export_response(result: Dict[str, Any], format: str = "xlsx", table: str = "routes"):
+    started = time.perf_counter()
+    if format == "xlsx":
+        buffer = write_workbook(result)
+        observe_export(time.perf_counter() - started)
+        return StreamingResponse(iter_buffer(buffer), media_type=XLSX_MEDIA_TYPE, headers={
+            "Content-Disposition": 'attachment; filename="optimization_results.xlsx"'
+        })
+    
+    header = TABLES[table]
+    if format == "csv":
+        # Rows are produced while streaming, so the time is taken as they are generated
+        chunks = timed_iter(iter_csv(header, table_rows(result, table)), observe_export)
+        return StreamingResponse(chunks, media_type="text/csv", headers={
+            "Content-Disposition": f'attachment; filename="optimization_{table}.csv"'
+        })
+    try:
+        buffer = write_parquet(header, table_rows(result, table))
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    observe_export(time.perf_counter() - started)
+    return StreamingResponse(iter_buffer(buffer), media_type="application/vnd.apache.parquet", headers={
+        "Content-Disposition": f'attachment; filename="optimization_{table}.parquet"'
+    })
+
+@api_router.get("/results/{result_id}/export")
+async def export_stored_results(result_id: str, format: Literal["xlsx", "csv", "parquet"] = "xlsx",
+                                table: Literal["routes", "deliveries"] = "routes"):
+    """Export a stored result (or a scenario's result) without sending it back.
+
+    ``xlsx`` returns the full workbook; ``csv`` and ``parquet`` return the
+    single ``table`` (routes or deliveries), for results too large for Excel.
+    """
+    result = await find_result(result_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Result not found")
+    try:
+        return await asyncio.to_thread(export_response, result, format, table)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+@api_router.post("/export-results")
+async def export_results(results_data: Dict[str, Any]):
+    try:
+        return await asyncio.to_thread(export_response, results_data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 # Scenario Management Endpoints
-@api_router.post("/scenarios", response_model=Scenario)
-async def create_scenario(scenario: ScenarioCreate):
-    scenario_obj = Scenario(**scenario.model_dump())
-    doc = scenario_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['updated_at'] = doc['updated_at'].isoformat()
+async def inflate_scenarios(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace each ``input_key`` with its stored ``input_data`` (one query for all).
+
+    The key is kept as ``problem_id``, so the scenario can be optimized by id.
+    """
+    payloads = await problem_store.get_many(doc["input_key"] for doc in docs if "input_key" in doc)
+    for doc in docs:
+        if "input_key" in doc:
+            key = doc.pop("input_key")
+            if key not in payloads:
+                raise HTTPException(status_code=500, detail=f"Input data of scenario {doc.get('id')} is missing")
+            doc["input_data"] = payloads[key]
+            doc["problem_id"] = key
+    return docs
+
+async def release_input_data(key: Optional[str]) -> None:
+    if key and not await db.scenarios.find_one({"input_key": key}, {"_id": 1}):
+        await problem_store.release(key)
+
+async def store_input_data(input_data: Optional[Dict[str, Any]], problem_id: Optional[str]) -> str:
+    """Key of the scenario input: an uploaded ``problem_id`` (kept from now on) or new ``input_data``."""
+    if problem_id:
+        if not await problem_store.pin(problem_id):
+            raise HTTPException(status_code=404, detail="Problem not found or expired; upload the file again")
+        return problem_id
+    if input_data is None:
+        raise HTTPException(status_code=422, detail="Either input_data or problem_id is required")
+    return await problem_store.put(input_data)
+
+async def store_scenario(scenario: ScenarioCreate) -> Scenario:
+    input_key = await store_input_data(scenario.input_data, scenario.problem_id)
+    scenario_obj = Scenario(**scenario.model_dump(exclude={"problem_id"}), problem_id=input_key)
+    doc = scenario_obj.model_dump(exclude={"input_data", "problem_id"})
+    doc["input_key"] = input_key
     await db.scenarios.insert_one(doc)
     return scenario_obj
 
-@api_router.get("/scenarios", response_model=List[Scenario])
-async def list_scenarios():
-    scenarios = await db.scenarios.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    for scenario in scenarios:
-        if isinstance(scenario['created_at'], str):
-            scenario['created_at'] = datetime.fromisoformat(scenario['created_at'])
-        if isinstance(scenario['updated_at'], str):
-            scenario['updated_at'] = datetime.fromisoformat(scenario['updated_at'])
-    return scenarios
+@api_router.post("/scenarios", response_model=Scenario)
+async def create_scenario(scenario: ScenarioCreate):
+    return await store_scenario(scenario)
+
+# Newest first; id breaks ties between scenarios created in the same instant
+SCENARIO_SORT = [("created_at", -1), ("id", -1)]
+
+SCENARIO_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "description": 1, "created_at": 1, "updated_at": 1,
+    "optimization_results.summary_metrics": 1
+}
+
+def encode_scenario_cursor(scenario: Dict[str, Any]) -> str:
+    created_at = scenario["created_at"]
+    payload = json.dumps([created_at.isoformat() if isinstance(created_at, datetime) else created_at, scenario["id"]])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_scenario_cursor(cursor: str) -> Dict[str, Any]:
+    """Mongo filter for the scenarios after ``cursor`` in ``SCENARIO_SORT`` order."""
+    try:
+        created_at, scenario_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        created_at = datetime.fromisoformat(created_at)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": scenario_id}}
+    ]}
+
+@api_router.get("/scenarios", response_model=ScenarioPage)
+async def list_scenarios(cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=200),
+                         view: Literal["summary", "full"] = "summary"):
+    query = decode_scenario_cursor(cursor) if cursor else {}
+    projection = SCENARIO_SUMMARY_PROJECTION if view == "summary" else {"_id": 0}
+    # One extra document tells whether another page exists
+    docs = await db.scenarios.find(query, projection).sort(SCENARIO_SORT).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_scenario_cursor(docs[limit - 1]) if len(docs) > limit else None
+    docs = docs[:limit]
+    
+    if view == "summary":
+        scenarios = []
+        for doc in docs:
+            metrics = (doc.pop("optimization_results", None) or {}).get("summary_metrics")
+            scenarios.append(ScenarioSummary(**doc, summary_metrics=metrics, has_results=metrics is not None).model_dump())
+    else:
+        scenarios = [Scenario(**doc).model_dump() for doc in await inflate_scenarios(docs)]
+    return FastJSONResponse(ScenarioPage(scenarios=scenarios, next_cursor=next_cursor).model_dump())
 
 @api_router.get("/scenarios/{scenario_id}", response_model=Scenario)
 async def get_scenario(scenario_id: str):
     scenario = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0})
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
-    if isinstance(scenario['created_at'], str):
-        scenario['created_at'] = datetime.fromisoformat(scenario['created_at'])
-    if isinstance(scenario['updated_at'], str):
-        scenario['updated_at'] = datetime.fromisoformat(scenario['updated_at'])
-    return scenario
+    return FastJSONResponse(Scenario(**(await inflate_scenarios([scenario]))[0]).model_dump())
 
 @api_router.put("/scenarios/{scenario_id}", response_model=Scenario)
 async def update_scenario(scenario_id: str, update: ScenarioUpdate):
-    scenario = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0})
+    scenario = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0, "input_key": 1})
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
     
     update_data = {k: v for k, v in update.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
+    changes = {"$set": update_data}
+    if "input_data" in update_data or "problem_id" in update_data:
+        update_data["input_key"] = await store_input_data(update_data.pop("input_data", None),
+                                                          update_data.pop("problem_id", None))
+        changes["$unset"] = {"input_data": ""}
     
-    await db.scenarios.update_one({"id": scenario_id}, {"$set": update_data})
+    await db.scenarios.update_one({"id": scenario_id}, changes)
+    if update_data.get("input_key", scenario.get("input_key")) != scenario.get("input_key"):
+        await release_input_data(scenario.get("input_key"))
     
-    updated_scenario = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0})
-    if isinstance(updated_scenario['created_at'], str):
-        updated_scenario['created_at'] = datetime.fromisoformat(updated_scenario['created_at'])
-    if isinstance(updated_scenario['updated_at'], str):
-        updated_scenario['updated_at'] = datetime.fromisoformat(updated_scenario['updated_at'])
-    return updated_scenario
+    return await get_scenario(scenario_id)
 
 @api_router.delete("/scenarios/{scenario_id}")
 async def delete_scenario(scenario_id: str):
-    result = await db.scenarios.delete_one({"id": scenario_id})
-    if result.deleted_count == 0:
+    deleted = await db.scenarios.find_one_and_delete({"id": scenario_id}, {"_id": 0, "input_key": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Scenario not found")
+    await release_input_data(deleted.get("input_key"))
     return {"message": "Scenario deleted successfully"}
 
-@api_router.post("/scenarios/{scenario_id}/duplicate", response_model=Scenario)
+@api_router.post("/scenarios/{scenario_id}/duplicate", response_model=ScenarioSummary)
 async def duplicate_scenario(scenario_id: str, new_name: str):
-    original = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0})
+    original = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0, "name": 1, "input_key": 1, "input_data": 1})
     if not original:
         raise HTTPException(status_code=404, detail="Scenario not found")
     
-    duplicate_data = ScenarioCreate(
-        name=new_name,
-        description=f"Copy of {original['name']}",
-        input_data=original["input_data"],
-        optimization_results=None
-    )
+    # The copy shares the stored input_data: one small document, no payload copy
+    input_key = original.get("input_key")
+    if input_key:
+        await problem_store.touch(input_key)
+    else:
+        input_key = await problem_store.put(original["input_data"])
     
-    new_scenario = Scenario(**duplicate_data.model_dump())
-    doc = new_scenario.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['updated_at'] = doc['updated_at'].isoformat()
-    await db.scenarios.insert_one(doc)
-    return new_scenario
+    doc = Scenario(name=new_name, description=f"Copy of {original['name']}").model_dump(exclude={"input_data", "problem_id"})
+    doc["input_key"] = input_key
+    await db.scenarios.insert_one(dict(doc))
+    return ScenarioSummary(**doc)
+
+def apply_scenario_delta(input_data: Dict[str, Any], delta: ScenarioDelta) -> Dict[str, Any]:
+    updated = dict(input_data)
+    for field, changes, known in (
+        ("demand", delta.demand, input_data.get("demand", {})),
+        ("cost", delta.cost, input_data.get("cost", {})),
+        ("capacity", delta.capacity, input_data.get("capacity", {})),
+    ):
+        unknown = [k for k in changes if k not in known]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown {field} keys: {', '.join(unknown[:10])}")
+        if changes:
+            updated[field] = {**known, **changes}
+    return updated
+
+@api_router.post("/scenarios/{scenario_id}/reoptimize")
+async def reoptimize_scenario(scenario_id: str, delta: ScenarioDelta, use_cache: bool = True,
+                              options: SolverOptions = Depends(solver_options), layout=Depends(result_layout)):
+    scenario = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0})
+    if not scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    old_input_key = scenario.get("input_key")
+    scenario = (await inflate_scenarios([scenario]))[0]
+    
+    input_data = apply_scenario_delta(scenario["input_data"], delta)
+    try:
+        problem = await asyncio.to_thread(ProblemInstance.from_file_data, input_data)
+        problem_hash = await asyncio.to_thread(result_cache_key, problem, options.to_dict())
+        
+        result = await result_cache.get(problem_hash) if use_cache else None
+        cache_hit = result is not None
+        if not cache_hit:
+            hint = solution_hint(scenario.get("optimization_results") or {})
+            result = await solver_pool.run(optimize_routes, problem, hint, options)
+            take_solve_timings(result, options)
+            await save_optimization_result(result, problem_hash)
+    except SolverJobError as e:
+        logging.error(f"Re-optimization error: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=f"Optimization failed: {e.detail}")
+    except Exception as e:
+        logging.error(f"Re-optimization error: {e}")
+        raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+    
+    input_key = await problem_store.put(input_data)
+    await db.scenarios.update_one({"id": scenario_id}, {
+        "$set": {
+            "input_key": input_key,
+            "optimization_results": result,
+            "updated_at": datetime.now(timezone.utc)
+        },
+        "$unset": {"input_data": ""}
+    })
+    if input_key != old_input_key:
+        await release_input_data(old_input_key)
+    
+    return result_response(
+        {**result, "cache_hit": cache_hit, "warm_started": not cache_hit and bool(scenario.get("optimization_results"))},
+        layout
+    )
 
 @api_router.post("/scenarios/compare")
 async def compare_scenarios(scenario_ids: List[str]):
     if len(scenario_ids) < 2:
         raise HTTPException(status_code=400, detail="At least 2 scenarios required for comparison")
     
-    scenarios = []
-    for scenario_id in scenario_ids:
-        scenario = await db.scenarios.find_one({"id": scenario_id}, {"_id": 0})
-        if not scenario:
-            raise HTTPException(status_code=404, detail=f"Scenario {scenario_id} not found")
-        scenarios.append(scenario)
+    found = {
+        doc["id"]: doc
+        for doc in await db.scenarios.find({"id": {"$in": scenario_ids}}, {"_id": 0}).to_list(len(scenario_ids))
+    }
+    missing = [scenario_id for scenario_id in scenario_ids if scenario_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Scenario {missing[0]} not found")
+    scenarios = await inflate_scenarios([found[scenario_id] for scenario_id in scenario_ids])
     
     comparison = {
         "scenarios": scenarios,
@@ -526,7 +981,12 @@ async def compare_scenarios(scenario_ids: List[str]):
                 "capacity_used": metrics.get("total_capacity_used", 0)
             })
     
-    return comparison
+    return FastJSONResponse(comparison)
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Stage timings and solver statistics in the Prometheus text format."""
+    return Response(metrics.render(), media_type=MetricsRegistry.CONTENT_TYPE)
 
 @api_router.get("/")
 async def root():
@@ -534,6 +994,9 @@ async def root():
 
 app.include_router(api_router)
 
+# Compress complete JSON responses above this many bytes (streamed ones are left alone)
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get('COMPRESSION_MINIMUM_SIZE', 1024)))
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -548,6 +1011,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def migrate_scenario_timestamps() -> None:
+    """Convert scenarios stored with ISO string timestamps to native dates."""
+    for field in ("created_at", "updated_at"):
+        await db.scenarios.update_many(
+            {field: {"$type": "string"}},
+            [{"$set": {field: {"$dateFromString": {"dateString": f"${field}"}}}}]
+        )
+
+@app.on_event("startup")
+async def ensure_indexes():
+    try:
+        await result_cache.ensure_indexes()
+        await db.scenarios.create_index("id", unique=True)
+        await db.scenarios.create_index(SCENARIO_SORT)
+        await db.scenarios.create_index("input_key")
+        await problem_store.ensure_indexes()
+        await problem_store.drop_orphaned_files()
+        await migrate_scenario_timestamps()
+    except Exception as e:
+        logger.warning(f"Could not prepare MongoDB indexes: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    solver_pool.shutdown()
+    if is_resolved(client):
+        client.close()
\ No newline at end of file
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+# Job lifecycle states
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class SolverJobError(Exception):
+    """Raised when a solver job fails or is cancelled.
+
+    Carries an HTTP status code and detail so endpoints can surface the
+    original ``HTTPException`` raised inside the worker process.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# Processes the job running in this pool child may use, including itself; None outside a child
+_worker_budget: Optional[int] = None
+
+
+def worker_budget(requested: int) -> int:
+    """``requested`` worker processes, capped by the CPU share the pool gave the current job.
+
+    Solves that fan out to their own process pools call this, so a pool
+    child does not start ``cpu_count`` more processes while other jobs
+    already hold those CPUs.
+    """
+    return requested if _worker_budget is None else max(1, min(requested, _worker_budget))
+
+
+def _run_in_child(conn, fn: Callable, args: tuple, workers: int) -> None:
+    global _worker_budget
+    _worker_budget = workers
+    # Own process group, so cancelling also stops any workers the solve spawns
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    # HTTPException is not picklable, so errors travel as (status, detail)
+    try:
+        conn.send(("ok", fn(*args)))
+    except Exception as e:
+        conn.send(("error", getattr(e, "status_code", 500), getattr(e, "detail", str(e))))
+    finally:
+        conn.close()
+
+
+class SolverJob:
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.status = PENDING
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.process = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    async def wait(self) -> Any:
+        if self.task is not None:
+            await asyncio.shield(self.task)
+        if self.status == COMPLETED:
+            return self.result
+        if self.status == CANCELLED:
+            raise SolverJobError(409, "Optimization job was cancelled")
+        raise SolverJobError(self.status_code or 500, self.error or "Optimization job failed")
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        doc = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if self.status == FAILED:
+            doc["error"] = self.error
+        if include_result and self.status == COMPLETED:
+            doc["result"] = self.result
+        return doc
+
+
+class SolverPool:
+    """Bounded pool that runs CPU-bound solver calls in worker processes.
+
+    Each job gets its own child process so a running solve can be cancelled
+    by terminating it; at most ``max_workers`` children run at once and the
+    rest queue. Finished jobs are kept in memory (up to ``max_finished_jobs``)
+    so their status and result can be polled.
+
+    Each child is handed the ``cpu_budget`` CPUs (default: all) that running
+    jobs are not holding, at least one, as its ``worker_budget``.
+    """
+
+    def __init__(self, max_workers: int, max_finished_jobs: int = 100, cpu_budget: Optional[int] = None):
+        self.max_workers = max(1, max_workers)
+        self.max_finished_jobs = max_finished_jobs
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        # CPUs handed to running children
+        self._allotted = 0
+        self.jobs: "OrderedDict[str, SolverJob]" = OrderedDict()
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._ctx = multiprocessing.get_context()
+        self._receivers = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="solver-recv")
+
+    def submit(self, fn: Callable, *args, track: bool = True,
+               on_complete: Optional[Callable[[SolverJob], Any]] = None) -> SolverJob:
+        job = SolverJob()
+        if track:
+            self.jobs[job.id] = job
+            self._prune()
+        job.task = asyncio.create_task(self._run(job, fn, args, on_complete))
+        return job
+
+    def add_completed(self, result: Any) -> SolverJob:
+        """Track a job whose result is already known (e.g. a cache hit)."""
+        job = SolverJob()
+        job.status = COMPLETED
+        job.result = result
+        job.started_at = job.finished_at = job.created_at
+        self.jobs[job.id] = job
+        self._prune()
+        return job
+
+    async def run(self, fn: Callable, *args) -> Any:
+        job = self.submit(fn, *args, track=False)
+        try:
+            return await job.wait()
+        except asyncio.CancelledError:
+            # Caller went away (e.g. client disconnect): stop the solve too
+            self._cancel_job(job)
+            raise
+
+    def get(self, job_id: str) -> Optional[SolverJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        self._cancel_job(job)
+        return True
+
+    def shutdown(self) -> None:
+        for job in list(self.jobs.values()):
+            if not job.done:
+                self._cancel_job(job)
+        self._receivers.shutdown(wait=False, cancel_futures=True)
+
+    def _cancel_job(self, job: SolverJob) -> None:
+        job.status = CANCELLED
+        job.finished_at = datetime.now(timezone.utc)
+        if job.process is not None and job.process.is_alive():
+            try:
+                os.killpg(job.process.pid, signal.SIGTERM)
+            except (AttributeError, OSError):
+                job.process.terminate()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    async def _run(self, job: SolverJob, fn: Callable, args: tuple,
+                   on_complete: Optional[Callable[[SolverJob], Any]]) -> None:
+        async with self._semaphore:
+            if job.status == CANCELLED:
+                return
+            workers = max(1, self.cpu_budget - self._allotted)
+            self._allotted += workers
+            parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(target=_run_in_child, args=(child_conn, fn, args, workers))
+            process.start()
+            child_conn.close()
+            job.process = process
+            job.status = RUNNING
+            job.started_at = datetime.now(timezone.utc)
+
+            loop = asyncio.get_running_loop()
+            try:
+                message = await loop.run_in_executor(self._receivers, parent_conn.recv)
+            except EOFError:
+                message = None
+            finally:
+                parent_conn.close()
+                await loop.run_in_executor(self._receivers, process.join)
+                job.process = None
+                self._allotted -= workers
+
+        if job.status == CANCELLED:
+            return
+        job.finished_at = datetime.now(timezone.utc)
+        if message is None:
+            job.status = FAILED
+            job.status_code = 500
+            job.error = f"Solver process exited unexpectedly (exit code {process.exitcode})"
+        elif message[0] == "ok":
+            job.status = COMPLETED
+            job.result = message[1]
+        else:
+            job.status = FAILED
+            job.status_code, job.error = message[1], message[2]
+
+        if on_complete is not None:
+            try:
+                await on_complete(job)
+            except Exception as e:
+                logging.error(f"Solver job {job.id} completion hook failed: {e}")
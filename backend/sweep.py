@@ -0,0 +1,207 @@
+import itertools
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model_builder import SCIP, CoveringSolution, CoveringSweep, SolverOptions, solve_covering
+from presolve import presolve, restrict_options, surviving_options
+from problem import ProblemInstance
+from solver_pool import worker_budget
+
+AXIS_KINDS = ("demand", "cost", "capacity")
+# Demand group that scales every city
+ALL_CITIES = "all"
+
+# (kind, name, values): e.g. ("demand", "north", [1.0, 1.05, 1.1]) or ("cost", "Large", [0.9, 1.1])
+Axis = Tuple[str, str, List[float]]
+Point = Dict[str, Dict[str, float]]
+Perturbation = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def sweep_axes(demand: Dict[str, List[float]], cost: Dict[str, List[float]],
+               capacity: Dict[str, List[float]]) -> List[Axis]:
+    """Axes of the grid: demand factors per city group, cost and capacity multipliers per truck type."""
+    return [(kind, name, list(values))
+            for kind, axes in zip(AXIS_KINDS, (demand, cost, capacity))
+            for name, values in axes.items()]
+
+
+def grid_points(axes: Sequence[Axis]) -> List[Point]:
+    """Every combination of one value per axis, last axis varying fastest."""
+    points = []
+    for combo in itertools.product(*(values for _, _, values in axes)):
+        point: Point = {kind: {} for kind in AXIS_KINDS}
+        for (kind, name, _), value in zip(axes, combo):
+            point[kind][name] = value
+        points.append(point)
+    return points
+
+
+def validate_sweep(problem: ProblemInstance, axes: Sequence[Axis], city_groups: Dict[str, List[Any]],
+                   max_points: int) -> None:
+    """Raise ``ValueError`` for unknown groups, cities or truck types, bad factors or too large a grid."""
+    cities = {str(c) for c in problem.city_names[:problem.num_demand_cities]}
+    for group, members in city_groups.items():
+        unknown = [str(c) for c in members if str(c) not in cities]
+        if unknown:
+            raise ValueError(f"Unknown cities in group {group!r}: {', '.join(unknown[:10])}")
+    trucks = {str(t) for t in problem.truck_type_names}
+    size = 1
+    for kind, name, values in axes:
+        if kind == "demand" and name != ALL_CITIES and name not in city_groups:
+            raise ValueError(f"Unknown city group {name!r}; define it in city_groups or use {ALL_CITIES!r}")
+        if kind != "demand" and name not in trucks:
+            raise ValueError(f"Unknown truck type {name!r}")
+        if not values:
+            raise ValueError(f"No values for {kind} {name!r}")
+        if any(not math.isfinite(v) or v <= 0 for v in values):
+            raise ValueError(f"Factors must be positive, got {values} for {kind} {name!r}")
+        size *= len(values)
+    if size > max_points:
+        raise ValueError(f"The grid has {size} points; at most {max_points} are allowed per sweep")
+
+
+def perturb(problem: ProblemInstance, point: Point, city_groups: Dict[str, List[Any]]) -> Perturbation:
+    """Per-city demand and per-option cost and capacity of ``problem`` at ``point``.
+
+    A city in several scaled groups gets the product of their factors.
+    """
+    city_ids = {str(c): i for i, c in enumerate(problem.city_names[:problem.num_demand_cities])}
+    demand_factor = np.ones(problem.num_demand_cities)
+    for group, factor in point.get("demand", {}).items():
+        if group == ALL_CITIES:
+            demand_factor *= factor
+        else:
+            demand_factor[[city_ids[str(c)] for c in dict.fromkeys(city_groups[group])]] *= factor
+    truck_ids = {str(t): i for i, t in enumerate(problem.truck_type_names)}
+    cost_factor = np.ones(len(problem.truck_type_names))
+    capacity_factor = np.ones(len(problem.truck_type_names))
+    for truck, factor in point.get("cost", {}).items():
+        cost_factor[truck_ids[truck]] = factor
+    for truck, factor in point.get("capacity", {}).items():
+        capacity_factor[truck_ids[truck]] = factor
+    return (problem.demand.astype(float) * demand_factor,
+            problem.cost.astype(float) * cost_factor[problem.option_truck],
+            problem.capacity.astype(float) * capacity_factor[problem.option_truck])
+
+
+def _sweep_model(problem: ProblemInstance, perturbations: List[Perturbation],
+                 presolve_options: bool) -> Tuple[ProblemInstance, np.ndarray]:
+    """The instance every point is solved on, and the ids of its options in ``problem``.
+
+    Factors are positive, so the stops presolve drops are the same at every
+    point; an option is kept if it survives dominance at any distinct
+    cost/capacity point, which keeps each point's optimum.
+    """
+    if not presolve_options:
+        return problem, np.arange(problem.num_options)
+    reduced, _ = presolve(problem)
+    seen = set()
+    kept = []
+    for _, cost, capacity in perturbations:
+        key = (cost.tobytes(), capacity.tobytes())
+        if key not in seen:
+            seen.add(key)
+            kept.append(surviving_options(replace(problem, cost=cost, capacity=capacity)))
+    keep = np.unique(np.concatenate(kept)) if kept else np.arange(problem.num_options)
+    return restrict_options(problem, reduced.route_city_ptr, reduced.route_city_idx, keep), keep
+
+
+def _solve_points(problem: ProblemInstance, perturbations: List[Perturbation],
+                  options: SolverOptions) -> List[CoveringSolution]:
+    # One model per worker for SCIP; CP-SAT bakes demand into variable domains, so it rebuilds per point
+    if options.backend != SCIP:
+        return [solve_covering(replace(problem, demand=demand, cost=cost, capacity=capacity), options)
+                for demand, cost, capacity in perturbations]
+    sweep = CoveringSweep(problem, options)
+    solutions = [sweep.solve(*perturbation) for perturbation in perturbations]
+    if solutions:
+        solutions[0].stats.build_seconds = sweep.build_seconds
+    return solutions
+
+
+def point_summary(solution: CoveringSolution, demand: np.ndarray, backend: str) -> Dict[str, Any]:
+    """``summary_metrics`` of one point, as ``optimize_routes`` reports them (without route sequencing)."""
+    summary = {
+        "total_cost": round(solution.objective, 2) if solution.has_solution else None,
+        "total_trucks": None,
+        "total_demand": round(float(demand.sum()), 2),
+        "total_capacity_used": None,
+        "routes_optimized": None,
+        "cities_served": None,
+        "solver_backend": backend,
+        "solver_status": solution.status,
+        "objective_bound": round(solution.bound, 2) if solution.bound is not None and math.isfinite(solution.bound) else None,
+        "mip_gap": round(solution.gap, 6) if solution.gap is not None else None,
+        "solve_seconds": round(solution.stats.solve_seconds, 6),
+    }
+    if solution.has_solution:
+        trucks = used = 0.0
+        routes = served = 0
+        for trucks_used, quantities in zip(solution.x_values, solution.y_values):
+            delivered = [q for q in quantities if q > 0]
+            if trucks_used > 0 and delivered:
+                routes += 1
+                served += len(delivered)
+                trucks += trucks_used
+                used += sum(delivered)
+        summary.update(total_trucks=round(trucks, 2), total_capacity_used=round(used, 2),
+                       routes_optimized=routes, cities_served=served)
+    return summary
+
+
+def run_sweep(problem: ProblemInstance, axes: Sequence[Axis], city_groups: Optional[Dict[str, List[Any]]] = None,
+              options: Optional[SolverOptions] = None, max_workers: int = 1) -> Dict[str, Any]:
+    """Solve ``problem`` at every point of the grid spanned by ``axes``.
+
+    Points are split into contiguous runs, one per worker process (up to
+    ``max_workers``, capped by ``worker_budget`` inside a solver pool child);
+    each worker builds its model once and solves its run in order,
+    warm-starting from the previous point. ``options.time_limit`` applies to
+    each point.
+    """
+    options = options or SolverOptions()
+    city_groups = city_groups or {}
+    started = time.perf_counter()
+    points = grid_points(axes)
+    perturbations = [perturb(problem, point, city_groups) for point in points]
+    model_problem, keep = _sweep_model(problem, perturbations, options.presolve)
+    model_perturbations = [(demand, cost[keep], capacity[keep]) for demand, cost, capacity in perturbations]
+
+    workers = max(1, min(worker_budget(max_workers), len(points)))
+    runs = [run.tolist() for run in np.array_split(np.arange(len(points)), workers)]
+    if workers == 1:
+        solutions = _solve_points(model_problem, model_perturbations, options)
+    else:
+        solutions = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context()) as executor:
+            futures = [executor.submit(_solve_points, model_problem, [model_perturbations[i] for i in run], options)
+                       for run in runs]
+            for future in futures:
+                solutions.extend(future.result())
+
+    results = [
+        {"factors": point, "summary_metrics": point_summary(solution, demand, options.backend)}
+        for point, solution, (demand, _, _) in zip(points, solutions, perturbations)
+    ]
+    return {
+        "axes": [{"kind": kind, "name": name, "values": values} for kind, name, values in axes],
+        "cost_curve": [result["summary_metrics"]["total_cost"] for result in results],
+        "points": results,
+        "summary": {
+            "points": len(points),
+            "solved": sum(solution.has_solution for solution in solutions),
+            "workers": workers,
+            "model_builds": workers if options.backend == SCIP else len(points),
+            "options": model_problem.num_options,
+            "options_presolved_away": problem.num_options - model_problem.num_options,
+            "build_seconds": round(sum(solution.stats.build_seconds for solution in solutions), 6),
+            "solve_seconds": round(sum(solution.stats.solve_seconds for solution in solutions), 6),
+            "wall_seconds": round(time.perf_counter() - started, 6),
+        },
+    }
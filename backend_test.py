@@ -87,12 +87,12 @@ class RouteOptimizationAPITester:
             success = response.status_code == 200
             if success:
                 data = response.json()
-                expected_keys = ['success', 'message', 'data', 'file_data']
+                expected_keys = ['success', 'message', 'data', 'problem_id']
                 has_keys = all(key in data for key in expected_keys)
                 success = success and has_keys and data.get('success', False)
                 details = f"Status: {response.status_code}, Cities: {data.get('data', {}).get('cities_count', 0)}, Routes: {data.get('data', {}).get('routes_count', 0)}"
                 self.log_test("Excel Upload & Validation", success, details)
-                return data.get('file_data') if success else None
+                return data.get('problem_id') if success else None
             else:
                 details = f"Status: {response.status_code}, Response: {response.text[:200]}"
                 self.log_test("Excel Upload & Validation", False, details)
@@ -102,14 +102,14 @@ class RouteOptimizationAPITester:
             self.log_test("Excel Upload & Validation", False, str(e))
             return None
 
-    def test_optimization(self, file_data):
+    def test_optimization(self, problem_id):
         """Test route optimization"""
-        if not file_data:
-            self.log_test("Route Optimization", False, "No file data provided")
+        if not problem_id:
+            self.log_test("Route Optimization", False, "No problem id provided")
             return None
             
         try:
-            response = requests.post(f"{self.api_url}/optimize", json=file_data, timeout=60)
+            response = requests.post(f"{self.api_url}/optimize", params={"problem_id": problem_id}, timeout=60)
             
             success = response.status_code == 200
             if success:
@@ -202,10 +202,10 @@ class RouteOptimizationAPITester:
         
         try:
             # Test 4: Excel upload and validation
-            file_data = self.test_excel_upload(excel_file)
+            problem_id = self.test_excel_upload(excel_file)
             
             # Test 5: Route optimization
-            optimization_data = self.test_optimization(file_data)
+            optimization_data = self.test_optimization(problem_id)
             
             # Test 6: Results export
             self.test_export_results(optimization_data)
@@ -0,0 +1,80 @@
+"""Cold-start cost of the API: import time, app startup and first responses, each in a fresh interpreter.
+
+    python benchmarks/cold_start.py [--repeat 5] [--path /api/scenarios ...] [--live]
+
+Without ``--live`` the database is the in-memory stub from ``stubs.py``, so
+the Mongo driver import and connection are not included; with it the
+server talks to ``MONGO_URL``. Also lists which heavy libraries the
+requests ended up importing.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pandas", "openpyxl", "ortools", "geopy", "xlsxwriter", "motor", "pymongo")
+
+
+def child(paths, live: bool) -> dict:
+    sys.path.insert(0, str(ROOT / "backend"))
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "route_optimizer_benchmark")
+
+    start = time.perf_counter()
+    import server
+    timings = {"import": time.perf_counter() - start}
+    loaded = {"import": [m for m in HEAVY_MODULES if m in sys.modules]}
+
+    from fastapi.testclient import TestClient
+
+    if not live:
+        import stubs
+        stubs.install(server)
+    start = time.perf_counter()
+    with TestClient(server.app) as client:
+        timings["startup"] = time.perf_counter() - start
+        for path in paths:
+            start = time.perf_counter()
+            client.get(path).raise_for_status()
+            timings[f"GET {path}"] = time.perf_counter() - start
+            loaded[f"GET {path}"] = [m for m in HEAVY_MODULES if m in sys.modules]
+    return {"seconds": timings, "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--path", dest="paths", action="append", help="GET path to time (repeatable)")
+    parser.add_argument("--live", action="store_true", help="Use MONGO_URL instead of the in-memory stub")
+    parser.add_argument("--output", help="Write the runs as JSON here")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    paths = args.paths or ["/api/", "/api/scenarios"]
+
+    if args.child:
+        print(json.dumps(child(paths, args.live)))
+        return
+
+    command = [sys.executable, __file__, "--child"] + [f"--path={p}" for p in paths] + (["--live"] if args.live else [])
+    runs = []
+    for _ in range(args.repeat):
+        out = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"Median of {args.repeat} cold starts ({'live Mongo' if args.live else 'stub database'}):")
+    for name in runs[0]["seconds"]:
+        median = statistics.median(run["seconds"][name] for run in runs)
+        print(f"  {name:28} {median * 1000:8.1f} ms   loaded: {', '.join(runs[0]['loaded'].get(name, [])) or '-'}")
+    total = statistics.median(sum(run["seconds"].values()) for run in runs)
+    print(f"  {'total':28} {total * 1000:8.1f} ms")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"args": vars(args), "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Synthetic route-optimization workbooks (or zips of CSV tables) of any size, in the upload format.
+
+Cities are clustered around regional hubs inside India's bounding box;
+each route serves a seed city and its nearest neighbours, so routes are
+geographically coherent, and every city is on at least one route. Each
+route offers a random subset of the truck types, priced by a fixed cost
+plus a per-km rate on the route's span.
+"""
+import csv
+import io
+import zipfile
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (name, capacity, fixed cost, cost per km)
+TRUCK_TYPES = [
+    ("Small", 1000, 12000, 18),
+    ("Medium", 2000, 20000, 26),
+    ("Large", 4000, 34000, 38),
+    ("XL", 8000, 60000, 55),
+]
+
+LAT_RANGE = (8.0, 35.0)
+LONG_RANGE = (68.0, 97.0)
+
+
+def generate_tables(n_cities: int, n_routes: Optional[int] = None, stops: Tuple[int, int] = (2, 8),
+                    truck_types: int = 3, warehouse: bool = True, seed: int = 0, warehouses: int = 1):
+    """Rows of the Cities, Route_Cities, Route_TruckTypes and Warehouse sheets.
+
+    With ``warehouse``, the first depot is at the centroid of the cities and
+    the other ``warehouses - 1`` at randomly chosen cities.
+
+    ``n_routes`` defaults to ``n_cities // 2`` (at least 3); more are added
+    if needed to cover every city. Route lengths are uniform in ``stops``
+    (capped at ``n_cities``).
+    """
+    rng = np.random.default_rng(seed)
+    n_routes = n_routes or max(3, n_cities // 2)
+    trucks = TRUCK_TYPES[:max(1, min(truck_types, len(TRUCK_TYPES)))]
+
+    n_hubs = max(1, int(np.sqrt(n_cities) / 2))
+    hubs = np.column_stack([rng.uniform(*LAT_RANGE, n_hubs), rng.uniform(*LONG_RANGE, n_hubs)])
+    home = rng.integers(0, n_hubs, n_cities)
+    coords = hubs[home] + rng.normal(0, 1.5, (n_cities, 2))
+    coords[:, 0] = coords[:, 0].clip(*LAT_RANGE)
+    coords[:, 1] = coords[:, 1].clip(*LONG_RANGE)
+    names = [f"City {i:05d}" for i in range(n_cities)]
+    demand = np.maximum(rng.lognormal(6.0, 0.7, n_cities).round(), 1).astype(int)
+    cities = [(name, int(d), float(lat), float(long)) for name, d, (lat, long) in zip(names, demand, coords)]
+
+    # Planar degrees are close enough for picking neighbours
+    scaled = coords * np.array([1.0, np.cos(np.radians(coords[:, 0].mean()))])
+    covered = np.zeros(n_cities, dtype=bool)
+    route_cities: List[Tuple[str, str]] = []
+    route_trucks: List[Tuple[str, str, int, int]] = []
+    # Seed routes at uncovered cities first so every city gets served
+    unvisited = iter(rng.permutation(n_cities).tolist())
+    r = 0
+    while r < n_routes or not covered.all():
+        seed_city = next((c for c in unvisited if not covered[c]), None)
+        if seed_city is None:
+            seed_city = int(rng.integers(n_cities))
+        length = int(min(rng.integers(stops[0], stops[1] + 1), n_cities))
+        distance = np.einsum("ij,ij->i", scaled - scaled[seed_city], scaled - scaled[seed_city])
+        # Clipped cities can coincide; make sure the seed itself always makes the cut
+        distance[seed_city] = -1.0
+        members = np.argpartition(distance, length - 1)[:length] if length < n_cities else np.arange(n_cities)
+        covered[members] = True
+        route = f"R{r + 1}"
+        for c in members:
+            route_cities.append((route, names[c]))
+        # ~111 km per degree; farthest stop from the seed city
+        span_km = 111.0 * float(np.sqrt(max(distance[members].max(), 0.0)))
+        offered = rng.choice(len(trucks), size=int(rng.integers(1, len(trucks) + 1)), replace=False)
+        for t in sorted(offered):
+            truck, capacity, fixed, per_km = trucks[t]
+            cost = int(round(fixed + per_km * (span_km + rng.uniform(50, 400)), -2))
+            route_trucks.append((route, truck, capacity, cost))
+        r += 1
+
+    warehouse_rows = []
+    if warehouse:
+        lat, long = coords.mean(axis=0)
+        warehouse_rows.append(("Central Warehouse", float(lat), float(long)))
+        for i, c in enumerate(rng.choice(n_cities, size=min(max(warehouses - 1, 0), n_cities), replace=False)):
+            warehouse_rows.append((f"Warehouse {i + 2}", float(coords[c, 0]), float(coords[c, 1])))
+    return cities, route_cities, route_trucks, warehouse_rows
+
+
+def _write_sheet(workbook, name: str, header: Sequence[str], rows) -> None:
+    sheet = workbook.add_worksheet(name)
+    sheet.write_row(0, 0, header)
+    for i, row in enumerate(rows, start=1):
+        sheet.write_row(i, 0, row)
+
+
+def generate_workbook(n_cities: int, n_routes: Optional[int] = None, stops: Tuple[int, int] = (2, 8),
+                      truck_types: int = 3, warehouse: bool = True, coordinates: bool = True,
+                      seed: int = 0, warehouses: int = 1) -> bytes:
+    """An ``.xlsx`` upload; without ``coordinates`` the Cities sheet has no lat/long (geocoded on parse)."""
+    import xlsxwriter
+
+    cities, route_cities, route_trucks, warehouse_rows = generate_tables(
+        n_cities, n_routes, stops, truck_types, warehouse, seed, warehouses)
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True})
+    if warehouse_rows:
+        _write_sheet(workbook, "Warehouse", ["warehouse", "lat", "long"], warehouse_rows)
+    if coordinates:
+        _write_sheet(workbook, "Cities", ["city", "demand", "lat", "long"], cities)
+    else:
+        _write_sheet(workbook, "Cities", ["city", "demand"], (row[:2] for row in cities))
+    _write_sheet(workbook, "Route_Cities", ["route", "city"], route_cities)
+    _write_sheet(workbook, "Route_TruckTypes", ["route", "truck_type", "capacity", "cost"], route_trucks)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def _write_csv(archive: zipfile.ZipFile, name: str, header: Sequence[str], rows) -> None:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(header)
+    writer.writerows(rows)
+    archive.writestr(f"{name}.csv", text.getvalue())
+
+
+def generate_table_archive(n_cities: int, n_routes: Optional[int] = None, stops: Tuple[int, int] = (2, 8),
+                           truck_types: int = 3, warehouse: bool = True, coordinates: bool = True,
+                           seed: int = 0, warehouses: int = 1) -> bytes:
+    """The same tables as ``generate_workbook``, as a ``.zip`` upload of one CSV file per sheet."""
+    cities, route_cities, route_trucks, warehouse_rows = generate_tables(
+        n_cities, n_routes, stops, truck_types, warehouse, seed, warehouses)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        if warehouse_rows:
+            _write_csv(archive, "Warehouse", ["warehouse", "lat", "long"], warehouse_rows)
+        if coordinates:
+            _write_csv(archive, "Cities", ["city", "demand", "lat", "long"], cities)
+        else:
+            _write_csv(archive, "Cities", ["city", "demand"], (row[:2] for row in cities))
+        _write_csv(archive, "Route_Cities", ["route", "city"], route_cities)
+        _write_csv(archive, "Route_TruckTypes", ["route", "truck_type", "capacity", "cost"], route_trucks)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic route-optimization workbook")
+    parser.add_argument("output", help="an .xlsx path, or .zip for CSV tables")
+    parser.add_argument("--cities", type=int, default=100)
+    parser.add_argument("--routes", type=int)
+    parser.add_argument("--min-stops", type=int, default=2)
+    parser.add_argument("--max-stops", type=int, default=8)
+    parser.add_argument("--truck-types", type=int, default=3)
+    parser.add_argument("--no-warehouse", action="store_true")
+    parser.add_argument("--warehouses", type=int, default=1)
+    parser.add_argument("--no-coordinates", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate = generate_table_archive if args.output.endswith(".zip") else generate_workbook
+    with open(args.output, "wb") as f:
+        f.write(generate(args.cities, args.routes, (args.min_stops, args.max_stops), args.truck_types,
+                                  not args.no_warehouse, not args.no_coordinates, args.seed, args.warehouses))
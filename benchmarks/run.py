@@ -0,0 +1,211 @@
+"""Benchmark the optimizer pipeline on synthetic workbooks, offline.
+
+Times ``parse_excel_file`` (with and without coordinates to geocode),
+``parse_table_archive`` on the same tables as zipped CSV,
+``optimize_routes``, ``sort_cities_nearest_neighbor``, nearest-warehouse
+assignment of cities and routes, ``export_results``
+and the upload -> optimize -> export API round trip, against stub Mongo
+and geocoder, and writes the results as JSON for later comparison:
+
+    python benchmarks/run.py --sizes 10 100 1000 10000
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "route_optimizer_benchmark")
+
+import server  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from depots import assign_routes  # noqa: E402
+from model_builder import SolverOptions  # noqa: E402
+
+import stubs  # noqa: E402
+from generator import generate_table_archive, generate_tables, generate_workbook  # noqa: E402
+
+CASES = ("parse", "parse_tables", "parse_geocoded", "optimize", "nearest_neighbor", "depot_assignment", "export", "api")
+# Warehouses the depot_assignment case assigns cities and routes to
+DEPOT_COUNT = 20
+RESULTS_FORMAT = 1
+
+
+def measure(fn: Callable[[], Any], repeat: int, budget: float,
+            setup: Optional[Callable[[], None]] = None):
+    """Run ``fn`` up to ``repeat`` times, stopping early once ``budget`` seconds are spent."""
+    runs = []
+    out = None
+    started = time.perf_counter()
+    while len(runs) < repeat:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        out = fn()
+        runs.append(time.perf_counter() - start)
+        if time.perf_counter() - started > budget:
+            break
+    return runs, out
+
+
+async def _drain(response) -> int:
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(n_cities: int, cases: List[str], args, client: TestClient) -> List[Dict[str, Any]]:
+    content = generate_workbook(n_cities, seed=args.seed)
+    problem = server.parse_excel_file(content)
+    options = SolverOptions(time_limit=args.time_limit)
+    coords = {city: (lat, long) for city, lat, long in zip(problem.city_names, problem.lat.tolist(), problem.long.tolist())}
+    demand_cities = problem.city_names[:problem.num_demand_cities]
+    state: Dict[str, Any] = {}
+
+    def optimize():
+        result = server.optimize_routes(problem, None, options)
+        state["result"] = result
+        return result
+
+    def export():
+        if "result" not in state:
+            optimize()
+        response = asyncio.run(server.export_results(state["result"]))
+        return asyncio.run(_drain(response))
+
+    def api():
+        uploaded = client.post("/api/upload-excel", files={"file": ("bench.xlsx", content)})
+        uploaded.raise_for_status()
+        optimized = client.post("/api/optimize", params={
+            "problem_id": uploaded.json()["problem_id"], "use_cache": False, "time_limit": args.time_limit})
+        optimized.raise_for_status()
+        exported = client.get(f"/api/results/{optimized.json()['result_id']}/export")
+        exported.raise_for_status()
+        return len(exported.content)
+
+    depot_tables = generate_tables(n_cities, seed=args.seed, warehouses=DEPOT_COUNT)[3] if "depot_assignment" in cases else []
+    depot_list = [{"name": name, "lat": lat, "long": long} for name, lat, long in depot_tables]
+
+    archive = generate_table_archive(n_cities, seed=args.seed) if "parse_tables" in cases else None
+    geocoded_content = generate_workbook(n_cities, seed=args.seed, coordinates=False) if "parse_geocoded" in cases else None
+    benchmarks = {
+        "parse": (lambda: server.parse_excel_file(content), None),
+        "parse_tables": (lambda: server.parse_table_archive(archive), None),
+        "parse_geocoded": (lambda: server.parse_excel_file(geocoded_content),
+                           lambda: setattr(server, "geolocator", stubs.fresh_geocoder(server))),
+        "optimize": (optimize, None),
+        "nearest_neighbor": (lambda: server.sort_cities_nearest_neighbor(demand_cities, coords), None),
+        "depot_assignment": (lambda: assign_routes(depot_list, problem.lat, problem.long,
+                                                   problem.route_city_ptr, problem.route_city_idx), None),
+        "export": (export, None),
+        "api": (api, None),
+    }
+
+    entries = []
+    for case in cases:
+        fn, setup = benchmarks[case]
+        entry: Dict[str, Any] = {"case": case, "cities": n_cities, "routes": len(problem.route_names),
+                                 "options": problem.num_options}
+        try:
+            runs, out = measure(fn, args.repeat, args.budget, setup)
+        except (Exception, MemoryError) as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+        else:
+            entry.update(runs=[round(r, 6) for r in runs], min=round(min(runs), 6),
+                         median=round(statistics.median(runs), 6))
+            if case == "optimize":
+                summary = out["summary_metrics"]
+                entry["solver"] = {"status": summary["solver_status"], "objective": summary["total_cost"],
+                                   "mip_gap": summary["mip_gap"], **out["timings"]["solver"]}
+                entry["stages"] = out["timings"]["stages"]
+            elif case in ("export", "api"):
+                entry["bytes"] = out
+        entries.append(entry)
+        status = entry.get("error") or f"median {entry['median']:.4f}s over {len(entry['runs'])} run(s)"
+        print(f"{case:17} {n_cities:>6} cities  {status}", flush=True)
+    return entries
+
+
+def compare(results: Dict[str, Any], baseline_path: str, tolerance: float) -> bool:
+    """Print median ratios against a baseline file; True if nothing regressed beyond ``tolerance``."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    before = {(e["case"], e["cities"]): e for e in baseline["results"] if "median" in e}
+    ok = True
+    print(f"\nAgainst {baseline_path} (commit {baseline.get('git_commit')}):")
+    for entry in results["results"]:
+        old = before.get((entry["case"], entry["cities"]))
+        if not old or "median" not in entry:
+            continue
+        ratio = entry["median"] / old["median"] if old["median"] else float("inf")
+        regressed = ratio > 1 + tolerance
+        ok = ok and not regressed
+        print(f"{entry['case']:17} {entry['cities']:>6} cities  {old['median']:.4f}s -> {entry['median']:.4f}s"
+              f"  x{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=60.0, help="Seconds per case before fewer repeats are run")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="Solver time limit per optimization")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results file to compare medians against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown before failing")
+    args = parser.parse_args()
+
+    stubs.install(server)
+    # Per-request INFO logs from the server and test client would drown the table
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results: Dict[str, Any] = {
+        "format": RESULTS_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "results": [],
+    }
+    with TestClient(server.app) as client:
+        for n_cities in args.sizes:
+            results["results"].extend(run_size(n_cities, args.cases, args, client))
+
+    output = Path(args.output) if args.output else (
+        ROOT / "benchmarks" / "results" / f"{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nWrote {output}")
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Encode time and size of an optimization result: FastAPI's default JSON path vs orjson vs columnar.
+
+    python benchmarks/serialization.py [--routes 2000] [--stops 8] [--cities 5000]
+"""
+import argparse
+import gzip
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from responses import FastJSONResponse, brotli, columnar_result  # noqa: E402
+
+
+def synthetic_result(n_routes: int, stops: int, n_cities: int, seed: int = 0):
+    """A result shaped like ``optimize_routes`` output."""
+    rng = random.Random(seed)
+    cities = [f"City {i}" for i in range(n_cities)]
+    routes = []
+    for r in range(n_routes):
+        visited = rng.sample(cities, stops)
+        delivered = [{"city": c, "quantity": float(rng.randint(1, 500)), "demand": rng.randint(1, 500)} for c in visited]
+        total = sum(d["quantity"] for d in delivered)
+        routes.append({
+            "route_id": f"R{r}",
+            "truck_type": rng.choice(["Small", "Medium", "Large"]),
+            "trucks_used": float(rng.randint(1, 4)),
+            "capacity": 1000,
+            "cost_per_truck": 25000,
+            "total_cost": 25000.0,
+            "cities_delivered": delivered,
+            "sorted_cities": visited,
+            "tour_distance_km": round(rng.uniform(100, 3000), 2),
+            "total_delivered": total,
+            "capacity_utilization": round(100 * total / 4000, 2),
+        })
+    return {
+        "total_cost": 25000.0 * n_routes,
+        "routes_selected": routes,
+        "summary_metrics": {"total_cost": 25000.0 * n_routes, "routes_optimized": n_routes, "cities_served": n_cities},
+        "city_coordinates": {c: [rng.uniform(8, 35), rng.uniform(68, 97)] for c in cities},
+        "warehouse": None,
+        "result_id": "benchmark",
+        "cache_hit": False,
+    }
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=2000)
+    parser.add_argument("--stops", type=int, default=8)
+    parser.add_argument("--cities", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = synthetic_result(args.routes, args.stops, args.cities)
+    cases = [
+        ("default (jsonable_encoder + json)", lambda: JSONResponse(jsonable_encoder(result)).body),
+        ("orjson records", lambda: FastJSONResponse(result).body),
+        ("orjson columnar", lambda: FastJSONResponse(columnar_result(result)).body),
+    ]
+
+    print(f"{args.routes} routes x {args.stops} stops, {args.cities} cities (best of {args.repeat})")
+    header = f"{'encoding':36} {'ms':>8} {'bytes':>11} {'gzip':>10}"
+    if brotli is not None:
+        header += f" {'brotli':>10}"
+    print(header)
+    for name, encode in cases:
+        seconds, body = timed(encode, args.repeat)
+        line = f"{name:36} {seconds * 1000:8.1f} {len(body):11,} {len(gzip.compress(body, 6)):10,}"
+        if brotli is not None:
+            line += f" {len(brotli.compress(body, quality=4)):10,}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""In-memory stand-ins for MongoDB and the geocoding provider, so benchmarks run offline.
+
+``install(server)`` points the server module's database, caches and
+geocoder at them.
+"""
+import copy
+import hashlib
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from generator import LAT_RANGE, LONG_RANGE
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            for op, operand in condition.items():
+                if op == "$exists" and (field in doc) != operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op in ("$gt", "$lt") and (value is None or not (value > operand if op == "$gt" else value < operand)):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if projection:
+        for field, keep in projection.items():
+            if not keep:
+                doc.pop(field, None)
+    doc.pop("_id", None)
+    return doc
+
+
+class StubCursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+
+    def sort(self, keys, direction=None):
+        keys = [(keys, direction)] if isinstance(keys, str) else keys
+        for field, order in reversed(keys):
+            self.docs.sort(key=lambda doc: doc.get(field), reverse=order < 0)
+        return self
+
+    def limit(self, n: int):
+        self.docs = self.docs[:n] if n else self.docs
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else self.docs
+
+
+class StubCollection:
+    """The subset of Motor's collection API the server uses; queries support ``$exists``, ``$in``, ``$gt``, ``$lt``."""
+
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+
+    async def create_index(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, doc):
+        self.docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=len(self.docs))
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        docs = self.find(query, projection)
+        if sort:
+            docs.sort(sort)
+        return docs.docs[0] if docs.docs else None
+
+    def find(self, query=None, projection=None):
+        return StubCursor([_project(doc, projection) for doc in self.docs if _matches(doc, query or {})])
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in self.docs:
+            if _matches(doc, query):
+                self._apply(doc, update, inserted=False)
+                return SimpleNamespace(matched_count=1)
+        if upsert:
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            self._apply(doc, update, inserted=True)
+            self.docs.append(doc)
+        return SimpleNamespace(matched_count=0)
+
+    async def update_many(self, query, update):
+        # Pipeline updates (startup migrations) have nothing to migrate here
+        if isinstance(update, list):
+            return SimpleNamespace(matched_count=0)
+        matched = [doc for doc in self.docs if _matches(doc, query)]
+        for doc in matched:
+            self._apply(doc, update, inserted=False)
+        return SimpleNamespace(matched_count=len(matched))
+
+    async def find_one_and_delete(self, query, projection=None):
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                return _project(self.docs.pop(i), projection)
+        return None
+
+    @staticmethod
+    def _apply(doc, update, inserted: bool) -> None:
+        if inserted:
+            doc.update(copy.deepcopy(update.get("$setOnInsert", {})))
+        doc.update(copy.deepcopy(update.get("$set", {})))
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+        for field, value in update.get("$max", {}).items():
+            doc[field] = max(doc[field], value) if field in doc else value
+
+
+class StubDatabase:
+    def __init__(self):
+        self.collections: Dict[str, StubCollection] = {}
+
+    def __getattr__(self, name: str) -> StubCollection:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self.collections.setdefault(name, StubCollection())
+
+    __getitem__ = __getattr__
+
+
+class StubGeocoder:
+    """geopy-style provider: a fixed point in India per query, no network."""
+
+    def geocode(self, query: str):
+        digest = hashlib.sha256(query.encode("utf-8")).digest()
+        lat = LAT_RANGE[0] + (LAT_RANGE[1] - LAT_RANGE[0]) * digest[0] / 255
+        long = LONG_RANGE[0] + (LONG_RANGE[1] - LONG_RANGE[0]) * digest[1] / 255
+        return SimpleNamespace(latitude=lat, longitude=long)
+
+
+def fresh_geocoder(server):
+    """An uncached, unthrottled geocoder on ``StubGeocoder``, so each parse really geocodes."""
+    return server.CachedGeocoder(StubGeocoder(), store=None, rate_limit=0)
+
+
+def install(server) -> StubDatabase:
+    db = StubDatabase()
+    server.db = db
+    server.result_cache.collection = db.optimization_results
+    server.problem_store.collection = db.problem_payloads
+    server.problem_store.bucket = None
+    server.geolocator = fresh_geocoder(server)
+    return db
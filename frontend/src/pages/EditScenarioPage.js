@@ -191,10 +191,35 @@ const EditScenarioPage = () => {
     }
   };
 
+  // Returns only changed demands/costs/capacities, or null if the network itself changed
+  const computeDelta = (original, edited) => {
+    const sameShape = ['cities', 'lat_dict', 'long_dict', 'route_cities', 'route_trucktypes'].every(
+      key => JSON.stringify(original?.[key] || null) === JSON.stringify(edited[key] || null)
+    );
+    if (!sameShape) return null;
+
+    const changed = (field) => Object.fromEntries(
+      Object.entries(edited[field] || {}).filter(([key, value]) => original[field]?.[key] !== value)
+    );
+    return { demand: changed('demand'), cost: changed('cost'), capacity: changed('capacity') };
+  };
+
   const handleOptimize = async () => {
     setSaving(true);
     try {
       const inputData = convertToInputData();
+      const delta = scenario?.id && scenario.optimization_results ? computeDelta(scenario.input_data, inputData) : null;
+
+      if (delta) {
+        // Warm-started solve on the server; it also stores the new inputs and results
+        const response = await axios.post(`${API}/scenarios/${scenario.id}/reoptimize`, delta);
+        await axios.put(`${API}/scenarios/${scenario.id}`, { name: scenarioName, description });
+
+        toast.success('Optimization completed!');
+        navigate('/results', { state: { data: response.data, scenarioName } });
+        return;
+      }
+
       const response = await axios.post(`${API}/optimize`, inputData);
       
       // Save scenario with results
@@ -1,7 +1,6 @@
 import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { UploadCloud, X, Loader2, FileSpreadsheet } from 'lucide-react';
-import axios from 'axios';
 import { toast } from 'sonner';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -16,11 +15,11 @@ const MultiUploadPage = () => {
   const handleFilesSelect = (e) => {
     const selectedFiles = Array.from(e.target.files);
     const excelFiles = selectedFiles.filter(f => 
-      f.name.endsWith('.xlsx') || f.name.endsWith('.xls')
+      ['.xlsx', '.xls', '.zip'].some(ext => f.name.toLowerCase().endsWith(ext))
     );
     
     if (excelFiles.length !== selectedFiles.length) {
-      toast.error('Some files were skipped - only Excel files allowed');
+      toast.error('Some files were skipped - only Excel files or .zip tables allowed');
     }
     
     setFiles(excelFiles);
@@ -40,39 +39,42 @@ const MultiUploadPage = () => {
     const scenarios = [];
 
     try {
-      // Upload each file and create scenario
-      for (let i = 0; i < files.length; i++) {
-        const file = files[i];
-        const formData = new FormData();
-        formData.append('file', file);
-
-        // Upload and parse Excel
-        const uploadResponse = await axios.post(`${API}/upload-excel`, formData, {
-          headers: { 'Content-Type': 'multipart/form-data' }
-        });
-
-        if (!uploadResponse.data.success) {
-          toast.error(`Failed to upload ${file.name}`);
-          continue;
-        }
-
-        // Optimize
-        const optimizeResponse = await axios.post(`${API}/optimize`, uploadResponse.data.file_data);
-
-        // Create scenario
-        const scenarioName = file.name.replace(/\.xlsx?$/i, '');
-        const scenarioData = {
-          name: scenarioName,
-          description: `Auto-created from ${file.name}`,
-          input_data: uploadResponse.data.file_data,
-          optimization_results: optimizeResponse.data
-        };
-
-        const scenarioResponse = await axios.post(`${API}/scenarios`, scenarioData);
-        scenarios.push(scenarioResponse.data);
+      // One request for the whole batch; the server parses and solves the
+      // files in parallel and streams one NDJSON line per finished file
+      const formData = new FormData();
+      files.forEach(file => formData.append('files', file));
+
+      const response = await fetch(`${API}/optimize/batch`, { method: 'POST', body: formData });
+      if (!response.ok || !response.body) {
+        throw new Error(`Batch request failed with status ${response.status}`);
+      }
 
-        toast.success(`✓ ${scenarioName} completed (${i + 1}/${files.length})`);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let finished = 0;
+
+      const handleLine = (line) => {
+        if (!line.trim()) return;
+        const item = JSON.parse(line);
+        finished += 1;
+        if (item.success) {
+          scenarios.push({ id: item.scenario_id, name: item.scenario_name });
+          toast.success(`✓ ${item.scenario_name} completed (${finished}/${files.length})`);
+        } else {
+          toast.error(`Failed to process ${item.filename}: ${item.error}`);
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
       }
+      handleLine(buffer);
 
       setUploadedScenarios(scenarios);
       
@@ -119,7 +121,7 @@ const MultiUploadPage = () => {
             <input
               id="multi-file-upload"
               type="file"
-              accept=".xlsx,.xls"
+              accept=".xlsx,.xls,.zip"
               multiple
               onChange={handleFilesSelect}
               className="hidden"
@@ -34,9 +34,10 @@ const ResultsPage = ({ data, onReset }) => {
   const handleDownload = async () => {
     setDownloading(true);
     try {
-      const response = await axios.post(`${API}/export-results`, data, {
-        responseType: 'blob',
-      });
+      // Stored results are exported server-side; older results without an id are posted back
+      const response = data.result_id
+        ? await axios.get(`${API}/results/${data.result_id}/export`, { responseType: 'blob' })
+        : await axios.post(`${API}/export-results`, data, { responseType: 'blob' });
 
       const url = window.URL.createObjectURL(new Blob([response.data]));
       const link = document.createElement('a');
@@ -63,8 +64,11 @@ const ResultsPage = ({ data, onReset }) => {
 
   const { summary_metrics, routes_selected, city_coordinates } = data;
 
-  // Get warehouse from data
+  // Get warehouses from data; routes name the one they start from
   const warehouse = data.warehouse || null;
+  const warehouses = data.warehouses || (warehouse ? [warehouse] : []);
+  const routeWarehouse = (route) =>
+    warehouses.find(w => w.name === route.warehouse) || warehouse;
 
   // Calculate map center
   const cityCoords = Object.values(city_coordinates || {});
@@ -158,10 +162,11 @@ const ResultsPage = ({ data, onReset }) => {
                 attribution='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>'
               />
               
-              {/* Warehouse Marker */}
-              {warehouse && warehouse.lat && warehouse.long && (
+              {/* Warehouse Markers */}
+              {warehouses.filter(w => w.lat && w.long).map(w => (
                 <CircleMarker
-                  center={[warehouse.lat, warehouse.long]}
+                  key={w.name}
+                  center={[w.lat, w.long]}
                   radius={12}
                   fillColor="#DC2626"
                   color="white"
@@ -171,12 +176,14 @@ const ResultsPage = ({ data, onReset }) => {
                   <Popup>
                     <div className="text-xs">
                       <strong>🏭 WAREHOUSE</strong><br />
-                      {warehouse.name}<br />
-                      <span className="text-slate-500">Starting point for all routes</span>
+                      {w.name}<br />
+                      <span className="text-slate-500">
+                        {warehouses.length > 1 ? 'Starting point for its routes' : 'Starting point for all routes'}
+                      </span>
                     </div>
                   </Popup>
                 </CircleMarker>
-              )}
+              ))}
               
               {routes_selected?.map((route, idx) => {
                 const color = ROUTE_COLORS[idx % ROUTE_COLORS.length];
@@ -186,14 +193,15 @@ const ResultsPage = ({ data, onReset }) => {
                   .filter(c => c);
 
                 // Create COMPLETE LOOP: Warehouse → Cities → Warehouse
+                const depot = routeWarehouse(route);
                 let loopCoords = [];
-                if (warehouse && warehouse.lat && warehouse.long) {
-                  // Start at warehouse
-                  loopCoords.push([warehouse.lat, warehouse.long]);
+                if (depot && depot.lat && depot.long) {
+                  // Start at the route's warehouse
+                  loopCoords.push([depot.lat, depot.long]);
                   // Add all cities
                   loopCoords = loopCoords.concat(cityCoords);
                   // Return to warehouse (complete the loop)
-                  loopCoords.push([warehouse.lat, warehouse.long]);
+                  loopCoords.push([depot.lat, depot.long]);
                 } else {
                   // No warehouse, just connect cities
                   loopCoords = cityCoords;
@@ -208,7 +216,7 @@ const ResultsPage = ({ data, onReset }) => {
                         color={color}
                         weight={3}
                         opacity={0.8}
-                        dashArray={warehouse ? "10, 5" : null}
+                        dashArray={depot ? "10, 5" : null}
                       />
                     )}
                     
@@ -9,7 +9,9 @@ const API = `${BACKEND_URL}/api`;
 
 const ScenariosPage = ({ onLoadScenario }) => {
   const [scenarios, setScenarios] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedForComparison, setSelectedForComparison] = useState([]);
   const navigate = useNavigate();
 
@@ -20,7 +22,8 @@ const ScenariosPage = ({ onLoadScenario }) => {
   const loadScenarios = async () => {
     try {
       const response = await axios.get(`${API}/scenarios`);
-      setScenarios(response.data);
+      setScenarios(response.data.scenarios);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Failed to load scenarios');
       console.error(error);
@@ -29,6 +32,32 @@ const ScenariosPage = ({ onLoadScenario }) => {
     }
   };
 
+  const loadMoreScenarios = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`${API}/scenarios`, { params: { cursor: nextCursor } });
+      setScenarios(prev => [...prev, ...response.data.scenarios]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Failed to load scenarios');
+      console.error(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // The list only carries summaries; fetch the full scenario when it is opened
+  const fetchScenario = async (scenarioId) => {
+    try {
+      const response = await axios.get(`${API}/scenarios/${scenarioId}`);
+      return response.data;
+    } catch (error) {
+      toast.error('Failed to load scenario');
+      console.error(error);
+      return null;
+    }
+  };
+
   const handleDelete = async (scenarioId) => {
     if (!window.confirm('Are you sure you want to delete this scenario?')) return;
     
@@ -54,8 +83,11 @@ const ScenariosPage = ({ onLoadScenario }) => {
     }
   };
 
-  const handleLoadScenario = (scenario) => {
-    navigate('/edit-scenario', { state: { scenario } });
+  const handleLoadScenario = async (scenarioId) => {
+    const scenario = await fetchScenario(scenarioId);
+    if (scenario) {
+      navigate('/edit-scenario', { state: { scenario } });
+    }
   };
 
   const handleRename = async (scenarioId, currentName) => {
@@ -71,7 +103,9 @@ const ScenariosPage = ({ onLoadScenario }) => {
     }
   };
 
-  const handleViewResults = (scenario) => {
+  const handleViewResults = async (scenarioId) => {
+    const scenario = await fetchScenario(scenarioId);
+    if (!scenario) return;
     if (!scenario.optimization_results) {
       toast.error('This scenario has not been optimized yet');
       return;
@@ -199,19 +233,19 @@ const ScenariosPage = ({ onLoadScenario }) => {
                 />
               </div>
 
-              {scenario.optimization_results && (
+              {scenario.has_results && (
                 <div className="mb-4 p-3 bg-slate-50 rounded-lg">
                   <div className="grid grid-cols-2 gap-2 text-xs">
                     <div>
                       <p className="text-slate-500 uppercase font-semibold" style={{ fontFamily: 'Barlow Condensed, sans-serif' }}>Cost</p>
                       <p className="text-lg font-mono font-bold text-slate-900">
-                        ₹{scenario.optimization_results.summary_metrics?.total_cost?.toLocaleString() || 0}
+                        ₹{scenario.summary_metrics?.total_cost?.toLocaleString() || 0}
                       </p>
                     </div>
                     <div>
                       <p className="text-slate-500 uppercase font-semibold" style={{ fontFamily: 'Barlow Condensed, sans-serif' }}>Trucks</p>
                       <p className="text-lg font-mono font-bold text-slate-900">
-                        {scenario.optimization_results.summary_metrics?.total_trucks?.toFixed(1) || 0}
+                        {scenario.summary_metrics?.total_trucks?.toFixed(1) || 0}
                       </p>
                     </div>
                   </div>
@@ -220,16 +254,16 @@ const ScenariosPage = ({ onLoadScenario }) => {
 
               <div className="flex gap-2">
                 <button
-                  onClick={() => handleLoadScenario(scenario)}
+                  onClick={() => handleLoadScenario(scenario.id)}
                   className="flex-1 bg-white text-slate-900 border border-slate-200 hover:bg-slate-50 rounded-md px-3 py-2 text-sm font-medium transition-all flex items-center justify-center gap-2"
                   data-testid={`load-scenario-${scenario.id}`}
                 >
                   <Edit className="w-4 h-4" />
                   Edit
                 </button>
-                {scenario.optimization_results && (
+                {scenario.has_results && (
                   <button
-                    onClick={() => handleViewResults(scenario)}
+                    onClick={() => handleViewResults(scenario.id)}
                     className="flex-1 bg-blue-50 text-blue-600 border border-blue-200 hover:bg-blue-100 rounded-md px-3 py-2 text-sm font-medium transition-all flex items-center justify-center gap-2"
                     data-testid={`view-results-${scenario.id}`}
                   >
@@ -256,6 +290,19 @@ const ScenariosPage = ({ onLoadScenario }) => {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="mt-8 flex justify-center">
+          <button
+            onClick={loadMoreScenarios}
+            disabled={loadingMore}
+            className="bg-white text-slate-900 border border-slate-200 hover:bg-slate-50 rounded-md px-6 py-2 text-sm font-medium transition-all disabled:opacity-50"
+            data-testid="load-more-scenarios"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
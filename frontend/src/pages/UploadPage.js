@@ -28,11 +28,11 @@ const UploadPage = ({ onDataUploaded, onOptimizationComplete, fileData, loadedSc
   const handleFileSelect = (e) => {
     const selectedFile = e.target.files[0];
     if (selectedFile) {
-      if (selectedFile.name.endsWith('.xlsx') || selectedFile.name.endsWith('.xls')) {
+      if (['.xlsx', '.xls', '.zip'].some(ext => selectedFile.name.toLowerCase().endsWith(ext))) {
         setFile(selectedFile);
         setValidationResult(null);
       } else {
-        toast.error('Please select an Excel file (.xlsx or .xls)');
+        toast.error('Please select an Excel file (.xlsx or .xls) or a .zip of CSV/Parquet tables');
       }
     }
   };
@@ -67,7 +67,7 @@ const UploadPage = ({ onDataUploaded, onOptimizationComplete, fileData, loadedSc
         console.log('Truck types from response:', result.data.truck_types);
         
         setValidationResult(result);
-        onDataUploaded(result.file_data);
+        onDataUploaded(result.problem_id);
         toast.success('File uploaded and validated successfully!');
       }
     } catch (error) {
@@ -79,12 +79,15 @@ const UploadPage = ({ onDataUploaded, onOptimizationComplete, fileData, loadedSc
   };
 
   const handleOptimize = async () => {
-    if (!validationResult || !validationResult.file_data) return;
+    if (!validationResult || !validationResult.problem_id) return;
 
     setOptimizing(true);
 
     try {
-      const response = await axios.post(`${API}/optimize`, validationResult.file_data);
+      // The parsed problem stays on the server; only its id is sent back
+      const response = await axios.post(`${API}/optimize`, null, {
+        params: { problem_id: validationResult.problem_id },
+      });
       setLastOptimizationResult(response.data);
       onOptimizationComplete(response.data);
       toast.success('Optimization completed successfully!');
@@ -109,7 +112,7 @@ const UploadPage = ({ onDataUploaded, onOptimizationComplete, fileData, loadedSc
       const scenarioData = {
         name: scenarioName,
         description: scenarioDescription,
-        input_data: validationResult.file_data,
+        problem_id: validationResult.problem_id,
         optimization_results: lastOptimizationResult
       };
 
@@ -194,7 +197,7 @@ const UploadPage = ({ onDataUploaded, onOptimizationComplete, fileData, loadedSc
             <input
               id="file-upload"
               type="file"
-              accept=".xlsx,.xls"
+              accept=".xlsx,.xls,.zip"
               onChange={handleFileSelect}
               className="hidden"
               data-testid="file-input"
@@ -211,7 +214,7 @@ const UploadPage = ({ onDataUploaded, onOptimizationComplete, fileData, loadedSc
                 <UploadCloud className="w-16 h-16 text-slate-400 group-hover:text-blue-500 transition-colors mb-4" />
                 <p className="text-lg font-medium text-slate-900 mb-1">Drop your Excel file here</p>
                 <p className="text-sm text-slate-500">or click to browse</p>
-                <p className="text-xs text-slate-400 mt-2">Supported formats: .xlsx, .xls</p>
+                <p className="text-xs text-slate-400 mt-2">Supported formats: .xlsx, .xls, .zip (CSV or Parquet tables)</p>
               </>
             )}
           </label>
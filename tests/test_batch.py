@@ -0,0 +1,106 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from result_cache import ResultCache
+
+
+class _Collection:
+    """Just enough of a Motor collection for the batch path: inserts, and no stored results to find."""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def find_one(self, query, projection=None, sort=None):
+        return None
+
+
+class _ProblemStore:
+    def __init__(self):
+        self.payloads = {}
+
+    async def put(self, data, ttl_seconds=None):
+        key = f"problem-{len(self.payloads)}"
+        self.payloads[key] = data
+        return key
+
+
+class _SolverPool:
+    """Runs jobs in threads instead of worker processes."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, fn, *args):
+        self.calls.append(fn.__name__)
+        return await asyncio.to_thread(fn, *args)
+
+
+def _workbook():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        pd.DataFrame({"city": ["A", "B"], "demand": [100, 50], "lat": [19.0, 19.5], "long": [72.8, 73.0]}).to_excel(
+            writer, sheet_name="Cities", index=False)
+        pd.DataFrame({"route": ["R1", "R1", "R2"], "city": ["A", "B", "B"]}).to_excel(
+            writer, sheet_name="Route_Cities", index=False)
+        pd.DataFrame({"route": ["R1", "R2"], "truck_type": ["T", "T"], "capacity": [200, 100], "cost": [900, 500]}
+                     ).to_excel(writer, sheet_name="Route_TruckTypes", index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    db = SimpleNamespace(scenarios=_Collection(), optimization_results=_Collection())
+    pool = _SolverPool()
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "problem_store", _ProblemStore())
+    monkeypatch.setattr(server, "result_cache", ResultCache(db.optimization_results))
+    monkeypatch.setattr(server, "solver_pool", pool)
+    return SimpleNamespace(client=TestClient(server.app), db=db, pool=pool)
+
+
+def _post(client, files, **params):
+    response = client.post("/api/optimize/batch", files=[("files", file) for file in files],
+                           params={"time_limit": 10, **params})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return {line["filename"]: line for line in lines}, lines
+
+
+def test_batch_streams_one_line_per_file_and_a_bad_file_does_not_block_the_rest(batch):
+    results, lines = _post(batch.client, [("bad.xlsx", b"not a workbook"), ("good.xlsx", _workbook()),
+                                          ("notes.txt", b"")])
+    assert len(lines) == 3
+    good = results["good.xlsx"]
+    assert good["success"] and not good["cache_hit"]
+    assert good["scenario_name"] == "good"
+    assert good["summary_metrics"]["total_cost"] == 900
+    assert not results["bad.xlsx"]["success"] and results["bad.xlsx"]["error"]
+    assert results["notes.txt"] == {"filename": "notes.txt", "success": False, "error": server.UPLOAD_TYPE_ERROR}
+
+    # Only the good file was stored, as a result and as a scenario
+    assert [doc["id"] for doc in batch.db.scenarios.docs] == [good["scenario_id"]]
+    assert len(batch.db.optimization_results.docs) == 1
+    assert batch.pool.calls.count("optimize_routes") == 1
+
+
+def test_batch_reuses_cached_results(batch):
+    _post(batch.client, [("first.xlsx", _workbook())])
+    results, _ = _post(batch.client, [("again.xlsx", _workbook())])
+    assert results["again.xlsx"]["success"] and results["again.xlsx"]["cache_hit"]
+    assert batch.pool.calls.count("optimize_routes") == 1
+    assert len(batch.db.scenarios.docs) == 2
+
+    results, _ = _post(batch.client, [("fresh.xlsx", _workbook())], use_cache=False)
+    assert not results["fresh.xlsx"]["cache_hit"]
+    assert batch.pool.calls.count("optimize_routes") == 2
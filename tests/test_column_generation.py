@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+import pytest
+
+import column_generation as cg
+from column_generation import GENERATED_ROUTE_PREFIX, generate_routes, savings_routes
+from model_builder import SolverOptions, solve_covering
+from problem import ProblemInstance
+from sequencing import haversine_from
+
+# A cluster of four cities about 100 km north of the warehouse
+COORDINATES = {"A": (1.0, 0.0), "B": (1.2, 0.0), "C": (0.8, 0.2), "D": (1.1, -0.2)}
+WAREHOUSE = {"name": "Depot", "lat": 0.0, "long": 0.0}
+
+
+def _round_trip_cost(city, fixed=1000, per_km=2):
+    return int(round(fixed + per_km * 2 * haversine_from((0.0, 0.0), [COORDINATES[city]])[0]))
+
+
+def _problem(demand=100, warehouse=WAREHOUSE):
+    # Only single-city routes are listed, each priced as a fixed + per-km round trip
+    cities = list(COORDINATES)
+    return ProblemInstance.from_file_data({
+        "cities": cities,
+        "demand": {c: demand for c in cities},
+        "lat_dict": {c: lat for c, (lat, _) in COORDINATES.items()},
+        "long_dict": {c: long for c, (_, long) in COORDINATES.items()},
+        "route_cities": {f"R{c}": [c] for c in cities},
+        "route_trucktypes": [(f"R{c}", "Small") for c in cities],
+        "capacity": {(f"R{c}", "Small"): 400 for c in cities},
+        "cost": {(f"R{c}", "Small"): _round_trip_cost(c) for c in cities},
+        "warehouse": warehouse,
+    })
+
+
+def test_truck_models_fit_the_listed_costs():
+    problem = _problem()
+    geo = cg._Geometry(problem)
+    truck = cg.fit_truck_models(problem, geo)[0]
+    assert truck.capacity == 400
+    assert truck.fixed_cost == pytest.approx(1000, abs=1)
+    assert truck.cost_per_km == pytest.approx(2, abs=0.01)
+
+
+def test_savings_merges_within_capacity_and_distance():
+    problem = _problem()
+    geo = cg._Geometry(problem)
+    demand = problem.demand.astype(float)
+    neighbors = geo.neighbors(np.arange(4))
+    assert sorted(map(sorted, savings_routes(demand, geo, 400, math.inf, neighbors))) == [[0, 1, 2, 3]]
+    assert sorted(len(r) for r in savings_routes(demand, geo, 200, math.inf, neighbors)) == [2, 2]
+    # No two-city tour fits in 230 km, so every city keeps its own round trip
+    assert len(savings_routes(demand, geo, 400, 230, neighbors)) == 4
+
+
+def test_generated_routes_lower_the_integer_optimum():
+    problem = _problem()
+    base = solve_covering(problem)
+    augmented, report = generate_routes(problem)
+    assert report.seed_routes == 1 and report.generated_routes >= 1
+    assert report.stopped in ("no_improving_route", "iteration_limit")
+    assert augmented.route_names[:4] == problem.route_names
+    assert augmented.route_names[4] == f"{GENERATED_ROUTE_PREFIX}1"
+    assert sorted(augmented.route_city_ids(4).tolist()) == [0, 1, 2, 3]
+
+    solution = solve_covering(augmented)
+    assert solution.status == "optimal"
+    # One truck round the cluster beats four round trips
+    assert solution.objective < base.objective / 2
+    assert report.lp_objective <= solution.objective + 1e-6
+
+
+def test_pricing_finds_negative_reduced_cost_routes():
+    problem = _problem()
+    geo = cg._Geometry(problem)
+    trucks = cg.fit_truck_models(problem, geo)
+    demand = problem.demand.astype(float)
+    neighbors = geo.neighbors(np.arange(4))
+    duals = np.full(4, 10.0)
+    seen = set()
+    columns = cg.price_routes(duals, demand, geo, trucks, math.inf, neighbors, seen, seeds=4, limit=10)
+    assert columns
+    route, truck, reduced_cost = columns[0]
+    assert sorted(route) == [0, 1, 2, 3] and truck == 0
+    stops = [-1] + route + [-1]
+    length = sum(geo.km(a, b) for a, b in zip(stops, stops[1:]))
+    assert reduced_cost == pytest.approx(trucks[0].cost(length) - 4000)
+    # A route is offered once, and low duals price nothing out
+    assert cg.price_routes(duals, demand, geo, trucks, math.inf, neighbors, seen, seeds=4, limit=10) == []
+    assert cg.price_routes(np.full(4, 1.0), demand, geo, trucks, math.inf, neighbors, set(), seeds=4, limit=10) == []
+
+
+def test_depot_defaults_to_demand_centroid():
+    problem = _problem(warehouse=None)
+    lat, long = cg.depot_location(problem)
+    assert lat == pytest.approx(1.025) and long == pytest.approx(0.0)
+
+
+def test_missing_coordinates_are_rejected():
+    problem = _problem()
+    problem.lat = problem.lat.copy()
+    problem.lat[2] = np.nan
+    with pytest.raises(ValueError, match="C"):
+        generate_routes(problem)
+
+
+def test_optimize_routes_reports_generated_routes():
+    import server
+
+    result = server.optimize_routes(_problem(), options=SolverOptions(generate_routes=True))
+    assert result["route_generation"]["generated_routes"] >= 1
+    assert result["summary_metrics"]["generated_routes_used"] == 1
+    assert [r["route_id"] for r in result["routes_selected"]] == [f"{GENERATED_ROUTE_PREFIX}1"]
+    assert "route_generation" in result["timings"]["stages"]
+
+    plain = server.optimize_routes(_problem())
+    assert plain["route_generation"] is None
+    assert plain["summary_metrics"]["generated_routes_used"] == 0
+    assert result["total_cost"] < plain["total_cost"]
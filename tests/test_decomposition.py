@@ -0,0 +1,52 @@
+from decomposition import connected_components, solve_decomposed
+from model_builder import CP_SAT, SolverOptions, solve_covering
+from problem import ProblemInstance
+
+
+def _regional_problem(**extra_demand):
+    # North (A, B, C) and South (D, E) share no route
+    demand = {"A": 100, "B": 150, "C": 80, "D": 60, "E": 90, **extra_demand}
+    return ProblemInstance.from_file_data({
+        "cities": list(demand),
+        "demand": demand,
+        "route_cities": {"N1": ["A", "B"], "N2": ["B", "C"], "S1": ["D", "E"], "S2": ["E"]},
+        "route_trucktypes": [("N1", "Small"), ("S1", "Large"), ("N2", "Large"), ("S2", "Small"), ("S1", "Small")],
+        "capacity": {("N1", "Small"): 200, ("N2", "Large"): 400, ("S1", "Large"): 400,
+                     ("S1", "Small"): 100, ("S2", "Small"): 100},
+        "cost": {("N1", "Small"): 1000, ("N2", "Large"): 1500, ("S1", "Large"): 1200,
+                 ("S1", "Small"): 700, ("S2", "Small"): 300},
+    })
+
+
+def test_components_split_disjoint_regions():
+    components = connected_components(_regional_problem())
+    assert sorted((c.tolist(), o.tolist()) for c, o in components) == [([0, 1, 2], [0, 2]), ([3, 4], [1, 3, 4])]
+
+
+def test_unreachable_demand_city_is_its_own_block():
+    problem = _regional_problem(F=10)
+    assert ([5], []) in [(c.tolist(), o.tolist()) for c, o in connected_components(problem)]
+    solution, _ = solve_decomposed(problem, max_workers=2)
+    assert solution.status == "infeasible"
+
+
+def test_decomposed_solution_matches_monolithic_solve():
+    problem = _regional_problem()
+    whole = solve_covering(problem)
+    for workers in (1, 2):
+        solution, components = solve_decomposed(problem, SolverOptions(time_limit=10), max_workers=workers)
+        assert components == 2
+        assert solution.status == "optimal"
+        assert solution.objective == whole.objective == 3500
+        for o in range(problem.num_options):
+            assert sorted(solution.y_cities[o]) == sorted(whole.y_cities[o])
+        delivered = {}
+        for cities, values in zip(solution.y_cities, solution.y_values):
+            for c, qty in zip(cities, values):
+                delivered[c] = delivered.get(c, 0) + qty
+        assert all(delivered[c] >= problem.demand[c] for c in range(problem.num_demand_cities))
+
+
+def test_decomposition_with_cp_sat():
+    solution, _ = solve_decomposed(_regional_problem(), SolverOptions(backend=CP_SAT, threads=1), max_workers=2)
+    assert solution.objective == 3500
@@ -0,0 +1,210 @@
+import io
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from decomposition import connected_components, solve_decomposed
+from depots import SpatialIndex, assign_routes, read_warehouses
+from model_builder import CP_SAT, SCIP, SolverOptions, solve_covering
+from presolve import presolve
+from problem import ProblemInstance
+from sequencing import haversine_from
+
+WAREHOUSES = [
+    {"name": "West", "lat": 0.0, "long": 0.0, "capacity": None},
+    {"name": "East", "lat": 0.0, "long": 2.0, "capacity": None},
+]
+
+
+def _problem(west_capacity=None, east_capacity=None):
+    # A and B sit near West, C near East; Rx routes serve A from either side
+    warehouses = [dict(WAREHOUSES[0], capacity=west_capacity), dict(WAREHOUSES[1], capacity=east_capacity)]
+    return ProblemInstance.from_file_data({
+        "cities": ["A", "B", "C"],
+        "demand": {"A": 100, "B": 100, "C": 100},
+        "lat_dict": {"A": 0.1, "B": -0.1, "C": 0.1},
+        "long_dict": {"A": 0.2, "B": 0.1, "C": 1.9},
+        "route_cities": {"RW": ["A", "B"], "RE": ["C"], "RX": ["A", "C"]},
+        "route_trucktypes": [("RW", "T"), ("RE", "T"), ("RX", "T")],
+        "capacity": {("RW", "T"): 200, ("RE", "T"): 100, ("RX", "T"): 200},
+        "cost": {("RW", "T"): 1000, ("RE", "T"): 800, ("RX", "T"): 900},
+        "warehouse": {"name": "West", "lat": 0.0, "long": 0.0},
+        "warehouses": warehouses,
+        "route_warehouse": {"RX": "East"},
+    })
+
+
+def test_nearest_matches_brute_force_haversine():
+    rng = np.random.default_rng(0)
+    points = np.column_stack([rng.uniform(-60, 60, 200), rng.uniform(-180, 180, 200)])
+    points[7] = np.nan
+    queries = np.column_stack([rng.uniform(-60, 60, 50), rng.uniform(-180, 180, 50)])
+    km, ids = SpatialIndex(points[:, 0], points[:, 1]).nearest(queries[:, 0], queries[:, 1], k=3)
+    for query, row_km, row_ids in zip(queries, km, ids):
+        distance = haversine_from(query, points)
+        distance[7] = np.inf
+        assert row_ids.tolist() == np.argsort(distance)[:3].tolist()
+        assert row_km == pytest.approx(np.sort(distance)[:3], rel=1e-6)
+
+    km, ids = SpatialIndex([0.0, np.nan], [0.0, 1.0]).nearest([np.nan, 1.0], [0.0, 0.0], k=2)
+    assert ids.tolist() == [[-1, -1], [0, -1]]
+    assert np.isinf(km[0]).all() and np.isinf(km[1, 1])
+
+
+def test_kd_tree_and_numpy_scan_agree():
+    rng = np.random.default_rng(2)
+    lat, long = rng.uniform(-60, 60, 500), rng.uniform(-180, 180, 500)
+    queries = np.column_stack([rng.uniform(-60, 60, 40), rng.uniform(-180, 180, 40)])
+    tree = SpatialIndex(lat, long)
+    assert tree._tree is not None
+    scan = SpatialIndex(lat, long)
+    scan._tree = None
+    tree_km, tree_ids = tree.nearest(queries[:, 0], queries[:, 1], k=5)
+    scan_km, scan_ids = scan.nearest(queries[:, 0], queries[:, 1], k=5)
+    assert (tree_ids == scan_ids).all() and np.allclose(tree_km, scan_km)
+    assert tree.within(10.0, 20.0, 2000).tolist() == scan.within(10.0, 20.0, 2000).tolist()
+
+
+def test_within_returns_points_in_radius_nearest_first():
+    index = SpatialIndex([0.0, 0.0, 0.0, 5.0], [0.5, 0.1, 1.5, 0.0])
+    # 0.1 and 0.5 degrees of longitude at the equator are ~11 and ~56 km
+    assert index.within(0.0, 0.0, 60).tolist() == [1, 0]
+    assert index.within(0.0, 0.0, 10).tolist() == []
+    assert index.within(np.nan, 0.0, 1000).tolist() == []
+
+
+def test_routes_go_to_the_depot_nearest_most_stops():
+    lat = np.array([0.1, 0.1, 0.1, np.nan])
+    long = np.array([0.1, 0.2, 1.9, 1.0])
+    ptr = np.array([0, 2, 4, 5, 6, 6])
+    idx = np.array([0, 2, 1, 2, 2, 3], dtype=np.int32)
+    # Majority West; tie goes to the lower id; East; unlocated and empty routes fall back to 0
+    assert assign_routes(WAREHOUSES + [{"name": "North", "lat": 9.0, "long": 9.0}], lat, long, ptr, idx).tolist() == [0, 0, 1, 0, 0]
+
+
+def test_assignment_is_sub_second_for_50k_cities():
+    rng = np.random.default_rng(1)
+    lat, long = rng.uniform(8, 35, 50_000), rng.uniform(68, 97, 50_000)
+    idx = rng.integers(0, 50_000, 200_000).astype(np.int32)
+    ptr = np.arange(0, 200_001, 8)
+    warehouses = [{"name": f"W{i}", "lat": a, "long": b}
+                  for i, (a, b) in enumerate(zip(rng.uniform(8, 35, 50), rng.uniform(68, 97, 50)))]
+    started = time.perf_counter()
+    route_depot = assign_routes(warehouses, lat, long, ptr, idx)
+    assert time.perf_counter() - started < 1.0
+    assert len(route_depot) == 25_000 and route_depot.max() < 50
+
+
+def test_read_warehouses_takes_every_row():
+    rows = read_warehouses(pd.DataFrame({"warehouse": ["W", "E", None], "lat": [1, 2, 3], "long": [4, 5, 6],
+                                         "capacity": [500, None, 7]}))
+    assert rows == [{"name": "W", "lat": 1.0, "long": 4.0, "capacity": 500.0},
+                    {"name": "E", "lat": 2.0, "long": 5.0, "capacity": None}]
+    assert read_warehouses(pd.DataFrame({"warehouse": ["W"], "lat": [1], "long": [4]}))[0]["capacity"] is None
+
+
+def test_problem_keeps_route_depots_through_file_data_and_subproblems():
+    problem = _problem(west_capacity=150)
+    assert problem.route_depot.tolist() == [0, 1, 1]
+    assert problem.route_warehouse(0)["name"] == "West"
+
+    data = problem.to_file_data()
+    assert data["route_warehouse"] == {"RW": "West", "RE": "East", "RX": "East"}
+    again = ProblemInstance.from_file_data(data)
+    assert again.route_depot.tolist() == [0, 1, 1]
+    assert again.fingerprint() == problem.fingerprint() != _problem(west_capacity=200).fingerprint()
+
+    sub = problem.subproblem(np.array([1, 2]), np.array([0, 2]))
+    assert sub.route_names == ["RE", "RX"] and sub.route_depot.tolist() == [1, 1]
+
+    # One depot without a limit is the plain single-warehouse case
+    single = ProblemInstance.from_file_data({**data, "warehouses": WAREHOUSES[:1]})
+    assert single.warehouses is None and single.route_depot is None
+    assert single.fingerprint() == ProblemInstance.from_file_data({**data, "warehouses": None}).fingerprint()
+
+
+@pytest.mark.parametrize("backend", [SCIP, CP_SAT])
+def test_depot_capacity_moves_deliveries_to_another_depot(backend):
+    options = SolverOptions(backend=backend, time_limit=10)
+    # Unlimited: RW for A and B, RE for C
+    assert solve_covering(_problem(), options).objective == 1800
+    # West can ship only 150, so A has to come from East on RX (which also covers C)
+    solution = solve_covering(_problem(west_capacity=150), options)
+    assert solution.objective == 1900
+    west = sum(sum(y) for o, y in enumerate(solution.y_values) if o == 0)
+    assert west <= 150 + 1e-6
+    assert solve_covering(_problem(west_capacity=150, east_capacity=100), options).status == "infeasible"
+
+
+def test_capacity_limited_depot_links_its_routes():
+    problem = ProblemInstance.from_file_data({
+        "cities": ["A", "B"],
+        "demand": {"A": 100, "B": 100},
+        "lat_dict": {"A": 0.0, "B": 0.0},
+        "long_dict": {"A": 0.1, "B": 0.2},
+        "route_cities": {"R1": ["A"], "R2": ["B"]},
+        "route_trucktypes": [("R1", "T"), ("R2", "T")],
+        "capacity": {("R1", "T"): 100, ("R2", "T"): 100},
+        "cost": {("R1", "T"): 500, ("R2", "T"): 500},
+        "warehouses": [dict(WAREHOUSES[0], capacity=150), WAREHOUSES[1]],
+    })
+    assert len(connected_components(problem)) == 1
+    assert solve_decomposed(problem, SolverOptions(), max_workers=2)[0].status == "infeasible"
+    unlimited = ProblemInstance.from_file_data({**problem.to_file_data(), "warehouses": WAREHOUSES})
+    assert len(connected_components(unlimited)) == 2
+
+
+def test_presolve_keeps_options_of_other_depots():
+    # RX serves everything RE does at the same price, but ships from a full depot
+    problem = _problem(west_capacity=150)
+    problem.cost = np.array([1000, 900, 900])
+    problem.route_depot = np.array([0, 1, 0], dtype=np.int32)
+    reduced, report = presolve(problem)
+    assert report.dominated_options == []
+    unlimited = _problem()
+    unlimited.cost = np.array([1000, 900, 900])
+    assert presolve(unlimited)[1].dominated_options == ["RE|T"]
+
+
+def test_parse_and_optimize_start_routes_at_their_own_depot():
+    import server
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        pd.DataFrame({"warehouse": ["West", "East"], "lat": [0.0, 0.0], "long": [0.0, 2.0], "capacity": [1000, None]}
+                     ).to_excel(writer, sheet_name="Warehouse", index=False)
+        pd.DataFrame({"city": ["A", "B", "C"], "demand": [100, 100, 100], "lat": [0.1, -0.1, 0.1],
+                      "long": [0.2, 0.1, 1.9]}).to_excel(writer, sheet_name="Cities", index=False)
+        pd.DataFrame({"route": ["RW", "RW", "RE"], "city": ["A", "B", "C"]}).to_excel(
+            writer, sheet_name="Route_Cities", index=False)
+        pd.DataFrame({"route": ["RW", "RE"], "truck_type": ["T", "T"], "capacity": [200, 100], "cost": [1000, 800]}
+                     ).to_excel(writer, sheet_name="Route_TruckTypes", index=False)
+    problem = server.parse_excel_file(buffer.getvalue())
+    assert problem.warehouse == {"name": "West", "lat": 0.0, "long": 0.0}
+    assert [w["name"] for w in problem.warehouses] == ["West", "East"]
+    assert problem.route_depot.tolist() == [0, 1]
+
+    result = server.optimize_routes(problem)
+    routes = {r["route_id"]: r for r in result["routes_selected"]}
+    assert routes["RW"]["warehouse"] == "West" and routes["RE"]["warehouse"] == "East"
+    # C is about 15.7 km from East and 212 km from West
+    assert routes["RE"]["tour_distance_km"] == pytest.approx(2 * haversine_from((0.0, 2.0), [(0.1, 1.9)])[0], abs=0.01)
+    assert result["summary_metrics"]["warehouse_loads"] == {"West": 200, "East": 100}
+    assert [w["name"] for w in result["warehouses"]] == ["West", "East"]
+
+
+def test_multi_depot_and_route_generation_results_survive_storage():
+    import server
+
+    result = server.optimize_routes(_problem(), None, SolverOptions(generate_routes=True, time_limit=10))
+    result.pop("timings")
+    doc = server.OptimizationResult(**result).model_dump()
+    assert result["route_generation"]["iterations"] >= 1
+    assert doc["route_generation"] == result["route_generation"]
+    # Nothing optimize_routes returns is dropped when the result is stored
+    assert set(result) <= set(server.OptimizationResult.model_fields)
+    assert doc["warehouses"] == result["warehouses"] == _problem().warehouses
+    assert doc["summary_metrics"]["warehouse_loads"] == {"West": 200, "East": 100}
+    assert {route["route_id"]: route["warehouse"] for route in doc["routes_selected"]} == {"RW": "West", "RE": "East"}
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from distance_store import DistanceNetwork, DistanceStore, HaversineProvider, MatrixFileProvider
+from problem import ProblemInstance
+from sequencing import haversine_matrix
+
+POINTS = np.array([[19.07, 72.87], [28.61, 77.21], [12.97, 77.59], [22.57, 88.36]])
+LABELS = ["Mumbai", "Delhi", "Bengaluru", "Kolkata"]
+
+
+class CountingProvider(HaversineProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def rows(self, labels, points, rows):
+        self.calls += 1
+        return super().rows(labels, points, rows)
+
+
+def test_matrix_is_stored_once_and_read_back_as_a_memmap(tmp_path):
+    provider = CountingProvider()
+    store = DistanceStore(tmp_path, max_bytes=1 << 20, provider=provider)
+    first = store.matrix(LABELS, POINTS)
+    assert isinstance(first, np.memmap) and first.dtype == np.float32
+    assert np.allclose(first, haversine_matrix(POINTS), rtol=1e-6)
+
+    again = store.matrix(LABELS, POINTS)
+    assert isinstance(again, np.memmap)
+    assert (store.hits, store.misses, provider.calls) == (1, 1, 1)
+    assert [p.suffix for p in tmp_path.iterdir()] == [".f32"]
+    assert store.matrix([], np.empty((0, 2))).shape == (0, 0)
+
+
+def test_key_covers_order_coordinates_and_provider(tmp_path, monkeypatch):
+    store = DistanceStore(tmp_path, max_bytes=1 << 20)
+    key = store.key(LABELS, POINTS)
+    assert key == store.key(list(LABELS), POINTS.copy())
+    assert key != store.key(LABELS[::-1], POINTS[::-1])
+    moved = POINTS.copy()
+    moved[0, 0] += 1e-9
+    assert key != store.key(LABELS, moved)
+
+    path = tmp_path / "road.csv"
+    pd.DataFrame(haversine_matrix(POINTS), index=LABELS, columns=LABELS).to_csv(path)
+    assert key != DistanceStore(tmp_path, 1 << 20, provider=MatrixFileProvider(str(path))).key(LABELS, POINTS)
+
+
+def test_least_recently_used_matrices_are_evicted_past_the_size_limit(tmp_path):
+    # Each 4x4 matrix is 64 bytes; room for two
+    store = DistanceStore(tmp_path, max_bytes=150)
+    networks = [POINTS + i for i in range(3)]
+    keys = [store.key(LABELS, points) for points in networks]
+    store.matrix(LABELS, networks[0])
+    store.matrix(LABELS, networks[1])
+    # Age both files, then touch the first by reading it again
+    for age, key in enumerate(keys[:2]):
+        os.utime(tmp_path / f"{key}.f32", (1_000_000 + age, 1_000_000 + age))
+    store.matrix(LABELS, networks[0])
+    store.matrix(LABELS, networks[2])
+    assert sorted(p.stem for p in tmp_path.glob("*.f32")) == sorted([keys[0], keys[2]])
+
+    # Larger than the whole store: computed but never written
+    big = np.column_stack([np.linspace(8, 30, 7), np.linspace(70, 90, 7)])
+    assert np.allclose(store.matrix(list("ABCDEFG"), big), haversine_matrix(big), rtol=1e-6)
+    assert len(list(tmp_path.glob("*.f32"))) == 2
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".npz"])
+def test_matrix_file_provider_falls_back_to_haversine_for_unknown_labels(tmp_path, suffix):
+    road = np.array([[0, 10, 20], [11, 0, 30], [21, 31, 0]], dtype=float)
+    path = tmp_path / f"road{suffix}"
+    if suffix == ".csv":
+        pd.DataFrame(road, index=LABELS[:3], columns=LABELS[:3]).to_csv(path)
+    else:
+        np.savez(path, labels=np.array(LABELS[:3]), matrix=road)
+    store = DistanceStore(tmp_path / "store", max_bytes=1 << 20, provider=MatrixFileProvider(str(path)))
+
+    # Reordered, with Kolkata missing from the file
+    labels = ["Delhi", "Kolkata", "Mumbai"]
+    points = POINTS[[1, 3, 0]]
+    matrix = store.matrix(labels, points)
+    assert matrix[0, 2] == 11 and matrix[2, 0] == 10
+    fallback = haversine_matrix(points)
+    assert matrix[1, 0] == pytest.approx(fallback[1, 0], rel=1e-6)
+    assert matrix[2, 1] == pytest.approx(fallback[2, 1], rel=1e-6)
+
+
+def _problem(warehouse_lat=19.0):
+    return ProblemInstance.from_file_data({
+        "cities": LABELS,
+        "demand": {label: 10 for label in LABELS},
+        "lat_dict": dict(zip(LABELS, POINTS[:, 0])),
+        "long_dict": dict(zip(LABELS, POINTS[:, 1])),
+        "route_cities": {"R1": LABELS},
+        "route_trucktypes": [("R1", "T")],
+        "capacity": {("R1", "T"): 100},
+        "cost": {("R1", "T"): 1000},
+        "warehouse": {"name": "Depot", "lat": warehouse_lat, "long": 73.0},
+    })
+
+
+def test_network_puts_depots_first_and_computes_oversized_submatrices(tmp_path):
+    problem = _problem()
+    store = DistanceStore(tmp_path, max_bytes=1 << 20)
+    network = DistanceNetwork.for_problem(store, problem)
+    assert network.num_depots == 1 and network.depot_located == [True]
+    points = np.vstack([[19.0, 73.0], POINTS])
+    # Submatrices alone never build the whole matrix
+    assert np.allclose(network.submatrix([0, 2, 4]), haversine_matrix(points[[0, 2, 4]]), rtol=1e-6)
+    assert store.misses == 0 and not list(tmp_path.glob("*.f32"))
+    assert network.matrix.shape == (5, 5) and store.misses == 1
+    assert np.allclose(network.submatrix([4, 0]), haversine_matrix(points[[4, 0]]), rtol=1e-6)
+
+    unlocated = DistanceNetwork.for_problem(DistanceStore(tmp_path, max_bytes=1 << 20), _problem(None))
+    assert unlocated.depot_located == [False]
+
+    small = DistanceNetwork.for_problem(DistanceStore(tmp_path / "small", max_bytes=64), problem)
+    assert small.matrix is None
+    assert np.allclose(small.submatrix([4, 1]), haversine_matrix(points[[4, 1]]), rtol=1e-6)
+    assert not (tmp_path / "small").exists()
+
+
+def test_optimize_routes_sequences_on_road_distances(tmp_path, monkeypatch):
+    import server
+
+    names = ["Depot"] + LABELS
+    road = np.full((5, 5), 500.0)
+    np.fill_diagonal(road, 0)
+    # Depot -> Mumbai -> Delhi -> Bengaluru -> Kolkata -> Depot is the only cheap loop
+    for a, b in zip(names, names[1:] + names[:1]):
+        road[names.index(a), names.index(b)] = road[names.index(b), names.index(a)] = 100
+    path = tmp_path / "road.npz"
+    np.savez(path, labels=np.array(names), matrix=road)
+    store = DistanceStore(tmp_path / "store", max_bytes=1 << 20, provider=MatrixFileProvider(str(path)))
+    monkeypatch.setattr(server, "distance_store", store)
+
+    route = server.optimize_routes(_problem())["routes_selected"][0]
+    assert route["tour_distance_km"] == 500
+    assert route["sorted_cities"] in (LABELS, LABELS[::-1])
+    # Sequencing reads per-route submatrices; only route generation stores the whole network
+    assert store.misses == 0
+    server.optimize_routes(_problem(), None, server.SolverOptions(generate_routes=True, time_limit=10))
+    assert store.misses == 1
@@ -0,0 +1,46 @@
+import csv
+import io
+
+import openpyxl
+import pyarrow.parquet as pq
+
+from exports import DELIVERY_COLUMNS, iter_csv, table_rows, write_parquet, write_workbook
+
+RESULT = {
+    "summary_metrics": {"total_cost": 2500.0, "solver_status": "optimal", "presolve": {"removed": 1}},
+    "routes_selected": [
+        {"route_id": "R1", "truck_type": "Small", "trucks_used": 1.0, "capacity": 200, "cost_per_truck": 1000,
+         "total_cost": 1000.0, "total_delivered": 200.0, "capacity_utilization": 100.0,
+         "cities_delivered": [{"city": "A", "quantity": 100.0, "demand": 100}, {"city": "B", "quantity": 100.0, "demand": 150}]},
+        {"route_id": 7, "truck_type": "Large", "trucks_used": 1.0, "capacity": 400, "cost_per_truck": 1500,
+         "total_cost": 1500.0, "total_delivered": 130.0, "capacity_utilization": 32.5,
+         "cities_delivered": [{"city": "B", "quantity": 50.0, "demand": 150}, {"city": "C", "quantity": 80.0, "demand": 80}]},
+    ],
+}
+
+
+def test_workbook_has_all_sheets_and_skips_nested_metrics():
+    workbook = openpyxl.load_workbook(write_workbook(RESULT), read_only=True)
+    assert workbook.sheetnames == ["Summary", "Routes", "City Deliveries"]
+    summary = list(workbook["Summary"].iter_rows(values_only=True))
+    assert summary == [("Metric", "Value"), ("Total Cost", 2500), ("Solver Status", "optimal")]
+    deliveries = list(workbook["City Deliveries"].iter_rows(values_only=True))
+    assert deliveries[0] == tuple(DELIVERY_COLUMNS)
+    assert deliveries[-1] == (7, "Large", "C", 80, 80)
+
+
+def test_csv_streams_in_batches():
+    chunks = list(iter_csv(DELIVERY_COLUMNS, table_rows(RESULT, "deliveries"), batch_rows=2))
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == DELIVERY_COLUMNS
+    assert rows[1:] == [["R1", "Small", "A", "100.0", "100"], ["R1", "Small", "B", "100.0", "150"],
+                        ["7", "Large", "B", "50.0", "150"], ["7", "Large", "C", "80.0", "80"]]
+
+
+def test_parquet_keeps_types_and_stores_mixed_ids_as_text():
+    table = pq.read_table(write_parquet(DELIVERY_COLUMNS, table_rows(RESULT, "deliveries")))
+    assert table.column_names == DELIVERY_COLUMNS
+    columns = table.to_pydict()
+    assert columns[DELIVERY_COLUMNS[0]] == ["R1", "R1", "7", "7"]
+    assert columns[DELIVERY_COLUMNS[3]] == [100.0, 100.0, 50.0, 80.0]
@@ -0,0 +1,79 @@
+import multiprocessing
+import threading
+import time
+from types import SimpleNamespace
+
+from geocoding import CachedGeocoder, SQLiteGeocodeStore, SQLiteRateLimiter, normalize_city_name
+
+
+class StubGeocoder:
+    def __init__(self, known):
+        self.known = known
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def geocode(self, query):
+        with self._lock:
+            self.queries.append(query)
+        coords = self.known.get(query)
+        return SimpleNamespace(latitude=coords[0], longitude=coords[1]) if coords else None
+
+
+def test_normalize_city_name():
+    assert normalize_city_name("  New   Delhi ") == normalize_city_name("new delhi")
+
+
+def test_misses_are_looked_up_once_and_persisted(tmp_path):
+    stub = StubGeocoder({"Mumbai, India": (19.07, 72.87), "Pune, India": (18.52, 73.85)})
+    store = SQLiteGeocodeStore(str(tmp_path / "geo.sqlite3"))
+    geocoder = CachedGeocoder(stub, store=store, query_format="{}, India", rate_limit=0)
+
+    coords = geocoder.geocode_many(["Mumbai", "Pune", "Atlantis", "mumbai "])
+    assert coords == {"Mumbai": (19.07, 72.87), "Pune": (18.52, 73.85), "mumbai ": (19.07, 72.87)}
+    assert sorted(stub.queries) == ["Atlantis, India", "Mumbai, India", "Pune, India"]
+
+    # A fresh process only sees the persistent tier
+    restarted = CachedGeocoder(StubGeocoder({}), store=store, query_format="{}, India", rate_limit=0)
+    assert restarted.geocode("Pune") == (18.52, 73.85)
+    assert restarted.geocode("Atlantis") is None
+    assert restarted.provider.queries == []
+
+
+def test_provider_errors_are_not_cached():
+    class Flaky:
+        calls = 0
+
+        def geocode(self, query):
+            Flaky.calls += 1
+            raise TimeoutError("service unavailable")
+
+    geocoder = CachedGeocoder(Flaky(), rate_limit=0)
+    assert geocoder.geocode("Chennai") is None
+    assert geocoder.geocode("Chennai") is None
+    assert Flaky.calls == 2
+
+
+def _reserve_slots(path, rate, count, times):
+    limiter = SQLiteRateLimiter(path, rate)
+    for _ in range(count):
+        limiter.wait()
+        times.put(time.time())
+
+
+def test_rate_limit_is_shared_across_processes(tmp_path):
+    # Three processes, as three batch files parsed in separate solver workers would be
+    path = str(tmp_path / "geo.sqlite3")
+    ctx = multiprocessing.get_context()
+    times = ctx.Queue()
+    workers = [ctx.Process(target=_reserve_slots, args=(path, 20, 3, times)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+    calls = sorted(times.get(timeout=5) for _ in range(9))
+    gaps = [b - a for a, b in zip(calls, calls[1:])]
+    assert min(gaps) > 0.04
+
+    # A geocoder with a store throttles through that store's file
+    geocoder = CachedGeocoder(StubGeocoder({}), store=SQLiteGeocodeStore(path), rate_limit=20)
+    assert isinstance(geocoder._rate_limiter, SQLiteRateLimiter) and geocoder._rate_limiter.path == path
@@ -0,0 +1,152 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from ingestion import read_excel_sheets, read_table_archive
+
+
+def _workbook_bytes():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        pd.DataFrame({"city": ["A", "B", "C"], "demand": [10, 20.0, 30], "lat": [1.5, 2.0, None]}).to_excel(
+            writer, sheet_name="Cities", index=False)
+        pd.DataFrame({"route": ["R2", "R1", "R2", "R1"], "city": ["A", "B", "C", "A"]}).to_excel(
+            writer, sheet_name="Route_Cities", index=False)
+        pd.DataFrame({"route": ["R1", "R2"], "truck_type": ["S", "L"], "capacity": [100.0, 300], "cost": [900.7, 1500]}).to_excel(
+            writer, sheet_name="Route_TruckTypes", index=False)
+    return buffer.getvalue()
+
+
+def test_sheets_match_pandas_reader():
+    content = _workbook_bytes()
+    sheets = read_excel_sheets(content)
+    expected = pd.read_excel(io.BytesIO(content), sheet_name=None)
+    assert list(sheets) == list(expected)
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(sheets[name], frame)
+
+
+def test_missing_sheets_are_skipped():
+    sheets = read_excel_sheets(_workbook_bytes(), ["Route_Cities", "Route_TruckTypes", "Missing"])
+    assert list(sheets) == ["Route_Cities", "Route_TruckTypes"]
+
+
+CITIES = pd.DataFrame({"city": ["A", "B", "C"], "demand": [10, 20, 30], "lat": [19.0, 28.6, 13.0],
+                       "long": [72.8, 77.2, 77.6]})
+ROUTE_CITIES = pd.DataFrame({"route": ["R2", "R1", "R2", "R1"], "city": ["A", "B", "C", "A"]})
+ROUTE_TRUCKTYPES = pd.DataFrame({"route": ["R1", "R2", "R2"], "truck_type": ["S", "L", "S"],
+                                 "capacity": [100, 300, 100], "cost": [900, 1500, 1000]})
+WAREHOUSE = pd.DataFrame({"warehouse": ["North", "South"], "lat": [28.0, 13.0], "long": [77.0, 77.5],
+                          "capacity": [None, 500]})
+
+
+def _tables(**overrides):
+    tables = {"Warehouse": WAREHOUSE, "Cities": CITIES, "Route_Cities": ROUTE_CITIES,
+              "Route_TruckTypes": ROUTE_TRUCKTYPES}
+    tables.update(overrides)
+    return {name: frame for name, frame in tables.items() if frame is not None}
+
+
+def _archive(tables, suffix=".csv", folder="export/"):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("export/README.txt", "not a table")
+        for name, frame in tables.items():
+            if suffix == ".csv":
+                archive.writestr(f"{folder}{name.lower()}.csv", frame.to_csv(index=False))
+            else:
+                data = io.BytesIO()
+                frame.to_parquet(data, index=False)
+                archive.writestr(f"{folder}{name}.parquet", data.getvalue())
+    return buffer.getvalue()
+
+
+def _workbook(tables):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        for name, frame in tables.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+def test_table_archive_matches_workbook_parse():
+    import server
+
+    tables = _tables()
+    from_archive = server.parse_table_archive(_archive(tables))
+    from_workbook = server.parse_excel_file(_workbook(tables))
+    assert from_archive.to_file_data() == from_workbook.to_file_data()
+    assert from_archive.fingerprint() == from_workbook.fingerprint()
+    assert [w["name"] for w in from_archive.warehouses] == ["North", "South"]
+
+
+def test_parquet_archive_matches_csv_archive():
+    tables = _tables()
+    parquet = read_table_archive(_archive(tables, ".parquet"))
+    csv = read_table_archive(_archive(tables))
+    assert list(parquet) == list(csv)
+    for name, frame in csv.items():
+        pd.testing.assert_frame_equal(parquet[name], frame, check_dtype=False)
+
+
+def test_validation_reports_every_problem():
+    cities = pd.DataFrame({"city": ["A", "B", "B", "C"], "demand": [10, None, 5, "lots"]})
+    route_trucktypes = pd.concat([ROUTE_TRUCKTYPES, pd.DataFrame(
+        {"route": ["R9"], "truck_type": ["S"], "capacity": [100], "cost": [700]})], ignore_index=True)
+    route_cities = pd.concat([ROUTE_CITIES, pd.DataFrame({"route": ["R1"], "city": ["Z"]})], ignore_index=True)
+    with pytest.raises(ValueError) as error:
+        read_table_archive(_archive(_tables(Cities=cities, Route_Cities=route_cities,
+                                            Route_TruckTypes=route_trucktypes)))
+    message = str(error.value)
+    assert "Cities: 1 rows without a demand" in message
+    assert "Cities: 1 non-numeric demand values, e.g. 'lots'" in message
+    assert "Cities: 1 repeated cities, e.g. 'B'" in message
+    assert "Route_Cities: 1 stops at cities not in Cities, e.g. 'Z'" in message
+    assert "Route_TruckTypes: 1 rows for routes without cities, e.g. 'R9'" in message
+
+
+def test_missing_tables_and_columns_are_rejected():
+    with pytest.raises(ValueError, match="Missing tables: Route_TruckTypes"):
+        read_table_archive(_archive(_tables(Route_TruckTypes=None)))
+    with pytest.raises(ValueError, match="Route_TruckTypes is missing columns: cost"):
+        read_table_archive(_archive(_tables(Route_TruckTypes=ROUTE_TRUCKTYPES.drop(columns="cost"))))
+    with pytest.raises(ValueError, match="Not a zip archive"):
+        read_table_archive(b"not a zip")
+    with pytest.raises(ValueError, match="More than one file holds the Cities table"):
+        read_table_archive(_duplicate_cities_archive())
+
+
+def _duplicate_cities_archive():
+    buffer = io.BytesIO(_archive(_tables()))
+    with zipfile.ZipFile(buffer, "a") as archive:
+        archive.writestr("Cities.csv", CITIES.to_csv(index=False))
+    return buffer.getvalue()
+
+
+def test_upload_accepts_table_archives(monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+
+    class FakeProblemStore:
+        async def put(self, file_data, ttl_seconds=None):
+            return "problem-1"
+
+    monkeypatch.setattr(server, "problem_store", FakeProblemStore())
+    client = TestClient(server.app)
+    response = client.post("/api/upload-excel", files={"file": ("tables.ZIP", _archive(_tables()))})
+    assert response.status_code == 200
+    assert response.json()["data"]["cities_count"] == 3 and response.json()["data"]["routes_count"] == 2
+
+    bad = client.post("/api/upload-excel", files={"file": ("tables.zip", _archive(_tables(Route_Cities=None)))})
+    assert bad.status_code == 400 and bad.json()["detail"].startswith("Missing tables: Route_Cities")
+    assert client.post("/api/upload-excel", files={"file": ("tables.txt", b"")}).status_code == 400
+
+
+def test_parquet_archive_parses_like_the_workbook():
+    import server
+
+    tables = _tables()
+    from_parquet = server.parse_table_archive(_archive(tables, ".parquet"))
+    assert from_parquet.fingerprint() == server.parse_excel_file(_workbook(tables)).fingerprint()
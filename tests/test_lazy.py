@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from lazy import LazyObject, is_resolved, resolve
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+class Box:
+    def __init__(self):
+        self.items = {"a": 1}
+        self.value = 0
+
+
+def test_lazy_object_builds_once_on_first_use():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return Box()
+
+    box = LazyObject(factory)
+    assert not is_resolved(box)
+    assert calls == []
+
+    assert box.items["a"] == 1
+    box.value = 5
+    assert resolve(box).value == 5
+    assert box.value == 5
+    assert calls == [1]
+    assert is_resolved(box)
+    assert is_resolved(Box()) and resolve("plain") == "plain"
+
+
+def test_importing_server_skips_heavy_dependencies():
+    # A fresh interpreter: other tests may already have imported these
+    code = ("import sys, server; "
+            "print(','.join(m for m in ('pandas', 'openpyxl', 'ortools', 'geopy', 'xlsxwriter', 'motor') "
+            "if m in sys.modules))")
+    env = {**os.environ, "MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "route_optimizer_test"}
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+                         check=True).stdout
+    assert out.strip() == ""
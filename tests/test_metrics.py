@@ -0,0 +1,48 @@
+import time
+
+from metrics import MetricsRegistry, StageTimer, timed_iter
+
+
+def test_nested_stages_are_exclusive():
+    timer = StageTimer()
+    with timer.stage("extract"):
+        time.sleep(0.02)
+        with timer.stage("sequencing"):
+            time.sleep(0.05)
+        time.sleep(0.02)
+    assert 0.05 <= timer.seconds["sequencing"] < 0.09
+    assert 0.04 <= timer.seconds["extract"] < 0.08
+
+
+def test_timed_iter_reports_production_time_once_exhausted():
+    reported = []
+
+    def chunks():
+        for i in range(3):
+            time.sleep(0.01)
+            yield i
+
+    assert list(timed_iter(chunks(), reported.append)) == [0, 1, 2]
+    assert len(reported) == 1 and reported[0] >= 0.03
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1))
+    solves = registry.counter("solves_total", "Solves", ["status"])
+    stages.observe(0.05, stage="solve")
+    stages.observe(0.5, stage="solve")
+    stages.observe(2, stage="solve")
+    solves.inc(status='opt"imal')
+    assert registry.render().splitlines() == [
+        "# HELP stage_seconds Stage time",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="solve",le="0.1"} 1',
+        'stage_seconds_bucket{stage="solve",le="1"} 2',
+        'stage_seconds_bucket{stage="solve",le="+Inf"} 3',
+        'stage_seconds_sum{stage="solve"} 2.55',
+        'stage_seconds_count{stage="solve"} 3',
+        "# HELP solves_total Solves",
+        "# TYPE solves_total counter",
+        'solves_total{status="opt\\"imal"} 1',
+    ]
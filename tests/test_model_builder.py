@@ -0,0 +1,101 @@
+import dataclasses
+
+from ortools.linear_solver import pywraplp
+
+from model_builder import CP_SAT, SCIP, CoveringSweep, SolverOptions, build_covering_model, read_solution, set_solution_hint, solve_covering
+from problem import ProblemInstance
+
+
+def _problem():
+    return ProblemInstance.from_file_data({
+        "cities": ["A", "B", "C"],
+        "demand": {"A": 100, "B": 150, "C": 80},
+        "route_cities": {"R1": ["A", "B"], "R2": ["B", "C"], "R3": ["C"]},
+        "route_trucktypes": [("R1", "Small"), ("R2", "Large"), ("R3", "Small")],
+        "capacity": {("R1", "Small"): 200, ("R2", "Large"): 400, ("R3", "Small"): 200},
+        "cost": {("R1", "Small"): 1000, ("R2", "Large"): 1500, ("R3", "Small"): 900},
+    })
+
+
+def test_model_dimensions_follow_route_membership():
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    model = build_covering_model(solver, _problem())
+    assert solver.NumVariables() == 3 + 5
+    assert solver.NumConstraints() == 3 + 3
+    assert model.y_cities == [[0, 1], [1, 2], [2]]
+
+
+def test_bulk_solution_matches_per_variable_values():
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    model = build_covering_model(solver, _problem())
+    assert solver.Solve() == pywraplp.Solver.OPTIMAL
+    x_values, y_values = read_solution(model)
+    assert x_values == [v.solution_value() for v in model.x]
+    assert y_values == [[v.solution_value() for v in y_vars] for y_vars in model.y]
+    assert solver.Objective().Value() == 2500
+
+
+def test_solution_hint_keeps_optimum():
+    problem = _problem()
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    model = build_covering_model(solver, problem)
+    set_solution_hint(model, problem, {("R1", "Small"): (1, {"A": 100, "B": 100}), ("R2", "Large"): (1, {"B": 50, "C": 80})})
+    assert solver.Solve() == pywraplp.Solver.OPTIMAL
+    assert solver.Objective().Value() == 2500
+
+
+def test_backends_agree_on_optimum():
+    for backend in (SCIP, CP_SAT):
+        solution = solve_covering(_problem(), SolverOptions(backend=backend, time_limit=10))
+        assert solution.status == "optimal"
+        assert solution.objective == 2500
+        assert solution.gap == 0.0
+        assert solution.stats.variables == 3 + 5 and solution.stats.constraints >= 3
+        assert solution.stats.solve_seconds > 0
+
+
+def test_cp_sat_scales_fractional_demand_without_over_delivery():
+    problem = _problem()
+    problem.demand = problem.demand.astype(float) + 0.25
+    solution = solve_covering(problem, SolverOptions(backend=CP_SAT, threads=2))
+    assert solution.has_solution
+    delivered = {}
+    for cities, values in zip(solution.y_cities, solution.y_values):
+        for c, qty in zip(cities, values):
+            delivered[c] = delivered.get(c, 0) + qty
+    assert delivered == {0: 100.25, 1: 150.25, 2: 80.25}
+
+
+def test_cp_sat_solves_fractional_capacity_exactly():
+    # Parsed capacities are integers; sweeps scale them to fractions
+    problem = ProblemInstance.from_file_data({
+        "cities": ["A"],
+        "demand": {"A": 801},
+        "route_cities": {"R1": ["A"]},
+        "route_trucktypes": [("R1", "Small")],
+        "capacity": {("R1", "Small"): 400},
+        "cost": {("R1", "Small"): 100},
+    })
+    problem = dataclasses.replace(problem, capacity=problem.capacity * 1.00125)
+    for backend in (SCIP, CP_SAT):
+        solution = solve_covering(problem, SolverOptions(backend=backend))
+        assert solution.x_values == [2]
+        assert solution.objective == 200
+
+
+def test_covering_sweep_applies_demand_cost_and_capacity_changes():
+    problem = _problem()
+    sweep = CoveringSweep(problem)
+    assert sweep.solve(problem.demand, problem.cost, problem.capacity).objective == 2500
+
+    # Cheaper Large trucks: R2 now also covers C alone cheaper than R3
+    cost = problem.cost.astype(float) * [1, 0.5, 1]
+    assert sweep.solve(problem.demand, cost, problem.capacity).objective == 1750
+    # A bigger Small truck on R1 carries A and B in one trip
+    capacity = problem.capacity.astype(float) * [1.5, 1, 1]
+    solution = sweep.solve(problem.demand, problem.cost, capacity)
+    assert solution.objective == solve_covering(dataclasses.replace(problem, capacity=capacity)).objective
+    # Demand moves the right-hand sides
+    demand = problem.demand.astype(float) * 2
+    solution = sweep.solve(demand, problem.cost, problem.capacity)
+    assert solution.objective == solve_covering(dataclasses.replace(problem, demand=demand)).objective
@@ -0,0 +1,36 @@
+from model_builder import solve_covering
+from presolve import presolve
+from problem import ProblemInstance
+
+
+def _problem():
+    return ProblemInstance.from_file_data({
+        "cities": ["A", "B", "C", "Z"],
+        "demand": {"A": 100, "B": 150, "C": 80, "Z": 0},
+        "route_cities": {"R1": ["A", "B"], "R2": ["A", "B", "C", "Z"], "R3": ["C", "Z"], "R4": ["Z"]},
+        "route_trucktypes": [("R1", "Small"), ("R1", "Large"), ("R1", "Small"), ("R2", "Large"),
+                             ("R3", "Small"), ("R3", "Medium"), ("R4", "Small")],
+        "capacity": {("R1", "Small"): 200, ("R1", "Large"): 400, ("R2", "Large"): 400,
+                     ("R3", "Small"): 200, ("R3", "Medium"): 200, ("R4", "Small"): 100},
+        "cost": {("R1", "Small"): 1000, ("R1", "Large"): 1600, ("R2", "Large"): 1500,
+                 ("R3", "Small"): 700, ("R3", "Medium"): 700, ("R4", "Small"): 100},
+    })
+
+
+def test_presolve_removes_dominated_duplicate_and_empty_options():
+    reduced, report = presolve(_problem())
+    assert [reduced.option_key(o) for o in range(reduced.num_options)] == [("R1", "Small"), ("R2", "Large"), ("R3", "Small")]
+    assert report.duplicate_options == ["R1|Small"]
+    # R2 serves every R1 city with a cheaper large truck; R3's trucks are identical columns
+    assert report.dominated_options == ["R1|Large", "R3|Medium"]
+    assert report.empty_options == ["R4|Small"]
+    assert report.zero_demand_cities == 1
+    assert report.route_stops_dropped == 3
+    assert (report.options_before, report.options_after) == (7, 3)
+
+
+def test_presolve_keeps_optimal_cost_and_city_ids():
+    problem = _problem()
+    reduced, _ = presolve(problem)
+    assert reduced.city_names == problem.city_names
+    assert solve_covering(reduced).objective == solve_covering(problem).objective == 1500
@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from problem import ProblemInstance
+
+
+def _tables():
+    cities_df = pd.DataFrame({"city": ["A", "B", "C"], "demand": [100, 150, 80]})
+    route_cities_df = pd.DataFrame({"route": ["R2", "R1", "R2", "R1", "R3"], "city": ["B", "A", "C", "B", "D"]})
+    route_trucktypes_df = pd.DataFrame({
+        "route": ["R1", "R2", "R2", "R3"],
+        "truck_type": ["Small", "Small", "Large", "Small"],
+        "capacity": [200, 200, 400, 100],
+        "cost": [1000, 1100, 1500, 500],
+    })
+    return cities_df, route_cities_df, route_trucktypes_df
+
+
+def test_from_tables_interns_ids_and_builds_csr():
+    problem = ProblemInstance.from_tables(*_tables(), {"A": 19.0, "B": 28.6}, {"A": 72.8, "B": 77.2})
+    assert problem.city_names == ["A", "B", "C", "D"]
+    assert problem.num_demand_cities == 3
+    assert problem.route_names == ["R2", "R1", "R3"]
+    assert [problem.city_names[c] for c in problem.route_city_ids(0)] == ["B", "C"]
+    assert [problem.option_key(o) for o in range(problem.num_options)] == [
+        ("R1", "Small"), ("R2", "Small"), ("R2", "Large"), ("R3", "Small")]
+    assert problem.city_demand(3) == 0
+    assert np.isnan(problem.lat[2])
+
+
+def test_file_data_round_trip_matches_table_build():
+    problem = ProblemInstance.from_tables(*_tables(), {"A": 19.0}, {"A": 72.8})
+    file_data = json.loads(json.dumps(problem.to_file_data()))
+    assert file_data["capacity"]["R2|Large"] == 400
+    assert file_data["route_trucktypes"][0] == ["R1", "Small"]
+    assert file_data["lat_dict"] == {"A": 19.0}
+
+    rebuilt = ProblemInstance.from_file_data(file_data)
+    assert rebuilt.to_file_data() == problem.to_file_data()
+    assert rebuilt.city_names == problem.city_names
+    np.testing.assert_array_equal(rebuilt.route_city_idx, problem.route_city_idx)
+
+
+def test_fingerprint_ignores_ordering_but_not_content():
+    file_data = ProblemInstance.from_tables(*_tables(), {"A": 19.0}, {"A": 72.8}).to_file_data()
+    reordered = dict(file_data)
+    reordered["cities"] = list(reversed(file_data["cities"]))
+    reordered["routes"] = list(reversed(file_data["routes"]))
+    reordered["route_cities"] = dict(reversed(list(file_data["route_cities"].items())))
+    reordered["route_trucktypes"] = list(reversed(file_data["route_trucktypes"]))
+    reordered["demand"] = {**file_data["demand"], "A": 100.0}
+
+    fingerprint = ProblemInstance.from_file_data(file_data).fingerprint()
+    assert ProblemInstance.from_file_data(reordered).fingerprint() == fingerprint
+
+    changed = dict(file_data, demand={**file_data["demand"], "A": 101})
+    assert ProblemInstance.from_file_data(changed).fingerprint() != fingerprint
+
+
+def test_subproblem_renumbers_ids_and_keeps_demand_cities_first():
+    problem = ProblemInstance.from_tables(*_tables(), {}, {})
+    d, b = problem.city_names.index("D"), problem.city_names.index("B")
+    sub = problem.subproblem([0, 3], [d, b, problem.city_names.index("A")])
+    assert sub.city_names == ["A", "B", "D"]
+    assert sub.num_demand_cities == 2
+    assert [sub.option_key(o) for o in range(sub.num_options)] == [("R1", "Small"), ("R3", "Small")]
+    assert [sub.city_names[c] for c in sub.route_city_ids(0)] == ["A", "B"]
+    assert sub.cost.tolist() == [1000, 500]
@@ -0,0 +1,63 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from responses import CompressionMiddleware, FastJSONResponse, columnar_result
+
+RESULT = {
+    "total_cost": 2500.0,
+    "routes_selected": [
+        {"route_id": "R1", "truck_type": "Small", "trucks_used": 1.0, "total_cost": 1000.0,
+         "cities_delivered": [{"city": "A", "quantity": 100.0, "demand": 100}, {"city": "B", "quantity": 50.0, "demand": 150}],
+         "sorted_cities": ["B", "A"]},
+        {"route_id": "R2", "truck_type": "Large", "trucks_used": 1.0, "total_cost": 1500.0,
+         "cities_delivered": [{"city": "B", "quantity": 100.0, "demand": 150}, {"city": "C", "quantity": 80.0, "demand": 80}],
+         "sorted_cities": ["B", "C"]},
+    ],
+    "city_coordinates": {"A": [19.0, 72.8], "B": [28.7, 77.1]},
+    "result_id": "r",
+}
+
+
+def test_columnar_result_keeps_every_delivery_and_stop():
+    compact = columnar_result(RESULT)
+    cities = compact["cities"]
+    assert cities == {"name": ["A", "B", "C"], "lat": [19.0, 28.7, None], "long": [72.8, 77.1, None]}
+    routes = compact["routes"]
+    assert routes["route_id"] == ["R1", "R2"] and routes["total_cost"] == [1000.0, 1500.0]
+    stops = [[cities["name"][c] for c in routes["stops"][a:b]] for a, b in zip(routes["stop_ptr"], routes["stop_ptr"][1:])]
+    assert stops == [route["sorted_cities"] for route in RESULT["routes_selected"]]
+
+    deliveries = compact["deliveries"]
+    rebuilt = [
+        (routes["route_id"][r], cities["name"][c], q, d)
+        for r, c, q, d in zip(deliveries["route"], deliveries["city"], deliveries["quantity"], deliveries["demand"])
+    ]
+    assert rebuilt == [(route["route_id"], d["city"], d["quantity"], d["demand"])
+                       for route in RESULT["routes_selected"] for d in route["cities_delivered"]]
+    assert compact["result_id"] == "r" and "routes_selected" not in compact
+
+
+def test_compression_skips_small_and_streamed_responses():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    def big():
+        return FastJSONResponse({"values": list(range(200))})
+
+    @app.get("/small")
+    def small():
+        return FastJSONResponse({"ok": True})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"x" * 200 + b"\n"] * 3), media_type="application/x-ndjson")
+
+    client = TestClient(app)
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip" and big.json() == {"values": list(range(200))}
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in streamed.headers and len(streamed.content) == 603
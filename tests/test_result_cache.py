@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from result_cache import ResultCache
+
+
+class _Collection:
+    """Just enough of a Motor collection for ResultCache lookups."""
+
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.queries = 0
+
+    async def find_one(self, query, projection=None, sort=None):
+        self.queries += 1
+        now = query["expires_at"]["$gt"]
+        found = [doc for doc in self.docs if doc["problem_hash"] == query["problem_hash"] and doc["expires_at"] > now]
+        for field, direction in reversed(sort or []):
+            found.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        if not found:
+            return None
+        return {k: v for k, v in found[0].items() if (projection or {}).get(k, 1)}
+
+
+def _stored(result_id, problem_hash, expires_in):
+    now = datetime.now(timezone.utc)
+    return {"_id": object(), "id": result_id, "problem_hash": problem_hash, "timestamp": now.isoformat(),
+            "expires_at": now + expires_in, "summary_metrics": {"total_cost": 100}}
+
+
+def test_lru_returns_copies_and_evicts_least_recently_used():
+    async def scenario():
+        cache = ResultCache(_Collection(), max_entries=2)
+        result = {"routes_selected": [{"route_id": "R1"}]}
+        cache.put("a", result)
+        result["routes_selected"].append({"route_id": "changed after put"})
+        hit = await cache.get("a")
+        assert hit == {"routes_selected": [{"route_id": "R1"}]}
+        hit["routes_selected"].clear()
+        assert (await cache.get("a"))["routes_selected"] == [{"route_id": "R1"}]
+
+        cache.put("b", {})
+        await cache.get("a")
+        # "b" is now the least recently used
+        cache.put("c", {})
+        assert list(cache._lru) == ["a", "c"]
+        assert await cache.get("b") is None
+
+    asyncio.run(scenario())
+
+
+def test_mongo_tier_skips_expired_results_and_remaps_ids():
+    async def scenario():
+        collection = _Collection([
+            _stored("expired", "h1", timedelta(hours=-1)),
+            _stored("older", "h1", timedelta(hours=1)),
+            _stored("newer", "h1", timedelta(hours=2)),
+            _stored("only-expired", "h2", timedelta(seconds=-1)),
+        ])
+        cache = ResultCache(collection)
+        assert await cache.get("h2") is None
+
+        hit = await cache.get("h1")
+        assert hit == {"result_id": "newer", "summary_metrics": {"total_cost": 100}}
+        # Now served from memory
+        queries = collection.queries
+        assert await cache.get("h1") == hit
+        assert collection.queries == queries
+
+    asyncio.run(scenario())
+
+
+def test_expiry_follows_the_ttl():
+    cache = ResultCache(_Collection(), ttl_seconds=60)
+    remaining = cache.expires_at() - datetime.now(timezone.utc)
+    assert timedelta(seconds=59) < remaining <= timedelta(seconds=60)
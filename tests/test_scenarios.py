@@ -0,0 +1,272 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+from result_cache import ResultCache
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(field)
+            for op, operand in condition.items():
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    included = [field for field, flag in projection.items() if flag and field != "_id"]
+    if not included:
+        return {k: v for k, v in doc.items() if projection.get(k, 1)}
+    out = {}
+    for field in included:
+        head, _, rest = field.partition(".")
+        if head not in doc:
+            continue
+        if rest:
+            if isinstance(doc[head], dict) and rest in doc[head]:
+                out.setdefault(head, {})[rest] = doc[head][rest]
+        else:
+            out[head] = doc[head]
+    return out
+
+
+class _Cursor:
+    def __init__(self, docs, log):
+        self.docs = docs
+        self.log = log
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        self.log["sort"] = keys
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        self.log["limit"] = n
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class _Collection:
+    """Just enough of a Motor collection for the scenario endpoints."""
+
+    def __init__(self, docs=()):
+        self.docs = [dict(doc) for doc in docs]
+        self.finds = []
+
+    def find(self, query, projection=None):
+        log = {"query": query, "projection": projection}
+        self.finds.append(log)
+        return _Cursor([_project(doc, projection) for doc in self.docs if _matches(doc, query)], log)
+
+    async def find_one(self, query, projection=None, sort=None):
+        return next((_project(doc, projection) for doc in self.docs if _matches(doc, query)), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+                return
+
+
+class _ProblemStore:
+    def __init__(self, payloads=None):
+        self.payloads = dict(payloads or {})
+        self.released = []
+
+    async def put(self, data, ttl_seconds=None):
+        key = f"input-{len(self.payloads)}"
+        self.payloads[key] = data
+        return key
+
+    async def release(self, key):
+        self.released.append(key)
+        return True
+
+    async def get_many(self, keys):
+        return {key: self.payloads[key] for key in keys if key in self.payloads}
+
+
+def _scenario(scenario_id, created_at, results=True):
+    doc = {"id": scenario_id, "name": f"Scenario {scenario_id}", "description": "", "created_at": created_at,
+           "updated_at": created_at, "input_key": "input"}
+    if results:
+        doc["optimization_results"] = {"summary_metrics": {"total_cost": 100}, "routes_selected": [{"route_id": "R1"}]}
+    return doc
+
+
+@pytest.fixture
+def scenarios(monkeypatch):
+    # b and c were created in the same instant
+    collection = _Collection([_scenario("a", T0), _scenario("b", T0 + timedelta(hours=1)),
+                              _scenario("c", T0 + timedelta(hours=1), results=False),
+                              _scenario("d", T0 + timedelta(hours=2))])
+    monkeypatch.setattr(server, "db", SimpleNamespace(scenarios=collection))
+    monkeypatch.setattr(server, "problem_store", _ProblemStore({"input": {"cities": ["A"]}}))
+    return SimpleNamespace(client=TestClient(server.app), collection=collection)
+
+
+def test_cursor_round_trips_to_a_filter_after_the_scenario():
+    cursor = server.encode_scenario_cursor({"id": "b", "created_at": T0})
+    assert server.decode_scenario_cursor(cursor) == {"$or": [
+        {"created_at": {"$lt": T0}},
+        {"created_at": T0, "id": {"$lt": "b"}}
+    ]}
+    # Documents read back without datetime decoding carry ISO strings
+    assert server.encode_scenario_cursor({"id": "b", "created_at": T0.isoformat()}) == cursor
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+                                    base64.urlsafe_b64encode(b'["yesterday", "b"]').decode()])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        server.decode_scenario_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_walk_newest_first_with_ties_broken_by_id(scenarios):
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = scenarios.client.get("/api/scenarios", params=params).json()
+        seen += [s["id"] for s in page["scenarios"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["d", "c", "b", "a"]
+    # Four scenarios fill two pages exactly: the extra document asked for shows there is no third
+    assert pages == 2
+    assert all(find["limit"] == 3 and find["sort"] == server.SCENARIO_SORT for find in scenarios.collection.finds)
+
+    # A cursor between the tied scenarios resumes at the lower id
+    page = scenarios.client.get("/api/scenarios", params={
+        "cursor": server.encode_scenario_cursor({"id": "c", "created_at": T0 + timedelta(hours=1)})}).json()
+    assert [s["id"] for s in page["scenarios"]] == ["b", "a"] and page["next_cursor"] is None
+
+    response = scenarios.client.get("/api/scenarios", params={"cursor": "garbage"})
+    assert response.status_code == 400 and response.json()["detail"] == "Invalid cursor"
+
+
+def test_summary_view_projects_metrics_only(scenarios):
+    page = scenarios.client.get("/api/scenarios", params={"limit": 3}).json()
+    assert scenarios.collection.finds[-1]["projection"] == server.SCENARIO_SUMMARY_PROJECTION
+    by_id = {s["id"]: s for s in page["scenarios"]}
+    assert set(by_id["d"]) == {"id", "name", "description", "summary_metrics", "has_results", "created_at",
+                               "updated_at"}
+    assert by_id["d"]["summary_metrics"] == {"total_cost": 100} and by_id["d"]["has_results"]
+    assert by_id["c"]["summary_metrics"] is None and not by_id["c"]["has_results"]
+    assert page["next_cursor"] == server.encode_scenario_cursor({"id": "b", "created_at": T0 + timedelta(hours=1)})
+
+    full = scenarios.client.get("/api/scenarios", params={"view": "full", "limit": 1}).json()["scenarios"][0]
+    assert full["input_data"] == {"cities": ["A"]} and full["problem_id"] == "input"
+    assert full["optimization_results"]["routes_selected"] == [{"route_id": "R1"}]
+
+
+INPUT_DATA = {
+    "cities": ["A", "B"], "demand": {"A": 100, "B": 50}, "lat_dict": {}, "long_dict": {},
+    "routes": ["R1", "R2"], "truck_types": ["T"], "route_cities": {"R1": ["A", "B"], "R2": ["B"]},
+    "route_trucktypes": [["R1", "T"], ["R2", "T"]], "capacity": {"R1|T": 200, "R2|T": 100},
+    "cost": {"R1|T": 900, "R2|T": 500}, "warehouse": None,
+}
+STORED_RESULTS = {
+    "summary_metrics": {"total_cost": 900},
+    "routes_selected": [{"route_id": "R1", "truck_type": "T", "trucks_used": 1, "cities_delivered": [
+        {"city": "A", "quantity": 100, "demand": 100}, {"city": "B", "quantity": 50, "demand": 50}]}],
+}
+
+
+def test_delta_overrides_known_keys_without_touching_the_input():
+    delta = server.ScenarioDelta(demand={"B": 80}, cost={"R2|T": 450})
+    updated = server.apply_scenario_delta(INPUT_DATA, delta)
+    assert updated["demand"] == {"A": 100, "B": 80}
+    assert updated["cost"] == {"R1|T": 900, "R2|T": 450}
+    assert updated["capacity"] is INPUT_DATA["capacity"]
+    assert INPUT_DATA["demand"] == {"A": 100, "B": 50} and INPUT_DATA["cost"]["R2|T"] == 500
+    assert server.apply_scenario_delta(INPUT_DATA, server.ScenarioDelta()) == INPUT_DATA
+
+
+def test_delta_with_unknown_keys_is_a_400():
+    with pytest.raises(HTTPException) as error:
+        server.apply_scenario_delta(INPUT_DATA, server.ScenarioDelta(demand={"A": 1, "Z": 5, "Y": 6}))
+    assert error.value.status_code == 400 and error.value.detail == "Unknown demand keys: Z, Y"
+    with pytest.raises(HTTPException) as error:
+        server.apply_scenario_delta(INPUT_DATA, server.ScenarioDelta(capacity={"R1|L": 5}))
+    assert error.value.detail == "Unknown capacity keys: R1|L"
+
+
+class _SolverPool:
+    """Runs jobs in threads, recording their arguments."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, fn, *args):
+        self.calls.append((fn.__name__, args))
+        return await asyncio.to_thread(fn, *args)
+
+
+@pytest.fixture
+def reoptimize(monkeypatch):
+    scenario = {**_scenario("s1", T0), "input_key": "input", "optimization_results": STORED_RESULTS}
+    db = SimpleNamespace(scenarios=_Collection([scenario]), optimization_results=_Collection())
+    store = _ProblemStore({"input": INPUT_DATA})
+    pool = _SolverPool()
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "problem_store", store)
+    monkeypatch.setattr(server, "solver_pool", pool)
+    monkeypatch.setattr(server, "result_cache", ResultCache(db.optimization_results))
+    return SimpleNamespace(client=TestClient(server.app), db=db, store=store, pool=pool)
+
+
+def test_reoptimize_warm_starts_from_the_stored_results(reoptimize):
+    response = reoptimize.client.post("/api/scenarios/s1/reoptimize", json={"demand": {"B": 80}},
+                                      params={"use_cache": False, "time_limit": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["warm_started"] and not body["cache_hit"]
+
+    [(name, (problem, hint, options))] = reoptimize.pool.calls
+    assert name == "optimize_routes"
+    assert hint == server.solution_hint(STORED_RESULTS) == {("R1", "T"): (1, {"A": 100, "B": 50})}
+    assert problem.demand.tolist() == [100, 80] and options.time_limit == 10
+
+    # The scenario now points at the edited input and the new results; the old input is released
+    [stored] = reoptimize.db.scenarios.docs
+    assert reoptimize.store.payloads[stored["input_key"]]["demand"] == {"A": 100, "B": 80}
+    assert stored["optimization_results"]["summary_metrics"] == body["summary_metrics"]
+    assert reoptimize.store.released == ["input"]
+
+
+def test_reoptimize_rejects_unknown_keys_before_solving(reoptimize):
+    response = reoptimize.client.post("/api/scenarios/s1/reoptimize", json={"cost": {"R9|T": 1}})
+    assert response.status_code == 400 and response.json()["detail"] == "Unknown cost keys: R9|T"
+    assert reoptimize.pool.calls == []
+    assert reoptimize.client.post("/api/scenarios/missing/reoptimize", json={}).status_code == 404
@@ -0,0 +1,47 @@
+import math
+import random
+
+import numpy as np
+
+from sequencing import haversine_matrix, nearest_neighbor_tour, sequence_stops, tour_length
+
+
+def _scalar_haversine(p, q):
+    lat1, lon1, lat2, lon2 = map(math.radians, (*p, *q))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _random_coords(n, seed=7):
+    rnd = random.Random(seed)
+    return {f"C{i}": (12 + rnd.random() * 6, 74 + rnd.random() * 6) for i in range(n)}
+
+
+def test_haversine_matrix_matches_scalar_formula():
+    points = np.array([(19.07, 72.87), (28.61, 77.21), (12.97, 77.59)])
+    dist = haversine_matrix(points)
+    for i in range(3):
+        for j in range(3):
+            assert math.isclose(dist[i, j], _scalar_haversine(points[i], points[j]), abs_tol=1e-6)
+
+
+def test_depot_tour_is_a_valid_loop_no_longer_than_nearest_neighbor():
+    coords = _random_coords(60)
+    cities = list(coords)
+    depot = (15.0, 77.0)
+    order, distance = sequence_stops(cities, coords, depot=depot, time_budget=1.0)
+
+    assert sorted(order) == sorted(cities)
+    dist = haversine_matrix(np.array([depot] + [coords[c] for c in cities]))
+    tour = [0] + [cities.index(c) + 1 for c in order]
+    assert math.isclose(distance, tour_length(tour, dist, closed=True))
+    assert distance <= tour_length(nearest_neighbor_tour(dist, 0), dist, closed=True) + 1e-9
+
+
+def test_open_path_keeps_requested_start():
+    coords = _random_coords(12)
+    cities = list(coords)
+    order, _ = sequence_stops(cities, coords, start="C5")
+    assert order[0] == "C5"
+    assert sorted(order) == sorted(cities)
+    assert sequence_stops([], coords) == ([], 0.0)
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from solver_pool import SolverPool, SolverJobError, COMPLETED, CANCELLED, FAILED, worker_budget
+
+
+def _square(x):
+    return x * x
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _budget_after(seconds):
+    time.sleep(seconds)
+    return worker_budget(100)
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+def test_run_returns_result():
+    async def scenario():
+        pool = SolverPool(max_workers=2)
+        assert await pool.run(_square, 7) == 49
+    asyncio.run(scenario())
+
+
+def test_failed_job_surfaces_error():
+    async def scenario():
+        pool = SolverPool(max_workers=1)
+        job = pool.submit(_fail)
+        with pytest.raises(SolverJobError) as exc:
+            await job.wait()
+        assert job.status == FAILED
+        assert exc.value.status_code == 500
+        assert "boom" in exc.value.detail
+    asyncio.run(scenario())
+
+
+def test_cancel_running_job_terminates_worker():
+    async def scenario():
+        pool = SolverPool(max_workers=1)
+        job = pool.submit(_sleep, 30)
+        while job.process is None:
+            await asyncio.sleep(0.01)
+        assert pool.cancel(job.id)
+        with pytest.raises(SolverJobError):
+            await asyncio.wait_for(job.wait(), timeout=5)
+        assert job.status == CANCELLED
+        assert not pool.cancel(job.id)
+    asyncio.run(scenario())
+
+
+def test_pool_bounds_concurrency_and_keeps_loop_free():
+    async def scenario():
+        pool = SolverPool(max_workers=1)
+        first = pool.submit(_sleep, 0.3)
+        second = pool.submit(_sleep, 0.1)
+        await asyncio.sleep(0.1)
+        assert second.started_at is None
+        await asyncio.gather(first.wait(), second.wait())
+        assert first.status == second.status == COMPLETED
+        assert second.started_at >= first.finished_at
+    asyncio.run(scenario())
+
+
+def test_children_share_the_cpu_budget():
+    async def scenario():
+        pool = SolverPool(max_workers=3, cpu_budget=4)
+        first = pool.submit(_budget_after, 0.5)
+        while first.process is None:
+            await asyncio.sleep(0.01)
+        # The first job holds every CPU, so jobs started alongside it get one each
+        second = pool.submit(_budget_after, 0.2)
+        assert await second.wait() == 1
+        assert await first.wait() == 4
+        # Released once jobs finish
+        assert await pool.run(_budget_after, 0) == 4
+        assert worker_budget(3) == 3
+    asyncio.run(scenario())
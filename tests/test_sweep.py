@@ -0,0 +1,122 @@
+import dataclasses
+
+import pytest
+
+from model_builder import CP_SAT, SolverOptions, solve_covering
+from problem import ProblemInstance
+from sweep import grid_points, perturb, run_sweep, sweep_axes, validate_sweep
+
+
+def _problem():
+    return ProblemInstance.from_file_data({
+        "cities": ["A", "B", "C"],
+        "demand": {"A": 100, "B": 150, "C": 80},
+        "route_cities": {"R1": ["A", "B"], "R2": ["B", "C"], "R3": ["C"]},
+        "route_trucktypes": [("R1", "Small"), ("R2", "Large"), ("R3", "Small")],
+        "capacity": {("R1", "Small"): 200, ("R2", "Large"): 400, ("R3", "Small"): 200},
+        "cost": {("R1", "Small"): 1000, ("R2", "Large"): 1500, ("R3", "Small"): 900},
+    })
+
+
+GROUPS = {"west": ["A", "B"]}
+AXES = sweep_axes({"all": [1.0, 1.3], "west": [1.0, 2.0]}, {"Small": [0.5, 2.0]}, {"Large": [0.5, 1.5]})
+
+
+def _fresh_costs(problem, axes, options=None):
+    costs = []
+    for point in grid_points(axes):
+        demand, cost, capacity = perturb(problem, point, GROUPS)
+        variant = dataclasses.replace(problem, demand=demand, cost=cost, capacity=capacity)
+        costs.append(round(solve_covering(variant, options).objective, 2))
+    return costs
+
+
+def test_cost_curve_matches_fresh_solves():
+    problem = _problem()
+    result = run_sweep(problem, AXES, GROUPS)
+    assert len(result["points"]) == 16
+    assert result["cost_curve"] == _fresh_costs(problem, AXES)
+    assert result["summary"]["solved"] == 16
+    assert result["summary"]["model_builds"] == 1
+    first = result["points"][0]
+    assert first["factors"] == {"demand": {"all": 1.0, "west": 1.0}, "cost": {"Small": 0.5}, "capacity": {"Large": 0.5}}
+    assert first["summary_metrics"]["total_demand"] == 330
+
+
+def test_parallel_workers_give_the_same_curve():
+    problem = _problem()
+    serial = run_sweep(problem, AXES, GROUPS)
+    parallel = run_sweep(problem, AXES, GROUPS, max_workers=2)
+    assert parallel["summary"]["workers"] == 2
+    assert parallel["cost_curve"] == serial["cost_curve"]
+
+
+def test_cp_sat_sweep_rebuilds_per_point():
+    problem = _problem()
+    axes = sweep_axes({"all": [1.0, 1.3]}, {}, {"Large": [0.5, 1.5]})
+    result = run_sweep(problem, axes, {}, SolverOptions(backend=CP_SAT))
+    assert result["summary"]["model_builds"] == 4
+    assert result["cost_curve"] == _fresh_costs(problem, axes)
+
+
+def test_presolve_keeps_options_needed_at_any_point():
+    # At base prices Large dominates Small on R1; tripling Large's cost makes Small the optimum
+    problem = ProblemInstance.from_file_data({
+        "cities": ["A"],
+        "demand": {"A": 150},
+        "route_cities": {"R1": ["A"]},
+        "route_trucktypes": [("R1", "Small"), ("R1", "Large")],
+        "capacity": {("R1", "Small"): 200, ("R1", "Large"): 400},
+        "cost": {("R1", "Small"): 1000, ("R1", "Large"): 900},
+    })
+    result = run_sweep(problem, sweep_axes({}, {"Large": [1.0, 3.0]}, {}), {})
+    assert result["cost_curve"] == [900, 1000]
+    assert result["summary"]["options_presolved_away"] == 0
+
+
+@pytest.mark.parametrize("axes, groups, message", [
+    (sweep_axes({"north": [1.0]}, {}, {}), {}, "Unknown city group"),
+    (sweep_axes({}, {"Huge": [1.0]}, {}), {}, "Unknown truck type"),
+    (sweep_axes({"all": [1.0, 0.0]}, {}, {}), {}, "positive"),
+    (sweep_axes({}, {}, {"Large": [-1.0]}), {}, "positive"),
+    (sweep_axes({"all": []}, {}, {}), {}, "No values"),
+    (sweep_axes({"g": [1.0]}, {}, {}), {"g": ["Z"]}, "Unknown cities"),
+    (sweep_axes({"all": [1.0, 1.1, 1.2]}, {"Small": [1.0, 2.0]}, {}), {}, "at most 5"),
+])
+def test_validate_sweep_rejects_bad_grids(axes, groups, message):
+    with pytest.raises(ValueError, match=message):
+        validate_sweep(_problem(), axes, groups, max_points=5)
+
+
+def test_sweep_endpoint_validates_and_solves():
+    from fastapi.testclient import TestClient
+
+    import server
+
+    file_data = _problem().to_file_data()
+    client = TestClient(server.app)
+    bad = client.post("/api/optimize/sweep", json={"file_data": file_data, "sweep": {"cost": {"Huge": [1.0]}}})
+    assert bad.status_code == 400
+
+    response = client.post("/api/optimize/sweep", json={
+        "file_data": file_data,
+        "sweep": {"city_groups": GROUPS, "demand": {"west": [1.0, 2.0]}},
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cost_curve"] == _fresh_costs(_problem(), sweep_axes({"west": [1.0, 2.0]}, {}, {}))
+    assert [p["factors"]["demand"] for p in body["points"]] == [{"west": 1.0}, {"west": 2.0}]
+
+
+def test_sweep_in_a_pool_child_stays_within_its_cpu_share():
+    import asyncio
+
+    from solver_pool import SolverPool
+
+    async def scenario():
+        pool = SolverPool(max_workers=1, cpu_budget=1)
+        return await pool.run(run_sweep, _problem(), AXES, GROUPS, None, 4)
+
+    result = asyncio.run(scenario())
+    assert result["summary"]["workers"] == 1
+    assert result["cost_curve"] == _fresh_costs(_problem(), AXES)